@@ -1,29 +1,62 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Optional
+from datetime import datetime
+from contextlib import nullcontext
+import asyncio
 import pandas as pd
 import logging
 import json
 import hashlib
+import time
 import redis.asyncio as redis
+import pyarrow as pa
 import os
 from src.modeling.inference_pipeline import InferencePipeline
+from src.modeling.eta_surface import ETASurfaceIndex, model_fingerprint
+from src.profiling import ProfilingMiddleware
+from src.serving.weather_store import WeatherFeatureStore
+from src.serving.admission import AdmissionController, AdmissionRejected
+from src.serving.shadow import ShadowEvaluator
+from src.serving.drift import DriftMonitor, DriftReference
+from src.serving.request_logging import EventSampler, configure_async_logging
+from src.serving import codec
+from src.serving.columnar import (
+    ARROW_STREAM_MEDIA_TYPE, ColumnarPayloadError, decode_arrow_stream, encode_arrow_stream
+)
 from contextlib import asynccontextmanager
 
 # =====================
 # Logging Setup
 # =====================
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s"
-)
+# LOG_ASYNC=1 moves formatting and I/O to a background thread (JSON lines, bounded queue).
+# LOG_SAMPLE_RATES="cache_hit=0.01,cache_miss=0.1" samples tagged per-request events; errors always pass.
+if os.getenv("LOG_ASYNC", "0") == "1":
+    configure_async_logging(level=logging.INFO, max_queue=int(os.getenv("LOG_QUEUE_SIZE", 10_000)))
+else:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s"
+    )
 logger = logging.getLogger(__name__)
+if os.getenv("LOG_SAMPLE_RATES"):
+    logger.addFilter(EventSampler(EventSampler.parse_rates(os.getenv("LOG_SAMPLE_RATES"))))
 
 # =====================
 # Globals
 # =====================
 inference_pipeline: Optional[InferencePipeline] = None
 redis_client: Optional[redis.Redis] = None
+eta_surface: Optional[ETASurfaceIndex] = None
+weather_store: Optional[WeatherFeatureStore] = None
+admission: Optional[AdmissionController] = None
+shadow: Optional[ShadowEvaluator] = None
+drift_monitor: Optional[DriftMonitor] = None
+ETA_SURFACE_TOLERANCE = float(os.getenv("ETA_SURFACE_TOLERANCE", 0.5))  # max interpolation error (minutes)
+ADMISSION_DEFAULT_TIMEOUT_MS = float(os.getenv("ADMISSION_DEFAULT_TIMEOUT_MS", 0))  # 0 = no server-side deadline
+# Opt-in lean codec: pre-serialized cache values returned as raw bytes, no response re-validation
+FAST_CODEC = os.getenv("FAST_CODEC", "0") == "1"
 
 
 # =====================
@@ -31,19 +64,88 @@ redis_client: Optional[redis.Redis] = None
 # =====================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global inference_pipeline, redis_client
+    global inference_pipeline, redis_client, eta_surface, weather_store, admission, shadow, drift_monitor
 
     # --- Load ML Models ---
+    reg_path = "models/best_regression_pipeline.pkl"
+    clf_path = "models/best_classification_pipeline.pkl"
     try:
-        inference_pipeline = InferencePipeline(
-            reg_path="models/best_regression_pipeline.pkl",
-            clf_path="models/best_classification_pipeline.pkl"
-        )
+        inference_pipeline = InferencePipeline(reg_path=reg_path, clf_path=clf_path,
+                                               max_shard_bytes=int(float(os.getenv("SHARD_CACHE_MB", 512)) * 2 ** 20))
         logger.info("✅ Models loaded successfully.")
     except Exception as e:
         logger.error(f"❌ Failed to load models: {e}")
         inference_pipeline = None
 
+    # --- Precomputed ETA Surface (optional) ---
+    surface_path = os.getenv("ETA_SURFACE_PATH", "models/eta_surface.npz")
+    eta_surface = None
+    if inference_pipeline and os.path.exists(surface_path):
+        try:
+            index = ETASurfaceIndex.load(surface_path)
+            if index.fingerprint == model_fingerprint(*inference_pipeline.model_files()):
+                eta_surface = index
+                logger.info(f"📐 ETA surface loaded ({len(index)} slots, tolerance {ETA_SURFACE_TOLERANCE} min)")
+            else:
+                logger.warning("⚠️ ETA surface was built for a different model version; ignoring it.")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load ETA surface: {e}")
+
+    # --- Feature Drift Monitor (reference written by training next to the pickles) ---
+    drift_path = os.getenv("DRIFT_REFERENCE_PATH", "models/drift_reference.json")
+    drift_monitor = None
+    if os.path.exists(drift_path):
+        try:
+            drift_monitor = DriftMonitor(DriftReference.load(drift_path))
+            logger.info(f"📊 Drift monitor loaded reference from {drift_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load drift reference: {e}")
+
+    # --- Weather Feature Store (for /predict/lite) ---
+    weather_dir = os.getenv("WEATHER_DATA_DIR", "Pickup_and_delivery_data/weather")
+    weather_refresh_task = None
+    weather_store = WeatherFeatureStore(
+        weather_dir, tolerance=pd.Timedelta(minutes=float(os.getenv("WEATHER_TOLERANCE_MINUTES", 60)))
+    )
+    try:
+        weather_store.refresh()
+        weather_refresh_task = asyncio.create_task(
+            _refresh_weather_periodically(float(os.getenv("WEATHER_REFRESH_SECONDS", 300)))
+        )
+        logger.info(f"🌦️ Weather store ready with {len(weather_store.cities)} cities from {weather_dir}")
+    except Exception as e:
+        logger.warning(f"⚠️ Weather store not available: {e}")
+        weather_store = None
+
+    # --- Admission Control (opt-in; sheds model-bound requests under overload) ---
+    admission = None
+    if os.getenv("ADMISSION_CONTROL", "0") == "1":
+        admission = AdmissionController(
+            initial_limit=int(os.getenv("ADMISSION_INITIAL_LIMIT", 8)),
+            max_limit=int(os.getenv("ADMISSION_MAX_LIMIT", 32)),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", 32)),
+            latency_tolerance=float(os.getenv("ADMISSION_LATENCY_TOLERANCE", 2.0)),
+        )
+        logger.info(f"🚦 Admission control enabled ({admission.stats()['limit']} initial slots, "
+                    f"queue {admission.max_queue})")
+
+    # --- Shadow Candidate (optional, scored off the request path) ---
+    shadow = None
+    shadow_reg, shadow_clf = os.getenv("SHADOW_REG_PATH"), os.getenv("SHADOW_CLF_PATH")
+    if inference_pipeline and shadow_reg and shadow_clf:
+        try:
+            candidate = InferencePipeline(reg_path=shadow_reg, clf_path=shadow_clf, threshold_path=None,
+                                          shard_manifest_path=None)
+            shadow = ShadowEvaluator(
+                candidate,
+                max_queue=int(os.getenv("SHADOW_QUEUE_SIZE", 10_000)),
+                batch_size=int(os.getenv("SHADOW_BATCH_SIZE", 256)),
+                sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", 1.0)),
+            ).start()
+            logger.info(f"👥 Shadow evaluation enabled with candidate {shadow_reg} / {shadow_clf}")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load shadow candidate: {e}")
+
     # --- Redis Connection ---
     redis_host = os.getenv("REDIS_HOST", "redis-server")  # service name in Docker
     redis_port = int(os.getenv("REDIS_PORT", 6379))
@@ -60,15 +162,39 @@ async def lifespan(app: FastAPI):
     yield
 
     # --- Cleanup Section (on shutdown) ---
+    if weather_refresh_task:
+        weather_refresh_task.cancel()
+    if shadow:
+        shadow.stop(drain=False)
+        logger.info(f"👥 Shadow evaluation stopped: {shadow.report()}")
     if redis_client:
         await redis_client.close()
         logger.info("🧹 Redis connection closed.")
 
+async def _refresh_weather_periodically(interval_s: float):
+    """Reload changed weather files in the background without blocking requests."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await run_in_threadpool(weather_store.refresh)
+        except Exception as e:
+            logger.warning(f"⚠️ Weather refresh failed: {e}")
+
 # =====================
 # FastAPI App
 # =====================
 app = FastAPI(title="NexusDrive Inference API", version="2.0", lifespan=lifespan)
 
+# Opt-in request profiling: only installed when PROFILE_DIR is set (zero overhead otherwise).
+# Profiles requests sending "X-Profile: 1" plus a PROFILE_SAMPLE_RATE fraction of traffic.
+if os.getenv("PROFILE_DIR"):
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=os.getenv("PROFILE_DIR"),
+        sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", 0.0)),
+        interval=float(os.getenv("PROFILE_INTERVAL_MS", 1.0)) / 1000,
+    )
+
 # =====================
 # Pydantic Schemas
 # =====================
@@ -87,6 +213,21 @@ class InferenceRequest(BaseModel):
     Traffic_Label: str
     city: str
     aoi_type: int
+    # Optional pickup / drop-off coordinates for models trained with grid-speed features
+    accept_gps_lat: Optional[float] = None
+    accept_gps_lng: Optional[float] = None
+    delivery_gps_lat: Optional[float] = None
+    delivery_gps_lng: Optional[float] = None
+
+
+class LiteInferenceRequest(BaseModel):
+    """Minimal request: weather, traffic and cyclical time features are resolved server-side."""
+    order_id: int
+    city: str
+    # Reference time for all server-side features; training keys them on delivery_time (see README)
+    timestamp: datetime
+    distance_km: float
+    aoi_type: int
 
 
 class InferenceResponse(BaseModel):
@@ -94,6 +235,15 @@ class InferenceResponse(BaseModel):
     city: str
     Predicted_ETA: float
     Predicted_Delay: int
+    Delay_Threshold: Optional[float] = None
+
+
+# Columnar schema derived from InferenceRequest's required fields: {model column: (accepted names, arrow type)}
+_ARROW_TYPES = {int: pa.int64(), float: pa.float64(), str: pa.string()}
+ARROW_COLUMNS = {
+    (field.alias or name): ((name, field.alias) if field.alias else (name,), _ARROW_TYPES[field.annotation])
+    for name, field in InferenceRequest.model_fields.items() if field.is_required()
+}
 
 
 # =====================
@@ -109,52 +259,167 @@ async def health_check():
 # =====================
 def generate_cache_key(data: dict) -> str:
     """Create a hash key from the request payload."""
+    if FAST_CODEC:
+        return hashlib.sha256(codec.dumps_sorted(data)).hexdigest()
     json_str = json.dumps(data, sort_keys=True)
     return hashlib.sha256(json_str.encode()).hexdigest()
 
 
+def _json_bytes_response(body: bytes, cache_status: str) -> Response:
+    # Returning a Response skips FastAPI's response_model validation/serialization;
+    # the route keeps response_model=InferenceResponse for the OpenAPI schema
+    return Response(content=body, media_type=codec.JSON_MEDIA_TYPE, headers={"X-Cache": cache_status})
+
+
 # =====================
 # Inference Endpoint (Async + Cache)
 # =====================
+def _deadline(timeout_ms: Optional[float], started: float) -> Optional[float]:
+    """Absolute monotonic deadline from the client's X-Request-Timeout-Ms (or the server default)."""
+    timeout_ms = timeout_ms or ADMISSION_DEFAULT_TIMEOUT_MS
+    return started + timeout_ms / 1000 if timeout_ms > 0 else None
+
+
 @app.post("/predict", response_model=InferenceResponse)
-async def predict(request: InferenceRequest):
+async def predict(request: InferenceRequest, response: Response,
+                  x_request_timeout_ms: Optional[float] = Header(None)):
     global inference_pipeline, redis_client
+    started = time.monotonic()
 
     try:
-        df = pd.DataFrame([request.model_dump(by_alias=True)])
-        cache_key = f"inference:{generate_cache_key(request.model_dump(by_alias=True))}"
+        features = request.model_dump(by_alias=True, exclude_none=True)  # unset coordinates stay out of the cache key
+        if drift_monitor:
+            drift_monitor.update(features)  # counts live traffic, cache hits included
+        cache_key = f"inference:{generate_cache_key(features)}"
 
         # === Check Redis Cache ===
         if redis_client:
             cached = await redis_client.get(cache_key)
             if cached:
-                logger.info(f"⚡ Cache hit for {cache_key}")
-                return json.loads(cached)
+                logger.info("⚡ Cache hit for %s", cache_key[:26],
+                            extra={"event": "cache_hit", "order_id": request.order_id})
+                if FAST_CODEC:
+                    if shadow:
+                        result = codec.loads(cached)
+                        shadow.submit(features, result["Predicted_ETA"], result["Predicted_Delay"])
+                    return _json_bytes_response(cached, "HIT")  # stored bytes go out as-is
+                response.headers["X-Cache"] = "HIT"
+                result = json.loads(cached)
+                if shadow:
+                    shadow.submit(features, result["Predicted_ETA"], result["Predicted_Delay"])
+                return result
 
-        logger.info(f"📦 Cache miss → running inference for {request.order_id}")
-        preds = inference_pipeline.predict(df)
+        # === Precomputed surface, then full inference ===
+        # The surface is keyed without coordinates, so requests that carry them go to the model
+        use_surface = eta_surface and "accept_gps_lat" not in features
+        surface_hit = eta_surface.lookup(features, ETA_SURFACE_TOLERANCE) if use_surface else None
+        if surface_hit is not None:
+            eta, delay = surface_hit
+            thresholds = inference_pipeline.delay_threshold([request.distance_km])
+            threshold = None if thresholds is None else thresholds[0]
+        else:
+            logger.info("📦 Cache miss → running inference for %s", request.order_id,
+                        extra={"event": "cache_miss", "order_id": request.order_id})
+            # Only model-bound work is admission-controlled; cache and surface hits never wait here
+            async with (admission.slot(_deadline(x_request_timeout_ms, started)) if admission else nullcontext()):
+                preds = await run_in_threadpool(inference_pipeline.predict, pd.DataFrame([features]))
 
-        # Extract predictions
-        eta = float(preds["ETA_Prediction"][0]) if isinstance(preds, dict) else float(preds[0])
-        delay = int(preds["Delay_Prediction"][0]) if isinstance(preds, dict) else int(preds[1])
+            # Extract predictions
+            eta = float(preds["ETA_Prediction"][0]) if isinstance(preds, dict) else float(preds[0])
+            delay = int(preds["Delay_Prediction"][0]) if isinstance(preds, dict) else int(preds[1])
+            threshold = preds.get("Delay_Threshold", [None])[0] if isinstance(preds, dict) else None
 
 
-        response = {
+        result = {
             "order_id": request.order_id,
             "city": request.city,
             "Predicted_ETA": eta,
-            "Predicted_Delay": delay
+            "Predicted_Delay": delay,
+            "Delay_Threshold": None if threshold is None or pd.isna(threshold) else float(threshold)
         }
 
         # === Store in Redis Cache ===
+        body = codec.dumps(result) if FAST_CODEC else None
         if redis_client:
-            await redis_client.setex(cache_key, 300, json.dumps(response))  # TTL = 5 min
+            await redis_client.setex(cache_key, 300, body if FAST_CODEC else json.dumps(result))  # TTL = 5 min
+
+        if shadow:
+            shadow.submit(features, eta, delay)  # non-blocking; dropped when the shadow queue is full
+
+        response.headers["X-Cache"] = "MISS"
+        logger.info("✅ Inference successful for order_id=%s", request.order_id,
+                    extra={"event": "inference_ok", "order_id": request.order_id})
+        if FAST_CODEC:
+            return _json_bytes_response(body, "MISS")
+        return result
+
+    except AdmissionRejected as e:
+        logger.warning("🚦 Shed order_id=%s: %s", request.order_id, e.reason,
+                       extra={"event": "shed", "order_id": request.order_id})
+        raise HTTPException(status_code=503, detail=e.reason,
+                            headers={"Retry-After": AdmissionController.retry_after_header(e.retry_after)})
+    except Exception as e:
+        logger.exception("❌ Inference failed.", extra={"event": "inference_error", "order_id": request.order_id})
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# =====================
+# Lite Endpoint (server-side weather features)
+# =====================
+@app.post("/predict/lite", response_model=InferenceResponse)
+async def predict_lite(request: LiteInferenceRequest, response: Response,
+                       x_request_timeout_ms: Optional[float] = Header(None)):
+    if weather_store is None:
+        raise HTTPException(status_code=503, detail="Weather store not initialized")
+
+    features = weather_store.build_features(request.city, request.timestamp, request.distance_km, request.aoi_type)
+    if features is None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"No weather reading for city '{request.city}' within tolerance of {request.timestamp}"
+        )
+    return await predict(InferenceRequest(order_id=request.order_id, **features), response, x_request_timeout_ms)
+
 
-        logger.info(f"✅ Inference successful for order_id={request.order_id}")
-        return response
+# =====================
+# Bulk Columnar Endpoint (Arrow IPC)
+# =====================
+@app.post(
+    "/predict/arrow",
+    response_class=Response,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {ARROW_STREAM_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def predict_arrow(http_request: Request):
+    """Score an Arrow IPC stream whose columns are the InferenceRequest fields; returns an Arrow stream."""
+    if inference_pipeline is None:
+        raise HTTPException(status_code=503, detail="Models not loaded")
 
+    try:
+        df = decode_arrow_stream(await http_request.body(), ARROW_COLUMNS)
+    except ColumnarPayloadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if drift_monitor:
+        drift_monitor.update_frame(df)
+
+    try:
+        # Large batches would block the event loop; score them in the threadpool
+        preds = await run_in_threadpool(inference_pipeline.predict, df)
+        columns = {
+            "order_id": df["order_id"].to_numpy(),
+            "Predicted_ETA": preds["ETA_Prediction"].astype("float64"),
+            "Predicted_Delay": preds["Delay_Prediction"].astype("int64"),
+        }
+        if "Delay_Threshold" in preds:
+            columns["Delay_Threshold"] = preds["Delay_Threshold"]
+        logger.info(f"✅ Bulk inference successful for {len(df)} rows")
+        return Response(content=encode_arrow_stream(columns), media_type=ARROW_STREAM_MEDIA_TYPE)
     except Exception as e:
-        logger.exception("❌ Inference failed.")
+        logger.exception("❌ Bulk inference failed.")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -162,6 +427,41 @@ async def predict(request: InferenceRequest):
 def root():
     return {"message": "NexusDrive Inference API is running!"}
 
+@app.get("/admission")
+async def admission_stats():
+    if admission is None:
+        raise HTTPException(status_code=503, detail="Admission control disabled")
+    return admission.stats()
+
+@app.get("/shadow/stats")
+async def shadow_stats():
+    """Candidate-vs-served agreement, ETA differences and candidate latency for promotion decisions."""
+    if shadow is None:
+        raise HTTPException(status_code=503, detail="Shadow evaluation disabled")
+    return shadow.report()
+
+@app.get("/shards")
+async def shard_stats():
+    """Per-city model shards: which are loaded, memory budget, LRU hits / loads / evictions."""
+    if inference_pipeline is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return inference_pipeline.shard_stats()
+
+@app.get("/drift")
+async def drift_report():
+    """PSI / binned-KS of live feature distributions against the training reference."""
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="Drift reference not loaded")
+    return drift_monitor.report()
+
+@app.post("/drift/reset")
+async def drift_reset():
+    """Start a new observation window."""
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="Drift reference not loaded")
+    drift_monitor.reset()
+    return {"status": "reset"}
+
 @app.get("/cache/health")
 async def cache_health():
     if not redis_client:
@@ -14,7 +14,7 @@ class TrafficMockGenerator(BaseMockGenerator):
     def __init__(self):
         self.traffic_labels = ["Low", "Medium", "High", "Jam"]
       
-    def _map_traffic(self, time_val):
+    def generate_label(self, time_val):
         """
         Rules based on delivery_time (supports both datetime and string).
         """
@@ -38,5 +38,5 @@ class TrafficMockGenerator(BaseMockGenerator):
             return "Medium"
 
     def generate(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["Traffic_Label"] = df["delivery_time"].apply(self._map_traffic)
+        df["Traffic_Label"] = df["delivery_time"].apply(self.generate_label)
         return df
@@ -2,6 +2,10 @@ import os
 import pandas as pd
 from src.data_ingest import DataIngest
 from src.data_transformation import DataAligner
+from src.weather_join import MultiCityWeatherJoiner
+from src.datetime_parsing import parse_datetimes, LADE_FORMAT, PIPELINE_FORMAT
+from mock.weather_generator import WeatherMockGenerator
+from mock.traffic_generator import TrafficMockGenerator
 
 
 class DataExtraction:
@@ -17,31 +21,35 @@ class DataExtraction:
         os.makedirs(self.output_folder, exist_ok=True)
 
     def process_city_datasets(self) -> pd.DataFrame:
-        """Process each city (delivery + weather) and combine into one enriched dataset"""
-        enriched_datasets = []
-
+        """Process all cities (delivery + weather) in one as-of join and return the combined enriched dataset"""
+        deliveries, weather = {}, {}
         for delivery_file, weather_file in self.city_file_pairs:
             loader = DataIngest(delivery_file, weather_file)
-            enriched_df = loader.enrich_with_weather()
-            enriched_df = loader.enrich_with_traffic_and_vehicles()
-
             # add city column automatically from filename
             city_name = delivery_file.split("/")[-1].replace("delivery_", "").replace(".csv", "")
-            enriched_df["city"] = city_name
+            deliveries[city_name] = loader.delivery_df
+            weather[city_name] = loader.weather_df
+
+        # Single sort + searchsorted per city instead of one merge_asof per DataIngest
+        enriched_df, cities = MultiCityWeatherJoiner(tolerance=pd.Timedelta("1h")).join(deliveries, weather)
+
+        generator = WeatherMockGenerator()
+        enriched_df["Weather_Label"] = enriched_df.apply(generator.generate_label, axis=1)
+        enriched_df = TrafficMockGenerator().generate(enriched_df)
+        enriched_df["city"] = cities
 
-            enriched_df["accept_time"] = pd.to_datetime(enriched_df["time"], format="%m-%d %H:%M:%S", errors="coerce")
-            enriched_df["pickup_time"] = enriched_df["time"]
-            enriched_df["delivery_time"] = pd.to_datetime(enriched_df["delivery_time"], errors="coerce")
-            
-            enriched_df["ETA_target"] = (
-                (enriched_df["delivery_time"] - enriched_df["pickup_time"])
-                .dt.total_seconds() / 60
-            )
+        # `time` and `delivery_time` were parsed once by DataIngest; these are no-ops unless they arrive as strings
+        enriched_df["accept_time"] = parse_datetimes(enriched_df["time"], format=LADE_FORMAT, errors="coerce")
+        enriched_df["pickup_time"] = enriched_df["time"]
+        enriched_df["delivery_time"] = parse_datetimes(enriched_df["delivery_time"], format=PIPELINE_FORMAT, errors="coerce")
 
-            enriched_datasets.append(enriched_df)
-            print(f"✅ Processed {city_name} dataset")
+        enriched_df["ETA_target"] = (
+            (enriched_df["delivery_time"] - enriched_df["pickup_time"])
+            .dt.total_seconds() / 60
+        )
+        print(f"✅ Processed {len(deliveries)} city datasets: {', '.join(deliveries)}")
 
-        combined_enriched_df = pd.concat(enriched_datasets, ignore_index=True)
+        combined_enriched_df = enriched_df
         print("✅ Combined enriched dataset shape:", combined_enriched_df.shape)
 
         # Save combined enriched data
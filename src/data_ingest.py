@@ -3,6 +3,7 @@ import pandas as pd
 from abc import ABC, abstractmethod
 from mock.weather_generator import WeatherMockGenerator
 from mock.traffic_generator import TrafficMockGenerator
+from src.datetime_parsing import parse_datetimes, LADE_FULL_FORMAT, LADE_YEAR_PREFIX, WEATHER_FORMAT
 
 class AbstractDataIngest(ABC):
     @abstractmethod
@@ -38,13 +39,14 @@ class DataIngest(AbstractDataIngest):
         self.weather_df = pd.read_csv(self.weather_file)
 
         # ensure datetime conversion
-        self.delivery_df["delivery_time"] = pd.to_datetime(
-                "2023-" + self.delivery_df["delivery_time"].astype(str),
-                format="%Y-%m-%d %H:%M:%S",
-                errors="coerce"
+        self.delivery_df["delivery_time"] = parse_datetimes(
+                self.delivery_df["delivery_time"],
+                format=LADE_FULL_FORMAT,
+                errors="coerce",
+                prefix=LADE_YEAR_PREFIX
             )
 
-        self.weather_df["time"] = pd.to_datetime(self.weather_df["time"])
+        self.weather_df["time"] = parse_datetimes(self.weather_df["time"], format=WEATHER_FORMAT)
 
     def enrich_with_weather(self) -> pd.DataFrame:
         """
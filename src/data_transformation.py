@@ -1,5 +1,8 @@
 import pandas as pd
 from abc import ABC, abstractmethod
+from src.datetime_parsing import (
+    parse_datetimes, parse_date_and_time, LADE_FORMAT, PIPELINE_FORMAT, AMAZON_DATETIME_FORMAT
+)
 
 class AbstractDataAlign(ABC):
     @abstractmethod
@@ -25,14 +28,14 @@ class DataAligner(AbstractDataAlign):
         df1 = self.enriched_df.copy()
 
         # ensure datetime parsing
-        df1["accept_time"] = pd.to_datetime(df1["time"], format="%m-%d %H:%M:%S", errors="coerce")
+        df1["accept_time"] = parse_datetimes(df1["time"], format=LADE_FORMAT, errors="coerce")
         pickup_datetime1 = df1["time"]
 
         df1_reshaped = pd.DataFrame({
             "order_id": df1["order_id"],
             "Date": pickup_datetime1.dt.date,
             "pickup_time": pickup_datetime1,
-            "delivery_time": pd.to_datetime(df1["delivery_time"], errors="coerce"),
+            "delivery_time": parse_datetimes(df1["delivery_time"], format=PIPELINE_FORMAT, errors="coerce"),
             "pickup_lat": df1["accept_gps_lat"].fillna(df1["lat"]),
             "pickup_lng": df1["accept_gps_lng"].fillna(df1["lng"]),
             "drop_lat": df1["delivery_gps_lat"],
@@ -51,9 +54,9 @@ class DataAligner(AbstractDataAlign):
         """Reshape the amazon dataset into common schema"""
         df2 = self.amazon_df.copy()
 
-        pickup_datetime = pd.to_datetime(
-            df2["Order_Date"].astype(str) + " " + df2["Order_Time"].fillna("00:00:00"),
-            errors="coerce"
+        # Parsed once per distinct (date, time) pair instead of per row
+        pickup_datetime = parse_date_and_time(
+            df2["Order_Date"], df2["Order_Time"], format=AMAZON_DATETIME_FORMAT, errors="coerce"
         )
         delivery_datetime = pickup_datetime + pd.to_timedelta(df2["Delivery_Time"], unit="m")
 
@@ -0,0 +1,90 @@
+# src/datetime_parsing.py
+"""
+Datetime Parsing Module
+-----------------------
+Shared timestamp parsing for the data pipeline. Delivery and weather
+timestamps repeat heavily (hourly weather, minute-resolution orders), so
+each column is factorized first, only the distinct strings are parsed —
+always with an explicit format — and the result is broadcast back through
+the integer codes. Columns that are already datetime64 are returned as-is,
+so a column is converted at most once per pipeline run.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Formats of the raw sources
+LADE_FORMAT = "%m-%d %H:%M:%S"              # LaDe delivery/accept times (no year)
+LADE_YEAR_PREFIX = "2023-"                  # year prepended to LaDe times before parsing
+LADE_FULL_FORMAT = "%Y-%m-%d %H:%M:%S"
+WEATHER_FORMAT = "ISO8601"                  # Open-Meteo hourly exports (2023-05-01T00:00)
+AMAZON_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+PIPELINE_FORMAT = "ISO8601"                 # timestamps written back by to_csv (extracted_data/*.csv)
+
+# Factorizing object strings costs about as much as parsing them with an explicit
+# format, so memoization only pays off when values repeat; decided from a strided sample
+MEMOIZE_SAMPLE_SIZE = 10_000
+MEMOIZE_MAX_DISTINCT_RATIO = 0.5
+
+
+def is_datetime(values) -> bool:
+    return pd.api.types.is_datetime64_any_dtype(values)
+
+
+def _worth_memoizing(values: pd.Series) -> bool:
+    if len(values) <= MEMOIZE_SAMPLE_SIZE:
+        return True
+    sample = values.iloc[::len(values) // MEMOIZE_SAMPLE_SIZE]
+    return sample.nunique(dropna=False) / len(sample) < MEMOIZE_MAX_DISTINCT_RATIO
+
+
+def _broadcast(codes: np.ndarray, parsed: pd.DatetimeIndex, index, name) -> pd.Series:
+    # code -1 (missing input) becomes NaT
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=index, name=name)
+
+
+def parse_datetimes(values: pd.Series, format: str, errors: str = "raise", prefix: str = "") -> pd.Series:
+    """
+    Parse a string column with an explicit `format`, once per distinct value.
+    `prefix` is prepended to every value before parsing (e.g. a missing year);
+    missing values become NaT. Already-parsed columns are returned unchanged.
+    Mostly-distinct columns skip memoization and are parsed directly.
+    """
+    if is_datetime(values):
+        return values
+    if not _worth_memoizing(values):
+        strings = prefix + values.astype(str) if prefix else values
+        return pd.to_datetime(strings, format=format, errors=errors).rename(values.name)
+    codes, uniques = pd.factorize(values)
+    strings = uniques.astype(str)
+    if prefix:
+        strings = prefix + strings
+    parsed = pd.DatetimeIndex(pd.to_datetime(strings, format=format, errors=errors))
+    return _broadcast(codes, parsed, values.index, values.name)
+
+
+def parse_date_and_time(dates: pd.Series, times: pd.Series, format: str, errors: str = "coerce",
+                        missing_time: str = "00:00:00") -> pd.Series:
+    """
+    Parse separate date and time columns as `"<date> <time>"` without building
+    the concatenated string per row: the two columns are factorized, combined
+    into pair codes, and only the distinct (date, time) pairs are joined and parsed.
+    """
+    date_codes, date_uniques = pd.factorize(dates.astype(str))
+    time_codes, time_uniques = pd.factorize(times.fillna(missing_time))
+    n_times = max(len(time_uniques), 1)
+    pair_codes, pairs = pd.factorize(date_codes.astype(np.int64) * n_times + time_codes)
+
+    date_strings = np.asarray(date_uniques, dtype=object)[pairs // n_times]
+    time_strings = np.asarray(time_uniques, dtype=object)[pairs % n_times]
+    strings = pd.Index(date_strings).astype(str) + " " + pd.Index(time_strings).astype(str)
+    parsed = pd.DatetimeIndex(pd.to_datetime(strings, format=format, errors=errors))
+    return _broadcast(pair_codes, parsed, dates.index, None)
+
+
+def parse_datetime_columns(df: pd.DataFrame, formats: dict, errors: str = "coerce") -> pd.DataFrame:
+    """Parse each `{column: format}` present in `df` in place (skipping already-parsed columns)."""
+    for col, fmt in formats.items():
+        if col in df.columns and not is_datetime(df[col]):
+            df[col] = parse_datetimes(df[col], format=fmt, errors=errors)
+    return df
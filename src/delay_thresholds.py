@@ -0,0 +1,118 @@
+# src/delay_thresholds.py
+"""
+Delay Threshold Module
+----------------------
+Per-distance-bin ETA quantile thresholds used to label `is_delayed`.
+Thresholds are estimated with mergeable quantile sketches, so they can be
+built chunk by chunk (or per worker and merged), and are persisted as a small
+JSON artifact the inference service loads to report the threshold next to
+each prediction.
+"""
+
+import json
+import numpy as np
+
+from src.quantile_sketch import QuantileSketch
+
+
+class DelayThresholdTable:
+    """Fitted distance-bin edges and their ETA thresholds."""
+
+    def __init__(self, bin_edges, thresholds, quantile: float = 0.75):
+        self.bin_edges = np.asarray(bin_edges, dtype=float)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.quantile = quantile
+        if self.thresholds.size != self.bin_edges.size - 1:
+            raise ValueError("Expected one threshold per distance bin")
+
+    @property
+    def n_bins(self) -> int:
+        return self.thresholds.size
+
+    def bin_index(self, distance_km, clip: bool = False) -> np.ndarray:
+        """
+        Right-closed bin index for each distance (same convention as `pd.cut`).
+        Out-of-range distances get -1, or the nearest bin when `clip=True`.
+        """
+        distance_km = np.asarray(distance_km, dtype=float)
+        idx = np.searchsorted(self.bin_edges, distance_km, side="left") - 1
+        if clip:
+            return np.clip(idx, 0, self.n_bins - 1)
+        idx[(idx < 0) | (idx >= self.n_bins) | np.isnan(distance_km)] = -1
+        return idx
+
+    def lookup(self, distance_km, clip: bool = False) -> np.ndarray:
+        """Delay threshold (minutes) for each distance; NaN when out of range or the bin was empty."""
+        idx = self.bin_index(distance_km, clip=clip)
+        thresholds = np.full(idx.shape, np.nan)
+        valid = idx >= 0
+        thresholds[valid] = self.thresholds[idx[valid]]
+        return thresholds
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({
+                "quantile": self.quantile,
+                "bin_edges": self.bin_edges.tolist(),
+                "thresholds": [None if np.isnan(t) else float(t) for t in self.thresholds],
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "DelayThresholdTable":
+        with open(path) as f:
+            data = json.load(f)
+        thresholds = [np.nan if t is None else t for t in data["thresholds"]]
+        return cls(data["bin_edges"], thresholds, data["quantile"])
+
+
+class DelayThresholdBuilder:
+    """
+    Accumulates one quantile sketch per distance bin.
+
+    Bin edges must be fixed up front (e.g. from a cheap min/max pass over the
+    chunks); after that `update` can be called per chunk and builders from
+    parallel workers combined with `merge`.
+    """
+
+    def __init__(self, bin_edges, quantile: float = 0.75, relative_accuracy: float = 0.005):
+        self.bin_edges = np.asarray(bin_edges, dtype=float)
+        self.quantile = quantile
+        self.sketches = [QuantileSketch(relative_accuracy) for _ in range(self.bin_edges.size - 1)]
+        self._table = DelayThresholdTable(self.bin_edges, np.full(len(self.sketches), np.nan), quantile)
+
+    @staticmethod
+    def equal_width_edges(min_distance: float, max_distance: float, n_bins: int) -> np.ndarray:
+        """Equal-width edges matching `pd.cut(x, bins=n_bins)` for data spanning [min, max]."""
+        if min_distance == max_distance:
+            pad = 0.001 * abs(min_distance) if min_distance != 0 else 0.001
+            return np.linspace(min_distance - pad, max_distance + pad, n_bins + 1)
+        edges = np.linspace(min_distance, max_distance, n_bins + 1)
+        edges[0] -= (max_distance - min_distance) * 0.001
+        return edges
+
+    def update(self, distance_km, eta_target) -> "DelayThresholdBuilder":
+        distance_km = np.asarray(distance_km, dtype=float)
+        eta_target = np.asarray(eta_target, dtype=float)
+        idx = self._table.bin_index(distance_km)
+        valid = idx >= 0
+        idx, eta = idx[valid], eta_target[valid]
+
+        # One sort so each bin's values are a contiguous slice
+        order = np.argsort(idx, kind="stable")
+        idx, eta = idx[order], eta[order]
+        bins, starts = np.unique(idx, return_index=True)
+        ends = np.append(starts[1:], idx.size)
+        for b, start, end in zip(bins, starts, ends):
+            self.sketches[b].update(eta[start:end])
+        return self
+
+    def merge(self, other: "DelayThresholdBuilder") -> "DelayThresholdBuilder":
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise ValueError("Cannot merge builders with different bin edges")
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+        return self
+
+    def build(self) -> DelayThresholdTable:
+        thresholds = [sketch.quantile(self.quantile) for sketch in self.sketches]
+        return DelayThresholdTable(self.bin_edges, thresholds, self.quantile)
@@ -11,6 +11,11 @@ import pandas as pd
 import numpy as np
 from haversine import haversine
 
+from src.delay_thresholds import DelayThresholdBuilder, DelayThresholdTable
+from src.datetime_parsing import parse_datetime_columns, PIPELINE_FORMAT
+
+TIMESTAMP_COLUMNS = ["accept_time", "pickup_time", "delivery_time"]
+
 
 # =====================
 # Abstract Base Class
@@ -30,10 +35,14 @@ class BaseFeatureEngineer(ABC):
 class DeliveryFeatureEngineer(BaseFeatureEngineer):
     """Feature engineering pipeline for delivery datasets."""
 
-    def __init__(self, speed_min=1, speed_max=150, distance_bins=20):
+    def __init__(self, speed_min=1, speed_max=150, distance_bins=20, delay_quantile=0.75,
+                 delay_thresholds: DelayThresholdTable = None):
         self.speed_min = speed_min
         self.speed_max = speed_max
         self.distance_bins = distance_bins
+        self.delay_quantile = delay_quantile
+        # Pass a fitted table to label chunks consistently; otherwise it is fitted in transform()
+        self.delay_thresholds = delay_thresholds
 
     @staticmethod
     def _calculate_haversine_distance(row) -> float:
@@ -47,8 +56,8 @@ class DeliveryFeatureEngineer(BaseFeatureEngineer):
         return df
 
     def _add_time_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        if not np.issubdtype(df["accept_time"].dtype, np.datetime64):
-            df["accept_time"] = pd.to_datetime(df["accept_time"])
+        # Parse every timestamp column once here; later stages see datetime64 and skip parsing
+        parse_datetime_columns(df, {col: PIPELINE_FORMAT for col in TIMESTAMP_COLUMNS}, errors="raise")
 
         df["accept_hour"] = df["accept_time"].dt.hour
         df["accept_day_of_week"] = df["accept_time"].dt.dayofweek
@@ -67,10 +76,21 @@ class DeliveryFeatureEngineer(BaseFeatureEngineer):
         df = df[(df["avg_speed_kmh"] > self.speed_min) & (df["avg_speed_kmh"] < self.speed_max)]
         return df
 
+    def fit_delay_thresholds(self, df: pd.DataFrame) -> DelayThresholdTable:
+        """Fit per-distance-bin ETA thresholds (sketch-based quantiles) on an in-memory frame."""
+        edges = DelayThresholdBuilder.equal_width_edges(
+            df["distance_km"].min(), df["distance_km"].max(), self.distance_bins
+        )
+        builder = DelayThresholdBuilder(edges, quantile=self.delay_quantile)
+        builder.update(df["distance_km"], df["ETA_target"])
+        self.delay_thresholds = builder.build()
+        return self.delay_thresholds
+
     def _add_delay_label(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["distance_bin"] = pd.cut(df["distance_km"], bins=self.distance_bins, labels=False)
-        delay_thresholds = df.groupby("distance_bin")["ETA_target"].quantile(0.75).to_dict()
-        df["delay_threshold"] = df["distance_bin"].map(delay_thresholds)
+        if self.delay_thresholds is None:
+            self.fit_delay_thresholds(df)
+        df["distance_bin"] = self.delay_thresholds.bin_index(df["distance_km"])
+        df["delay_threshold"] = self.delay_thresholds.lookup(df["distance_km"])
         df["is_delayed"] = (df["ETA_target"] > df["delay_threshold"]).astype(int)
         return df
 
@@ -4,29 +4,75 @@ from sklearn.metrics import classification_report, roc_auc_score
 import xgboost as xgb
 import lightgbm as lgb
 
+from src.modeling.latency import benchmark_model, select_model, shrink_to_budget
+
 class ClassificationTrainer:
     """Train and evaluate classification models."""
 
-    def __init__(self):
+    def __init__(self, latency_budget_ms=None, selection="accuracy", accuracy_tolerance=0.01, prune_to_budget=False):
         self.models = {
             'XGBoost': xgb.XGBClassifier(objective='binary:logistic', n_estimators=100, random_state=42),
             'LightGBM': lgb.LGBMClassifier(n_estimators=100, random_state=42, class_weight='balanced')
         }
+        # Serving-latency aware selection (see src/modeling/latency.py)
+        self.latency_budget_ms = latency_budget_ms
+        self.selection = selection
+        self.accuracy_tolerance = accuracy_tolerance
+        self.prune_to_budget = prune_to_budget
+        self.best_model_name = None
+
+    def _evaluate(self, model, X_test, y_test, bench):
+        y_pred_proba = model.predict_proba(X_test)[:, 1]
+        acc = model.score(X_test, y_test)
+        roc = roc_auc_score(y_test, y_pred_proba)
+        return {'model': model, 'accuracy': acc, 'roc_auc': roc, 'latency': benchmark_model(model, *bench)}
 
-    def train_models(self, X_train, y_train, X_test, y_test):
+    def _add_cv_scores(self, results, X_train, y_train, cv):
+        """Rolling-origin CV (src/modeling/cross_validation.py) of every candidate on the training data."""
+        cv_results = cv.evaluate({name: r['model'] for name, r in results.items()}, X_train, y_train, "classification")
+        for name, cv_result in cv_results.items():
+            results[name]['cv'] = cv_result
+            results[name]['cv_roc_auc'] = cv_result['roc_auc_mean']
+            print(f"{name} - CV ROC AUC: {cv_result['roc_auc_mean']:.4f} ± {cv_result['roc_auc_std']:.4f} "
+                  f"over {len(cv_result['folds'])} folds")
+
+    def train_models(self, X_train, y_train, X_test, y_test, cv=None, preprocessor=None, X_test_raw=None,
+                     X_train_raw=None):
+        # Latency is measured on the served Pipeline when the fitted preprocessor and raw test rows are given
+        bench = (X_test_raw, preprocessor) if preprocessor is not None else (X_test,)
         results = {}
         for name, model in self.models.items():
             print(f"Training {name}...")
             model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-            y_pred_proba = model.predict_proba(X_test)[:, 1]
-            acc = model.score(X_test, y_test)
-            roc = roc_auc_score(y_test, y_pred_proba)
-            results[name] = {'model': model, 'accuracy': acc, 'roc_auc': roc}
-            print(f"{name} - Accuracy: {acc:.4f}, ROC AUC: {roc:.4f}")
+            results[name] = self._evaluate(model, X_test, y_test, bench)
+            r = results[name]
+            print(f"{name} - Accuracy: {r['accuracy']:.4f}, ROC AUC: {r['roc_auc']:.4f}, "
+                  f"p95 latency: {r['latency']['single_p95_ms']:.2f}ms")
             if name == 'XGBoost':
-                print("\nClassification Report:\n", classification_report(y_test, y_pred))
+                print("\nClassification Report:\n", classification_report(y_test, model.predict(X_test)))
+
+        if self.prune_to_budget and self.latency_budget_ms is not None:
+            best_name = max(results, key=lambda x: results[x]['roc_auc'])
+            if results[best_name]['latency']['single_p95_ms'] > self.latency_budget_ms:
+                shrunk = shrink_to_budget(results[best_name]['model'], X_train, y_train, bench[0], self.latency_budget_ms,
+                                          preprocessor=preprocessor)
+                if shrunk:
+                    model, _ = shrunk
+                    pruned_name = f"{best_name}_n{model.get_params()['n_estimators']}"
+                    results[pruned_name] = self._evaluate(model, X_test, y_test, bench)
+                    print(f"✂️ {pruned_name} - ROC AUC: {results[pruned_name]['roc_auc']:.4f} (fits latency budget)")
 
-        best_model_name = max(results, key=lambda x: results[x]['roc_auc'])
+        # With folds, select on the mean CV metric instead of the single holdout
+        metric = 'roc_auc'
+        if cv is not None:
+            # Folds with their own preprocessor are cut from the raw training rows
+            self._add_cv_scores(results, X_train_raw if cv.preprocessor is not None else X_train, y_train, cv)
+            # Undefined when every test fold holds a single class
+            if all(np.isfinite(r['cv_roc_auc']) for r in results.values()):
+                metric = 'cv_roc_auc'
+        best_model_name = select_model(results, metric, higher_is_better=True,
+                                       latency_budget_ms=self.latency_budget_ms, selection=self.selection,
+                                       accuracy_tolerance=self.accuracy_tolerance)
+        self.best_model_name = best_model_name
         print(f"✅ Best Classification Model: {best_model_name}")
         return results, results[best_model_name]['model']
@@ -0,0 +1,163 @@
+# src/modeling/cross_validation.py
+"""
+Rolling-origin Cross-Validation
+-------------------------------
+Scores every candidate model on every rolling-origin fold (see
+`DataPreparator.rolling_origin_splits`) in a process pool. The preprocessed
+matrix and target are written once as .npy files (or reused when they are
+already memory-mapped from the dataset cache) and memory-mapped read-only by
+each worker, so only fold index arrays and fitted metrics cross process
+boundaries. Per-candidate mean / std over folds replace the single holdout
+metric for model selection.
+
+Given an unfitted preprocessor, the raw frame is passed instead and a clone is
+fitted on each fold's training rows only, so scaling statistics and one-hot
+categories never come from that fold's test block. Each fold's (train, test)
+matrices are then built once in the parent and shared the same way.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, mean_absolute_error, mean_squared_error, roc_auc_score
+
+logger = logging.getLogger(__name__)
+
+TASK_METRICS = {"regression": ("rmse", "mae"), "classification": ("roc_auc", "accuracy")}
+
+# Set in each worker process by _init_worker
+_worker_X = None
+_worker_y = None
+
+
+def _init_worker(X_paths, y_path):
+    """`X_paths` is one shared matrix, or a (train, test) pair of per-fold preprocessed matrices per fold."""
+    global _worker_X, _worker_y
+    if isinstance(X_paths, str):
+        _worker_X = np.load(X_paths, mmap_mode="r")
+    else:
+        _worker_X = [tuple(np.load(path, mmap_mode="r") for path in paths) for paths in X_paths]
+    _worker_y = np.load(y_path, mmap_mode="r")
+
+
+def _fold_X(X, fold: int, train_idx, test_idx):
+    """(train, test) matrices of a fold: rows of the shared matrix, or that fold's own preprocessed pair."""
+    if isinstance(X, list):
+        return X[fold]
+    return X[train_idx], X[test_idx]
+
+
+def _fold_metrics(model, task: str, X_train, X_test, y_train, y_test) -> dict:
+    model.fit(X_train, y_train)
+    if task == "regression":
+        y_pred = model.predict(X_test)
+        return {"rmse": float(np.sqrt(mean_squared_error(y_test, y_pred))),
+                "mae": float(mean_absolute_error(y_test, y_pred))}
+    proba = model.predict_proba(X_test)[:, 1]
+    # ROC AUC is undefined when a fold's test block has a single class
+    roc = roc_auc_score(y_test, proba) if np.unique(y_test).size > 1 else np.nan
+    return {"roc_auc": float(roc), "accuracy": float(accuracy_score(y_test, model.predict(X_test)))}
+
+
+def _score_fold(name: str, fold: int, model, task: str, train_idx, test_idx):
+    start = time.perf_counter()
+    X_train, X_test = _fold_X(_worker_X, fold, train_idx, test_idx)
+    metrics = _fold_metrics(model, task, X_train, X_test, _worker_y[train_idx], _worker_y[test_idx])
+    return name, fold, metrics, time.perf_counter() - start
+
+
+class RollingOriginCV:
+    """Parallel (candidate × fold) evaluation over shared, memory-mapped training data."""
+
+    def __init__(self, folds: list, workers: int = None, tmp_dir: str = None, preprocessor=None):
+        self.folds = folds
+        self.workers = workers or min(os.cpu_count() or 1, len(folds))
+        self.tmp_dir = tmp_dir
+        # Unfitted template: when set, `evaluate` takes the raw frame and fits a clone per fold
+        self.preprocessor = preprocessor
+        self._fold_cache = (None, None)  # (raw frame, [(X_train, X_test), ...]) reused across tasks
+
+    def _fold_matrices(self, X) -> list:
+        """Per fold (X_train, X_test), from a clone of the preprocessor fitted on that fold's training rows only."""
+        if self._fold_cache[0] is not X:
+            matrices = []
+            for train_idx, test_idx in self.folds:
+                preprocessor = clone(self.preprocessor)
+                matrices.append((preprocessor.fit_transform(X.iloc[train_idx]), preprocessor.transform(X.iloc[test_idx])))
+            self._fold_cache = (X, matrices)
+        return self._fold_cache[1]
+
+    @staticmethod
+    def _npy_path(array, directory: str, name: str) -> str:
+        """Path of a .npy holding `array`: the dataset-cache file it is mapped from, or a fresh one."""
+        filename = getattr(array, "filename", None)
+        if isinstance(array, np.memmap) and filename and str(filename).endswith(".npy"):
+            return str(filename)
+        path = os.path.join(directory, f"{name}.npy")
+        np.save(path, np.asarray(array))
+        return path
+
+    def _threads_per_model(self) -> int:
+        # Boosting libraries default to every core; split them across the worker processes
+        return max(1, (os.cpu_count() or 1) // self.workers)
+
+    def evaluate(self, candidates: dict, X, y, task: str = "regression") -> dict:
+        """
+        Fit a clone of each candidate on every fold and return, per candidate,
+        {"<metric>_mean", "<metric>_std", "folds": [{metric: value, "fit_seconds": s}, ...]}.
+        `X` is the preprocessed matrix, or the raw frame when a preprocessor was given.
+        """
+        if self.preprocessor is not None:
+            X = self._fold_matrices(X)
+        jobs = []
+        for name, model in candidates.items():
+            for k, (train_idx, test_idx) in enumerate(self.folds):
+                fold_model = clone(model)
+                if "n_jobs" in fold_model.get_params():
+                    fold_model.set_params(n_jobs=self._threads_per_model())
+                jobs.append((name, k, fold_model, task, train_idx, test_idx))
+
+        start = time.perf_counter()
+        scored = {name: [None] * len(self.folds) for name in candidates}
+        if self.workers == 1:
+            X_arr, y_arr = X if isinstance(X, list) else np.asarray(X), np.asarray(y)
+            for name, k, model, task_, train_idx, test_idx in jobs:
+                fold_start = time.perf_counter()
+                X_train, X_test = _fold_X(X_arr, k, train_idx, test_idx)
+                metrics = _fold_metrics(model, task_, X_train, X_test, y_arr[train_idx], y_arr[test_idx])
+                scored[name][k] = {**metrics, "fit_seconds": time.perf_counter() - fold_start}
+        else:
+            shared_dir = tempfile.mkdtemp(prefix="cv-", dir=self.tmp_dir)
+            try:
+                if isinstance(X, list):
+                    X_paths = [(self._npy_path(X_train, shared_dir, f"X_train_{k}"),
+                                self._npy_path(X_test, shared_dir, f"X_test_{k}")) for k, (X_train, X_test) in enumerate(X)]
+                else:
+                    X_paths = self._npy_path(X, shared_dir, "X")
+                y_path = self._npy_path(np.asarray(y), shared_dir, "y")
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(X_paths, y_path)) as pool:
+                    futures = [pool.submit(_score_fold, *job) for job in jobs]
+                    for future in futures:
+                        name, k, metrics, seconds = future.result()
+                        scored[name][k] = {**metrics, "fit_seconds": seconds}
+            finally:
+                shutil.rmtree(shared_dir, ignore_errors=True)
+
+        results = {}
+        for name, folds in scored.items():
+            summary = {"folds": folds}
+            for metric in TASK_METRICS[task]:
+                values = np.array([f[metric] for f in folds], dtype=float)
+                summary[f"{metric}_mean"] = float(np.nanmean(values)) if np.isfinite(values).any() else np.nan
+                summary[f"{metric}_std"] = float(np.nanstd(values)) if np.isfinite(values).any() else np.nan
+            results[name] = summary
+        logger.info(f"🔁 Rolling-origin CV: {len(candidates)} candidates × {len(self.folds)} folds "
+                    f"in {time.perf_counter() - start:.1f}s on {self.workers} workers")
+        return results
@@ -1,6 +1,8 @@
 # src/modeling/data_preparation.py
 import pandas as pd
 import numpy as np
+from src.datetime_parsing import parse_datetimes, PIPELINE_FORMAT
+from src.spatial_speed_index import SpatialSpeedIndex, SPEED_INDEX_FEATURES
 
 class DataPreparator:
     """Handles data preparation and feature generation for modeling."""
@@ -12,10 +14,11 @@ class DataPreparator:
         """Generate and return numerical + categorical feature lists and targets."""
         df_model = df.copy()
 
+        # No-op for columns already parsed upstream; CSV round-trips are parsed once per distinct value
         datetime_cols = ['accept_time', 'delivery_time', 'pickup_time']
         for col in datetime_cols:
             if col in df_model.columns:
-                df_model[col] = pd.to_datetime(df_model[col])
+                df_model[col] = parse_datetimes(df_model[col], format=PIPELINE_FORMAT)
 
         # Time-based features
         df_model['accept_hour'] = df_model['accept_time'].dt.hour
@@ -42,6 +45,22 @@ class DataPreparator:
 
         return df_model, numerical_features, categorical_features, y_reg, y_clf
 
+    def build_speed_index(self, train_df: pd.DataFrame, **kwargs) -> SpatialSpeedIndex:
+        """Fit the spatial speed index on the training split only (kwargs: cell_deg, bucket_hours, prior_weight)."""
+        return SpatialSpeedIndex.build(
+            train_df['accept_gps_lat'], train_df['accept_gps_lng'],
+            train_df['delivery_gps_lat'], train_df['delivery_gps_lng'],
+            train_df['accept_time'].dt.hour, train_df['distance_km'], train_df['ETA_target'], **kwargs
+        )
+
+    def add_speed_index_features(self, df: pd.DataFrame, index: SpatialSpeedIndex, leave_one_out=False):
+        """
+        Add historical grid-speed features and return (df, feature names).
+        Use `leave_one_out=True` for the rows the index was built from, so no row sees its own target.
+        """
+        df = index.add_features(df.copy(), leave_one_out=leave_one_out)
+        return df, list(SPEED_INDEX_FEATURES)
+
     def time_based_split(self, df: pd.DataFrame, test_size=0.2):
         """Perform time-based split to prevent lookahead bias."""
         df_sorted = df.sort_values('accept_time').reset_index(drop=True)
@@ -49,3 +68,33 @@ class DataPreparator:
         train_df = df_sorted.iloc[:split_idx]
         test_df = df_sorted.iloc[split_idx:]
         return train_df, test_df
+
+    def rolling_origin_splits(self, df: pd.DataFrame, n_folds=5, test_size=0.1, mode="expanding",
+                              train_size=None, gap=0):
+        """
+        Rolling-origin folds as (train_idx, test_idx) positional index arrays into `df` (no copies).
+
+        The last `n_folds` consecutive blocks of `test_size` rows (a fraction of `df`, or a row
+        count) in accept_time order are the test folds. Each fold trains on the rows before its
+        block, minus `gap` rows: all of them (mode="expanding"), or only the most recent
+        `train_size` rows (mode="rolling"; defaults to the first fold's training size).
+        """
+        if mode not in ("expanding", "rolling"):
+            raise ValueError(f"Unknown fold mode: {mode}")
+        times = df['accept_time'].to_numpy()
+        order = np.arange(len(df)) if df['accept_time'].is_monotonic_increasing else np.argsort(times, kind="stable")
+
+        n_rows = len(df)
+        fold_rows = int(test_size * n_rows) if isinstance(test_size, float) else int(test_size)
+        first_test_start = n_rows - n_folds * fold_rows
+        if fold_rows < 1 or first_test_start - gap < 1:
+            raise ValueError(f"Not enough rows ({n_rows}) for {n_folds} folds of {fold_rows} test rows")
+        train_size = train_size or first_test_start - gap
+
+        folds = []
+        for k in range(n_folds):
+            test_start = first_test_start + k * fold_rows
+            train_end = test_start - gap
+            train_start = 0 if mode == "expanding" else max(0, train_end - train_size)
+            folds.append((order[train_start:train_end], order[test_start:test_start + fold_rows]))
+        return folds
@@ -0,0 +1,125 @@
+# src/modeling/dataset_cache.py
+"""
+Preprocessed Dataset Cache
+--------------------------
+Persists the ColumnTransformer output of a train/test split as .npy files that
+are memory-mapped back on reuse, together with the fitted preprocessor. Entries
+are keyed by a hash of the columns the preprocessor reads (values and dtypes)
+and its (unfitted) definition, so re-running training on unchanged data — to
+try other model settings or candidates — skips preprocessing entirely, and any
+change to those features or the preprocessing produces a new key.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+
+class PreprocessedDatasetCache:
+    """Content-addressed store of (fitted preprocessor, X_train_proc, X_test_proc)."""
+
+    def __init__(self, cache_dir: str = "cache/datasets", max_entries: int = 8):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # =====================
+    # Keys
+    # =====================
+    @staticmethod
+    def _input_columns(preprocessor, df: pd.DataFrame) -> list:
+        """Columns the unfitted ColumnTransformer will read; every column if it passes a remainder through."""
+        if getattr(preprocessor, "remainder", "drop") != "drop":
+            return list(df.columns)
+        columns = []
+        for _, _, selected in preprocessor.transformers:
+            for col in ([selected] if isinstance(selected, str) else selected):
+                if col not in columns:
+                    columns.append(col)
+        return columns
+
+    @staticmethod
+    def _frame_digest(df: pd.DataFrame) -> str:
+        h = hashlib.sha256()
+        h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return h.hexdigest()
+
+    def key(self, preprocessor, X_train: pd.DataFrame, X_test: pd.DataFrame) -> str:
+        """Hash of both splits' preprocessor inputs plus the unfitted preprocessor's definition and the sklearn version."""
+        columns = self._input_columns(preprocessor, X_train)
+        h = hashlib.sha256()
+        h.update(self._frame_digest(X_train[columns]).encode())
+        h.update(self._frame_digest(X_test[columns]).encode())
+        h.update(joblib.hash(preprocessor).encode())
+        h.update(sklearn.__version__.encode())
+        return h.hexdigest()[:32]
+
+    # =====================
+    # Load / Store
+    # =====================
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str):
+        """(fitted preprocessor, X_train_proc, X_test_proc) as read-only memmaps, or None."""
+        entry = self._entry_dir(key)
+        if not os.path.exists(os.path.join(entry, "meta.json")):
+            return None
+        preprocessor = joblib.load(os.path.join(entry, "preprocessor.pkl"))
+        X_train_proc = np.load(os.path.join(entry, "X_train.npy"), mmap_mode="r")
+        X_test_proc = np.load(os.path.join(entry, "X_test.npy"), mmap_mode="r")
+        os.utime(os.path.join(entry, "meta.json"))  # mark as recently used
+        return preprocessor, X_train_proc, X_test_proc
+
+    def store(self, key: str, preprocessor, X_train_proc, X_test_proc):
+        """Write an entry atomically (temp dir + rename) and evict the least recently used ones."""
+        tmp = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        joblib.dump(preprocessor, os.path.join(tmp, "preprocessor.pkl"))
+        np.save(os.path.join(tmp, "X_train.npy"), np.asarray(X_train_proc))
+        np.save(os.path.join(tmp, "X_test.npy"), np.asarray(X_test_proc))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"train_shape": list(np.shape(X_train_proc)), "test_shape": list(np.shape(X_test_proc)),
+                       "sklearn": sklearn.__version__}, f)
+        try:
+            os.rename(tmp, self._entry_dir(key))
+        except OSError:  # another run stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._evict()
+
+    def _evict(self):
+        entries = [
+            os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+            if os.path.exists(os.path.join(self.cache_dir, name, "meta.json"))
+        ]
+        entries.sort(key=lambda path: os.path.getmtime(os.path.join(path, "meta.json")), reverse=True)
+        for stale in entries[self.max_entries:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def fit_transform(self, preprocessor, X_train: pd.DataFrame, X_test: pd.DataFrame):
+        """
+        Cached equivalent of `preprocessor.fit_transform(X_train)` + `transform(X_test)`.
+        Returns (fitted preprocessor, X_train_proc, X_test_proc, key).
+        """
+        key = self.key(preprocessor, X_train, X_test)
+        cached = self.load(key)
+        if cached is not None:
+            logger.info(f"♻️ Dataset cache hit {key}: skipping preprocessing")
+            return (*cached, key)
+
+        X_train_proc = preprocessor.fit_transform(X_train)
+        X_test_proc = preprocessor.transform(X_test)
+        self.store(key, preprocessor, X_train_proc, X_test_proc)
+        logger.info(f"💾 Dataset cache miss {key}: stored preprocessed matrices")
+        return (*self.load(key), key)
@@ -0,0 +1,321 @@
+# src/modeling/eta_surface.py
+"""
+ETA Surface Index
+-----------------
+Precomputes model outputs for hot request "slots" — (city, aoi_type,
+Weather_Label, Traffic_Label, hour, day of week) — over a dense distance grid
+and a coarse grid of the four weather readings, and stores them in compact
+arrays. Every weather cell of a slot is precomputed, so a surface built from
+one request log serves traffic captured at any other time.
+
+Each (slot, weather cell) surface is evaluated at the cell centre. At build
+time the segment midpoints measure the linear-interpolation error, and the cell
+corners (optionally a finer lattice) measure how far the ETA moves within the
+cell. /predict answers by dictionary lookup + interpolation only when the two
+errors together are within tolerance (and the delay class does not flip at any
+checked point), and falls back to full inference otherwise. The checks are
+samples of a tree ensemble, so a split between checked points can still push
+a rare answer past the tolerance.
+
+Build (after each model refresh):
+    python -m src.modeling.eta_surface --requests captured_requests.jsonl --top 2000
+"""
+
+import argparse
+import bisect
+import hashlib
+import itertools
+import json
+import logging
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SURFACE_VERSION = 2
+SLOT_FEATURES = ['city', 'aoi_type', 'Weather_Label', 'Traffic_Label', 'accept_hour', 'accept_dow']
+# Coarse weather grid (inclusive outer edges); readings outside it always go to the model
+WEATHER_BUCKET_EDGES = {
+    'relative_humidity_2m (%)': [0.0, 60.0, 80.0, 100.0],
+    'cloud_cover (%)': [0.0, 50.0, 100.0],
+    'wind_speed_10m (km/h)': [0.0, 15.0, 40.0],
+    'precipitation (mm)': [0.0, 0.5, 10.0],
+}
+
+
+def model_fingerprint(*paths) -> str:
+    """Content hash of the model files; the index is only valid for the models it was built from."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def slot_key(features: dict) -> tuple:
+    """Hashable slot key for one request; hour and day of week come from their cyclical encoding."""
+    hour = round(math.atan2(features['accept_hour_sin'], features['accept_hour_cos']) * 24 / (2 * math.pi)) % 24
+    dow = round(math.atan2(features['accept_dow_sin'], features['accept_dow_cos']) * 7 / (2 * math.pi)) % 7
+    return (str(features['city']), int(features['aoi_type']), str(features['Weather_Label']),
+            str(features['Traffic_Label']), hour, dow)
+
+
+def slot_frame(requests: pd.DataFrame) -> pd.DataFrame:
+    """Vectorised slot columns for a request frame."""
+    return pd.DataFrame({
+        'city': requests['city'].astype(str),
+        'aoi_type': requests['aoi_type'].astype(int),
+        'Weather_Label': requests['Weather_Label'].astype(str),
+        'Traffic_Label': requests['Traffic_Label'].astype(str),
+        'accept_hour': np.rint(np.arctan2(requests['accept_hour_sin'], requests['accept_hour_cos'])
+                               * 24 / (2 * np.pi)).astype(int) % 24,
+        'accept_dow': np.rint(np.arctan2(requests['accept_dow_sin'], requests['accept_dow_cos'])
+                              * 7 / (2 * np.pi)).astype(int) % 7,
+    })
+
+
+def _model_frame(slots: pd.DataFrame, weather: dict) -> pd.DataFrame:
+    """Model input rows for slots (one per row) with the given weather readings."""
+    frame = slots[['city', 'aoi_type', 'Weather_Label', 'Traffic_Label']].reset_index(drop=True)
+    hour, dow = slots['accept_hour'].to_numpy(), slots['accept_dow'].to_numpy()
+    frame['accept_hour_sin'] = np.sin(2 * np.pi * hour / 24)
+    frame['accept_hour_cos'] = np.cos(2 * np.pi * hour / 24)
+    frame['accept_dow_sin'] = np.sin(2 * np.pi * dow / 7)
+    frame['accept_dow_cos'] = np.cos(2 * np.pi * dow / 7)
+    for feature, values in weather.items():
+        frame[feature] = values
+    return frame
+
+
+def _on_distance_grid(inference_pipeline, frame: pd.DataFrame, distances: np.ndarray):
+    """(eta, delay proba) for every frame row × distance, shaped (len(frame), len(distances))."""
+    frame = frame.loc[frame.index.repeat(distances.size)].reset_index(drop=True)
+    frame["distance_km"] = np.tile(distances, len(frame) // distances.size)
+    shape = (-1, distances.size)
+    # predict() would run the classifier a second time; the delay side is thresholded from the proba
+    return (inference_pipeline.predict_eta(frame).reshape(shape),
+            inference_pipeline.predict_delay_proba(frame).reshape(shape))
+
+
+class ETASurfaceIndex:
+    """Array-backed ETA / delay-probability surfaces over distance, one row per (slot, weather cell)."""
+
+    def __init__(self, slots: pd.DataFrame, distance_grid, eta, delay_proba, eta_error, delay_stable,
+                 weather_error, fingerprint: str, weather_edges: dict = None):
+        self.slots = slots.reset_index(drop=True)
+        self.distance_grid = np.asarray(distance_grid, dtype=float)
+        self.eta = np.asarray(eta, dtype=np.float32)
+        self.delay_proba = np.asarray(delay_proba, dtype=np.float32)
+        self.eta_error = np.asarray(eta_error, dtype=np.float32)
+        self.delay_stable = np.asarray(delay_stable, dtype=bool)
+        self.weather_error = np.asarray(weather_error, dtype=np.float32)
+        self.fingerprint = fingerprint
+        self.weather_edges = weather_edges or WEATHER_BUCKET_EDGES
+
+        self._grid = self.distance_grid.tolist()  # bisect on a list beats numpy for one scalar
+        self._edges = [list(edges) for edges in self.weather_edges.values()]
+        self._n_cells = int(np.prod([len(edges) - 1 for edges in self._edges]))
+        self._slot_index = {
+            key: i for i, key in enumerate(self.slots[SLOT_FEATURES].itertuples(index=False, name=None))
+        }
+
+    def __len__(self):
+        return len(self._slot_index)
+
+    def weather_cell(self, features: dict):
+        """Row offset of the request's weather cell within its slot, or None outside the grid."""
+        cell = 0
+        for feature, edges in zip(self.weather_edges, self._edges):
+            value = float(features[feature])
+            if not edges[0] <= value <= edges[-1]:
+                return None
+            cell = cell * (len(edges) - 1) + min(bisect.bisect_right(edges, value) - 1, len(edges) - 2)
+        return cell
+
+    # =====================
+    # Build
+    # =====================
+    @classmethod
+    def build(cls, inference_pipeline, slots: pd.DataFrame, distance_grid, fingerprint: str,
+              weather_edges: dict = None, weather_checks: int = 1, batch_slots: int = 64):
+        """
+        For every slot × weather cell, evaluate both models over the distance grid at the cell
+        centre, plus each segment midpoint (interpolation error). A check lattice (cell corners,
+        each cell split `weather_checks` times per axis) is scored at the grid distances once per
+        slot; the largest ETA change from a cell's centre to its lattice points is the cell's
+        weather error, and no lattice point may flip the delay class.
+        """
+        weather_edges = weather_edges or WEATHER_BUCKET_EDGES
+        features = list(weather_edges)
+        edges = [np.asarray(weather_edges[f], dtype=float) for f in features]
+        # Check lattice: every cell split `weather_checks` times per axis, shared between neighbours
+        lattice = [np.concatenate([np.linspace(lo, hi, weather_checks + 1)[:-1] for lo, hi in zip(e[:-1], e[1:])] + [e[-1:]])
+                   for e in edges]
+        n_lattice = [v.size for v in lattice]
+        slots = slots[SLOT_FEATURES].drop_duplicates().reset_index(drop=True)
+        grid = np.asarray(distance_grid, dtype=float)
+        midpoints = (grid[:-1] + grid[1:]) / 2
+        n_grid = grid.size
+
+        cells = list(itertools.product(*(range(e.size - 1) for e in edges)))
+        points = list(itertools.product(*(range(n) for n in n_lattice)))
+
+        parts = []
+        for start in range(0, len(slots), batch_slots):
+            batch = slots.iloc[start:start + batch_slots].reset_index(drop=True)
+            n = len(batch)
+            # Rows ordered slot-major, then cell / lattice point
+            per_cell = batch.loc[batch.index.repeat(len(cells))]
+            centre_eta, centre_proba = _on_distance_grid(inference_pipeline, _model_frame(per_cell, {
+                f: np.tile([(edges[j][c[j]] + edges[j][c[j] + 1]) / 2 for c in cells], n) for j, f in enumerate(features)
+            }), np.concatenate([grid, midpoints]))
+            per_point = batch.loc[batch.index.repeat(len(points))]
+            point_eta, point_proba = _on_distance_grid(inference_pipeline, _model_frame(per_point, {
+                f: np.tile([lattice[j][p[j]] for p in points], n) for j, f in enumerate(features)
+            }), grid)
+            point_eta = point_eta.reshape(n, *n_lattice, n_grid)
+            point_side = point_proba.reshape(n, *n_lattice, n_grid) > 0.5
+
+            centre_eta = centre_eta.reshape(n, len(cells), -1)
+            centre_side = centre_proba.reshape(n, len(cells), -1)[:, :, :n_grid] > 0.5
+            weather_err = np.empty((n, len(cells), n_grid))
+            checks_agree = np.empty((n, len(cells), n_grid), dtype=bool)
+            axes = tuple(range(1, len(features) + 1))
+            for k, cell in enumerate(cells):
+                box = (slice(None),) + tuple(slice(c * weather_checks, (c + 1) * weather_checks + 1) for c in cell)
+                centre = centre_eta[:, k, :n_grid].reshape(n, *([1] * len(features)), n_grid)
+                weather_err[:, k] = np.abs(point_eta[box] - centre).max(axis=axes)
+                side = centre_side[:, k].reshape(n, *([1] * len(features)), n_grid)
+                checks_agree[:, k] = (point_side[box] == side).all(axis=axes)
+            parts.append((centre_eta.reshape(n * len(cells), -1), centre_proba.reshape(n * len(cells), -1),
+                          weather_err.reshape(n * len(cells), -1), checks_agree.reshape(n * len(cells), -1)))
+
+        eta_all, proba_all = np.vstack([p[0] for p in parts]), np.vstack([p[1] for p in parts])
+        point_weather_error, checks_agree = np.vstack([p[2] for p in parts]), np.vstack([p[3] for p in parts])
+        eta, eta_mid = eta_all[:, :n_grid], eta_all[:, n_grid:]
+        proba, proba_mid = proba_all[:, :n_grid], proba_all[:, n_grid:]
+
+        eta_error = np.abs((eta[:, :-1] + eta[:, 1:]) / 2 - eta_mid)
+        # The delay class must not flip anywhere we checked inside the segment or the weather cell
+        side = proba > 0.5
+        delay_stable = ((side[:, :-1] == side[:, 1:]) & (side[:, :-1] == (proba_mid > 0.5))
+                        & checks_agree[:, :-1] & checks_agree[:, 1:])
+        weather_error = np.maximum(point_weather_error[:, :-1], point_weather_error[:, 1:])
+
+        logger.info(
+            f"📐 Built ETA surface: {len(slots)} slots × {len(cells)} weather cells × {n_grid} distances, "
+            f"median interpolation error {np.median(eta_error):.4f} min, "
+            f"median weather-cell error {np.median(weather_error):.4f} min"
+        )
+        return cls(slots, grid, eta, proba, eta_error, delay_stable, weather_error, fingerprint, weather_edges)
+
+    # =====================
+    # Lookup
+    # =====================
+    def lookup(self, features: dict, tolerance: float):
+        """
+        Return (eta, delay) by interpolation, or None if the request is outside the distance or
+        weather grid, its slot is unknown, or the segment's interpolation plus weather-cell
+        error exceeds `tolerance` minutes.
+        """
+        slot = self._slot_index.get(slot_key(features))
+        if slot is None:
+            return None
+        cell = self.weather_cell(features)
+        if cell is None:
+            return None
+        row = slot * self._n_cells + cell
+
+        distance = float(features["distance_km"])
+        grid = self._grid
+        if not grid[0] <= distance <= grid[-1]:
+            return None
+
+        seg = min(bisect.bisect_right(grid, distance) - 1, len(grid) - 2)
+        if self.eta_error[row, seg] + self.weather_error[row, seg] > tolerance or not self.delay_stable[row, seg]:
+            return None
+
+        w = (distance - grid[seg]) / (grid[seg + 1] - grid[seg])
+        eta = (1 - w) * float(self.eta[row, seg]) + w * float(self.eta[row, seg + 1])
+        proba = (1 - w) * float(self.delay_proba[row, seg]) + w * float(self.delay_proba[row, seg + 1])
+        return eta, int(proba > 0.5)
+
+    # =====================
+    # Persistence
+    # =====================
+    def save(self, path: str):
+        arrays = {f"slot::{col}": self.slots[col].to_numpy(dtype=np.int64 if col in ('aoi_type', 'accept_hour', 'accept_dow') else str)
+                  for col in SLOT_FEATURES}
+        np.savez_compressed(
+            path,
+            distance_grid=self.distance_grid,
+            eta=self.eta,
+            delay_proba=self.delay_proba,
+            eta_error=self.eta_error,
+            delay_stable=self.delay_stable,
+            weather_error=self.weather_error,
+            meta=np.array(json.dumps({"version": SURFACE_VERSION, "fingerprint": self.fingerprint,
+                                      "weather_edges": self.weather_edges})),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ETASurfaceIndex":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != SURFACE_VERSION:
+                raise ValueError(f"ETA surface format {meta.get('version')} is outdated; rebuild it")
+            slots = pd.DataFrame({col: data[f"slot::{col}"] for col in SLOT_FEATURES})
+            for col in ('city', 'Weather_Label', 'Traffic_Label'):
+                slots[col] = slots[col].astype(object)
+            return cls(slots, data["distance_grid"], data["eta"], data["delay_proba"], data["eta_error"],
+                       data["delay_stable"], data["weather_error"], meta["fingerprint"], meta["weather_edges"])
+
+
+def hot_slots(requests: pd.DataFrame, top: int) -> pd.DataFrame:
+    """The `top` most frequent slots in a request log."""
+    counts = slot_frame(requests).groupby(SLOT_FEATURES).size().sort_values(ascending=False)
+    return counts.head(top).index.to_frame(index=False)
+
+
+def read_request_log(path: str) -> pd.DataFrame:
+    """Request log as a frame: CSV, or JSONL of payloads (optionally wrapped as {"body": ...})."""
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return pd.DataFrame([r["body"] if "body" in r else r for r in records])
+
+
+def build_surface_index(request_log: str, out_path="models/eta_surface.npz", top=5000,
+                        min_distance=0.05, max_distance=30.0, n_distances=96,
+                        reg_path="models/best_regression_pipeline.pkl",
+                        clf_path="models/best_classification_pipeline.pkl") -> ETASurfaceIndex:
+    """Rebuild the index for the current model version from a captured request log."""
+    from src.modeling.inference_pipeline import InferencePipeline
+
+    pipeline = InferencePipeline(reg_path=reg_path, clf_path=clf_path)
+    slots = hot_slots(read_request_log(request_log), top)
+    grid = np.geomspace(min_distance, max_distance, n_distances)
+    index = ETASurfaceIndex.build(pipeline, slots, grid, model_fingerprint(*pipeline.model_files()))
+    index.save(out_path)
+    logger.info(f"💾 Saved ETA surface index ({len(index)} slots) to {out_path}")
+    return index
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    parser = argparse.ArgumentParser(description="Precompute the ETA surface index for hot request slots.")
+    parser.add_argument("--requests", required=True, help="Captured request log (CSV or JSONL)")
+    parser.add_argument("--out", default="models/eta_surface.npz")
+    parser.add_argument("--top", type=int, default=5000, help="Number of most frequent slots to index")
+    parser.add_argument("--min-distance", type=float, default=0.05)
+    parser.add_argument("--max-distance", type=float, default=30.0)
+    parser.add_argument("--n-distances", type=int, default=96)
+    args = parser.parse_args()
+
+    build_surface_index(args.requests, args.out, args.top, args.min_distance, args.max_distance, args.n_distances)
@@ -1,18 +1,93 @@
+import os
 import joblib
+import numpy as np
 import pandas as pd
 
+from src.delay_thresholds import DelayThresholdTable
+from src.modeling.model_shards import ShardedModelStore
+from src.spatial_speed_index import SpatialSpeedIndex, SPEED_INDEX_FEATURES, uses_speed_index
+
 class InferencePipeline:
     """Loads trained pipeline and predicts on new data."""
 
     def __init__(self, reg_path="models/best_regression_pipeline.pkl",
-                 clf_path="models/best_classification_pipeline.pkl"):
+                 clf_path="models/best_classification_pipeline.pkl",
+                 threshold_path="models/delay_thresholds.json",
+                 speed_index_path="models/spatial_speed_index.npz",
+                 shard_manifest_path="models/shards/manifest.json", max_shard_bytes=512 * 2 ** 20):
+        self.reg_path, self.clf_path = reg_path, clf_path
         self.reg_pipeline = joblib.load(reg_path)
         self.clf_pipeline = joblib.load(clf_path)
+        # Optional artifact written by training; predictions still work without it
+        self.delay_thresholds = DelayThresholdTable.load(threshold_path) if threshold_path and os.path.exists(threshold_path) else None
+        # Required only by models trained with grid-speed features
+        self.speed_index = None
+        if uses_speed_index(self.reg_pipeline) or uses_speed_index(self.clf_pipeline):
+            self.speed_index = SpatialSpeedIndex.load(speed_index_path)
+        # Optional per-city shards, loaded on first use; the global pipelines are the fallback
+        self.shards = None
+        if shard_manifest_path and os.path.exists(shard_manifest_path):
+            self.shards = ShardedModelStore(shard_manifest_path, max_bytes=max_shard_bytes)
+
+    def model_files(self) -> list:
+        """Files that define the served model version (for fingerprints of derived artifacts)."""
+        return [self.reg_path, self.clf_path] + (self.shards.files() if self.shards else [])
+
+    def _with_features(self, df_new: pd.DataFrame) -> pd.DataFrame:
+        if self.speed_index is not None and SPEED_INDEX_FEATURES[0] not in df_new.columns:
+            # Looked up from optional request coordinates; the hour-bucket average without them
+            df_new = self.speed_index.add_features(df_new.copy())
+        return df_new
+
+    def _routed(self, df: pd.DataFrame, kind: str, fallback, method: str = "predict") -> np.ndarray:
+        """
+        Call `method` once per shard on that shard's rows, and once on the global pipeline
+        for every row whose shard value has no shard of this kind.
+        """
+        if self.shards is None or self.shards.shard_by not in df.columns:
+            return getattr(fallback, method)(df)
+
+        codes, values = pd.factorize(df[self.shards.shard_by].astype(str))
+        models = [self.shards.get(value, kind) for value in values]
+        if len(values) == 1:  # the single-request path
+            return getattr(models[0] or fallback, method)(df)
+
+        groups = [(model, np.flatnonzero(codes == i)) for i, model in enumerate(models) if model is not None]
+        global_rows = np.flatnonzero(np.isin(codes, [i for i, model in enumerate(models) if model is None]))
+        if global_rows.size:
+            groups.append((fallback, global_rows))
+        preds = [(rows, getattr(model, method)(df.iloc[rows])) for model, rows in groups]
+        # Shards may disagree on dtype (e.g. float32 vs float64 ETAs); keep the widest, never truncate
+        out = np.empty((len(df),) + preds[0][1].shape[1:], dtype=np.result_type(*(pred for _, pred in preds)))
+        for rows, pred in preds:
+            out[rows] = pred
+        return out
 
     def predict(self, df_new: pd.DataFrame):
-        reg_pred = self.reg_pipeline.predict(df_new)
-        clf_pred = self.clf_pipeline.predict(df_new)
-        return {
+        df_new = self._with_features(df_new)
+        reg_pred = self._routed(df_new, "regression", self.reg_pipeline)
+        clf_pred = self._routed(df_new, "classification", self.clf_pipeline)
+        preds = {
             "ETA_Prediction": reg_pred,
             "Delay_Prediction": clf_pred
         }
+        if self.delay_thresholds is not None:
+            preds["Delay_Threshold"] = self.delay_threshold(df_new["distance_km"])
+        return preds
+
+    def predict_eta(self, df_new: pd.DataFrame) -> np.ndarray:
+        """ETA for each row (same routing as `predict`), without running the classifier."""
+        return self._routed(self._with_features(df_new), "regression", self.reg_pipeline)
+
+    def predict_delay_proba(self, df_new: pd.DataFrame) -> np.ndarray:
+        """Probability of the delayed class for each row (same routing as `predict`)."""
+        return self._routed(self._with_features(df_new), "classification", self.clf_pipeline, "predict_proba")[:, 1]
+
+    def shard_stats(self) -> dict:
+        return self.shards.stats() if self.shards else {"enabled": False}
+
+    def delay_threshold(self, distance_km):
+        """Delay threshold (minutes) for each distance, or None when no threshold table is loaded."""
+        if self.delay_thresholds is None:
+            return None
+        return self.delay_thresholds.lookup(distance_km, clip=True)
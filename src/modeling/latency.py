@@ -0,0 +1,119 @@
+# src/modeling/latency.py
+"""
+Serving-latency benchmarks and latency-aware model selection shared by the
+regression and classification trainers. Candidates are timed as they are
+served: the fitted preprocessor + model Pipeline on raw feature rows.
+"""
+
+import pickle
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+
+def benchmark_model(model, X, preprocessor=None, n_single: int = 100, batch_size: int = 1000,
+                    repeats: int = 3) -> dict:
+    """
+    Measure single-row and batch `predict` latency plus serialized size of a fitted model.
+    With a fitted `preprocessor`, `X` holds raw rows and the served Pipeline (preprocessing
+    included) is timed; without one, only the bare estimator on already-transformed `X`.
+    """
+    if preprocessor is not None:
+        model = Pipeline([("preprocessor", preprocessor), ("model", model)])
+    else:
+        X = np.asarray(X)
+    rows = X.iloc if hasattr(X, "iloc") else X
+    n_single = min(n_single, len(X))
+    model.predict(rows[:1])  # warm-up (lazy initialisation inside the libraries)
+
+    single = []
+    for i in range(n_single):
+        row = rows[i:i + 1]
+        start = time.perf_counter()
+        model.predict(row)
+        single.append((time.perf_counter() - start) * 1000)
+
+    batch = rows[:batch_size]
+    batch_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(batch)
+        batch_times.append((time.perf_counter() - start) * 1000)
+    batch_ms = float(np.median(batch_times))
+
+    return {
+        "single_p50_ms": float(np.percentile(single, 50)),
+        "single_p95_ms": float(np.percentile(single, 95)),
+        "batch_ms": batch_ms,
+        "batch_rows": len(batch),
+        "batch_us_per_row": batch_ms * 1000 / max(len(batch), 1),
+        "size_kb": len(pickle.dumps(model)) / 1024,
+    }
+
+
+def pareto_front(results: dict, metric: str, higher_is_better: bool, latency_key: str = "single_p95_ms") -> list:
+    """Names of candidates not dominated on (metric, latency)."""
+    sign = 1 if higher_is_better else -1
+    points = {name: (sign * r[metric], r["latency"][latency_key]) for name, r in results.items()}
+    front = []
+    for name, (score, latency) in points.items():
+        dominated = any(
+            other_score >= score and other_latency <= latency and (other_score, other_latency) != (score, latency)
+            for other, (other_score, other_latency) in points.items() if other != name
+        )
+        if not dominated:
+            front.append(name)
+    return front
+
+
+def select_model(results: dict, metric: str, higher_is_better: bool, latency_budget_ms: float = None,
+                 selection: str = "accuracy", accuracy_tolerance: float = 0.01,
+                 latency_key: str = "single_p95_ms") -> str:
+    """
+    Pick a candidate name.
+
+    - Candidates over `latency_budget_ms` (on `latency_key`) are excluded when any fit the budget.
+    - selection="accuracy": best metric among the eligible candidates.
+    - selection="pareto": fastest Pareto-optimal candidate whose metric is within
+      `accuracy_tolerance` (relative) of the best eligible one.
+    """
+    eligible = results
+    if latency_budget_ms is not None:
+        within = {n: r for n, r in results.items() if r["latency"][latency_key] <= latency_budget_ms}
+        if within:
+            eligible = within
+
+    best_fn = max if higher_is_better else min
+    best_name = best_fn(eligible, key=lambda n: eligible[n][metric])
+    if selection == "accuracy":
+        return best_name
+    if selection != "pareto":
+        raise ValueError(f"Unknown selection mode: {selection}")
+
+    best_score = eligible[best_name][metric]
+    slack = abs(best_score) * accuracy_tolerance
+    near_best = [
+        n for n in pareto_front(eligible, metric, higher_is_better, latency_key)
+        if (eligible[n][metric] >= best_score - slack if higher_is_better else eligible[n][metric] <= best_score + slack)
+    ]
+    return min(near_best, key=lambda n: eligible[n]["latency"][latency_key])
+
+
+def shrink_to_budget(model, X_train, y_train, X_bench, latency_budget_ms: float,
+                     latency_key: str = "single_p95_ms", min_estimators: int = 10, preprocessor=None):
+    """
+    Refit with halved `n_estimators` until the benchmark fits the budget.
+    Returns (model, latency) for the first fit that does, or None.
+    `X_bench` and `preprocessor` are passed to `benchmark_model`.
+    """
+    n_estimators = model.get_params()["n_estimators"]
+    while n_estimators > min_estimators:
+        n_estimators = max(n_estimators // 2, min_estimators)
+        smaller = clone(model).set_params(n_estimators=n_estimators)
+        smaller.fit(X_train, y_train)
+        latency = benchmark_model(smaller, X_bench, preprocessor)
+        if latency[latency_key] <= latency_budget_ms:
+            return smaller, latency
+    return None
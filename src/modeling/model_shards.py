@@ -0,0 +1,113 @@
+# src/modeling/model_shards.py
+"""
+Model Shards
+------------
+Optional per-city (or per-region) pipelines trained next to the global models.
+Training writes each shard's pickles under `models/shards/` plus a manifest;
+a shard only exists for the models that beat the global pipeline on that
+city's holdout, so every other request keeps using the global model.
+
+At serving time shards are loaded lazily on first use and kept in an LRU whose
+budget is the total on-disk pickle size of the loaded shards. That is a proxy
+for, not a measure of, resident memory (unpickled models are usually larger),
+but it grows with the shards in use rather than with the number of cities.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+SHARD_KINDS = ("regression", "classification")
+
+
+class ShardedModelStore:
+    """
+    Lazy LRU over the shard pipelines listed in a manifest, bounded by `max_bytes`
+    of on-disk pickle size (the manifest's "bytes"), not by resident memory.
+    """
+
+    def __init__(self, manifest_path: str, max_bytes: int = 512 * 2 ** 20):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.manifest_path = manifest_path
+        self.shard_by = manifest["shard_by"]
+        self.shards = manifest["shards"]  # {value: {"regression": {"path", "bytes"}, "classification": ...}}
+        self.max_bytes = max_bytes
+        self._base_dir = os.path.dirname(manifest_path)
+        self._loaded = OrderedDict()  # (value, kind) -> (pipeline, bytes)
+        self._loading = {}            # (value, kind) -> Future of a load in progress
+        self._lock = threading.Lock()
+        self.loaded_bytes = 0
+        self.hits = self.loads = self.evictions = 0
+
+    def __len__(self):
+        return len(self.shards)
+
+    def files(self) -> list:
+        """The manifest plus every shard pickle it lists; together they define the sharded model version."""
+        return [self.manifest_path] + [
+            os.path.join(self._base_dir, entry[kind]["path"])
+            for _, entry in sorted(self.shards.items()) for kind in SHARD_KINDS if kind in entry
+        ]
+
+    def get(self, value, kind: str):
+        """Shard pipeline for a `shard_by` value, or None when that value uses the global model."""
+        entry = self.shards.get(str(value), {}).get(kind)
+        if entry is None:
+            return None
+        key = (str(value), kind)
+        with self._lock:
+            cached = self._loaded.get(key)
+            if cached is not None:
+                self._loaded.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            pending = self._loading.get(key)
+            if pending is None:
+                # Reserve the load so concurrent requests for this shard wait instead of loading it again
+                reservation = self._loading[key] = Future()
+        if pending is not None:
+            return pending.result()
+
+        # Unpickling can take a while; other shards stay servable meanwhile
+        try:
+            pipeline = joblib.load(os.path.join(self._base_dir, entry["path"]))
+        except Exception as e:
+            with self._lock:
+                del self._loading[key]
+            reservation.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[key]
+            self.loads += 1
+            self._loaded[key] = (pipeline, entry["bytes"])
+            self.loaded_bytes += entry["bytes"]
+            # Always keep the shard just loaded, even if it alone exceeds the budget
+            while self.loaded_bytes > self.max_bytes and len(self._loaded) > 1:
+                (evicted_value, evicted_kind), (_, size) = self._loaded.popitem(last=False)
+                self.loaded_bytes -= size
+                self.evictions += 1
+                logger.info(f"♻️ Evicted {evicted_kind} shard '{evicted_value}' ({size / 2 ** 20:.1f} MiB)")
+        reservation.set_result(pipeline)
+        return pipeline
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "shard_by": self.shard_by,
+                "shards": len(self.shards),
+                "loaded": [f"{value}/{kind}" for value, kind in self._loaded],
+                "loaded_bytes": self.loaded_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
@@ -1,15 +1,26 @@
 import os
+import re
+import json
+import shutil
 import logging
 import mlflow
 import mlflow.sklearn
 import joblib
+import numpy as np
 import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score, roc_auc_score
 from sklearn.pipeline import Pipeline
 
 from src.modeling.data_preparation import DataPreparator
 from src.modeling.preprocessing import PreprocessorFactory
 from src.modeling.regression_models import RegressionTrainer
 from src.modeling.classification_models import ClassificationTrainer
+from src.modeling.dataset_cache import PreprocessedDatasetCache
+from src.modeling.cross_validation import RollingOriginCV
+from src.modeling.latency import benchmark_model
+from src.serving.drift import DriftReference
+from src.spatial_speed_index import SpatialSpeedIndex, uses_speed_index
 
 
 # =====================
@@ -32,13 +43,36 @@ logger = logging.getLogger(__name__)
 class ModelingPipeline:
     """End-to-end ML modeling pipeline with preprocessing, model saving, and MLflow tracking."""
 
-    def __init__(self, experiment_name="ETA_Delay_Prediction"):
+    def __init__(self, experiment_name="ETA_Delay_Prediction", model_dir="models",
+                 latency_budget_ms=None, selection="accuracy", prune_to_budget=False,
+                 metadata_path="model_metadata.json", dataset_cache_dir=None, speed_index_cell_deg=None,
+                 shard_by=None, min_shard_rows=1000, cv_folds=None, cv_mode="expanding", cv_workers=None):
+        if cv_folds and speed_index_cell_deg:
+            # The speed index is built on the whole training split, so every fold's features would see its test block
+            raise ValueError("cv_folds cannot be combined with speed_index_cell_deg: "
+                             "the speed index leaks future training rows into rolling-origin folds")
         self.preparator = DataPreparator()
-        self.reg_trainer = RegressionTrainer()
-        self.clf_trainer = ClassificationTrainer()
+        selection_kwargs = dict(latency_budget_ms=latency_budget_ms, selection=selection, prune_to_budget=prune_to_budget)
+        self.reg_trainer = RegressionTrainer(**selection_kwargs)
+        self.clf_trainer = ClassificationTrainer(**selection_kwargs)
+        self.model_dir = model_dir
+        self.metadata_path = metadata_path
+        # Optional: reuse preprocessed train/test matrices across runs on unchanged data
+        self.dataset_cache = PreprocessedDatasetCache(dataset_cache_dir) if dataset_cache_dir else None
+        # Optional: historical cell-pair × hour speed features (grid cell size in degrees)
+        self.speed_index_cell_deg = speed_index_cell_deg
+        self.speed_index_path = os.path.join(model_dir, "spatial_speed_index.npz")
+        # Optional: per-value shards of `shard_by` (e.g. "city") with the global models as fallback
+        self.shard_by = shard_by
+        self.min_shard_rows = min_shard_rows
+        self.shard_dir = os.path.join(model_dir, "shards")
+        # Optional: select models on rolling-origin CV over the training split instead of one holdout
+        self.cv_folds = cv_folds
+        self.cv_mode = cv_mode
+        self.cv_workers = cv_workers
 
         # Ensure model directory exists
-        os.makedirs("models", exist_ok=True)
+        os.makedirs(self.model_dir, exist_ok=True)
 
         # Initialize MLflow
         mlflow.set_tracking_uri("file:./mlruns")
@@ -53,6 +87,17 @@ class ModelingPipeline:
 
         # === Step 2: Split ===
         train_df, test_df = self.preparator.time_based_split(df_model)
+        drift_features = list(num_features)  # request-level features only
+
+        # === Step 2b: Spatial speed index (fitted on the training split only) ===
+        if self.speed_index_cell_deg:
+            speed_index = self.preparator.build_speed_index(train_df, cell_deg=self.speed_index_cell_deg)
+            train_df, speed_features = self.preparator.add_speed_index_features(train_df, speed_index, leave_one_out=True)
+            test_df, _ = self.preparator.add_speed_index_features(test_df, speed_index)
+            num_features = num_features + speed_features
+            speed_index.save(self.speed_index_path)
+            logger.info(f"🗺️ Spatial speed index: {len(speed_index)} cell pairs saved at {self.speed_index_path}")
+
         X_train = train_df.drop(['ETA_target', 'is_delayed'], axis=1)
         X_test = test_df.drop(['ETA_target', 'is_delayed'], axis=1)
         y_reg_train, y_reg_test = train_df['ETA_target'], test_df['ETA_target']
@@ -61,22 +106,48 @@ class ModelingPipeline:
 
         # === Step 3: Preprocessing ===
         preprocessor = PreprocessorFactory.create_preprocessor(num_features, cat_features)
-        X_train_proc = preprocessor.fit_transform(X_train)
-        X_test_proc = preprocessor.transform(X_test)
+        dataset_key = None
+        if self.dataset_cache:
+            preprocessor, X_train_proc, X_test_proc, dataset_key = self.dataset_cache.fit_transform(
+                preprocessor, X_train, X_test
+            )
+        else:
+            X_train_proc = preprocessor.fit_transform(X_train)
+            X_test_proc = preprocessor.transform(X_test)
         logger.info("Preprocessing pipeline fitted successfully.")
 
+        # === Step 3b: Rolling-origin folds (index arrays into the time-sorted training split) ===
+        cv = None
+        if self.cv_folds:
+            folds = self.preparator.rolling_origin_splits(train_df, n_folds=self.cv_folds, mode=self.cv_mode)
+            # A fresh preprocessor is fitted per fold, so no fold sees statistics of its own test block
+            cv = RollingOriginCV(folds, workers=self.cv_workers,
+                                 preprocessor=PreprocessorFactory.create_preprocessor(num_features, cat_features))
+            logger.info(f"🔁 {self.cv_folds} {self.cv_mode} folds, {len(folds[0][1])} test rows each")
+
         # === Step 4: Train & Save Models (MLflow Tracking) ===
         with mlflow.start_run(run_name="Regression_and_Classification_Pipeline"):
             logger.info("MLflow tracking started.")
+            if dataset_key:
+                mlflow.log_param("dataset_cache_key", dataset_key)
+            if cv:
+                mlflow.log_param("cv_folds", self.cv_folds)
+                mlflow.log_param("cv_mode", self.cv_mode)
+            if self.speed_index_cell_deg:
+                mlflow.log_param("speed_index_cell_deg", self.speed_index_cell_deg)
+                mlflow.log_artifact(self.speed_index_path)
 
             # ---- Regression ----
             reg_results, best_reg_model = self.reg_trainer.train_models(
-                X_train_proc, y_reg_train, X_test_proc, y_reg_test
+                X_train_proc, y_reg_train, X_test_proc, y_reg_test, cv=cv,
+                preprocessor=preprocessor, X_test_raw=X_test, X_train_raw=X_train
             )
-            best_reg = list(reg_results.keys())[0]
+            best_reg = self.reg_trainer.best_model_name
             mlflow.log_param("best_regression_model", best_reg)
             mlflow.log_metric("reg_RMSE", reg_results[best_reg]['rmse'])
             mlflow.log_metric("reg_MAE", reg_results[best_reg]['mae'])
+            self._log_latency("reg", reg_results)
+            self._log_cv("reg", reg_results)
 
             # Combine preprocessor + model into one pipeline
             reg_pipeline = Pipeline([
@@ -85,7 +156,7 @@ class ModelingPipeline:
             ])
 
             # Save locally
-            reg_path = os.path.join("models", "best_regression_pipeline.pkl")
+            reg_path = os.path.join(self.model_dir, "best_regression_pipeline.pkl")
             joblib.dump(reg_pipeline, reg_path)
             mlflow.log_artifact(reg_path)
             mlflow.sklearn.log_model(best_reg_model, "best_regression_model")
@@ -94,12 +165,15 @@ class ModelingPipeline:
 
             # ---- Classification ----
             clf_results, best_clf_model = self.clf_trainer.train_models(
-                X_train_proc, y_clf_train, X_test_proc, y_clf_test
+                X_train_proc, y_clf_train, X_test_proc, y_clf_test, cv=cv,
+                preprocessor=preprocessor, X_test_raw=X_test, X_train_raw=X_train
             )
-            best_clf = list(clf_results.keys())[0]
+            best_clf = self.clf_trainer.best_model_name
             mlflow.log_param("best_classification_model", best_clf)
             mlflow.log_metric("clf_ROC_AUC", clf_results[best_clf]['roc_auc'])
             mlflow.log_metric("clf_Accuracy", clf_results[best_clf]['accuracy'])
+            self._log_latency("clf", clf_results)
+            self._log_cv("clf", clf_results)
 
             # Combine preprocessor + model
             clf_pipeline = Pipeline([
@@ -109,14 +183,394 @@ class ModelingPipeline:
 
 
             # Save locally
-            clf_path = os.path.join("models", "best_classification_pipeline.pkl")
+            clf_path = os.path.join(self.model_dir, "best_classification_pipeline.pkl")
             joblib.dump(clf_pipeline, clf_path)
             mlflow.log_artifact(clf_path)
             mlflow.sklearn.log_model(best_clf_model, "best_classification_model")
 
             logger.info(f"✅ Classification pipeline saved at {clf_path}")
 
+            # Reference feature profile for the API's drift monitor
+            drift_path = os.path.join(self.model_dir, "drift_reference.json")
+            DriftReference.build(X_train, drift_features, cat_features).save(drift_path)
+            mlflow.log_artifact(drift_path)
+            logger.info(f"📊 Drift reference saved at {drift_path}")
+
+            # A full run replaces the whole model set, shards included
+            shutil.rmtree(self.shard_dir, ignore_errors=True)
+            if self.shard_by:
+                self._train_shards(train_df, test_df, num_features, cat_features, reg_pipeline, clf_pipeline)
+
+            # A full run supersedes any incremental refresh recorded since the last one
+            self._write_metadata(best_reg, reg_results, best_clf, clf_results, extra={"incremental_refresh": None})
+            mlflow.log_artifact(self.metadata_path)
             mlflow.log_artifact("logs/modeling_pipeline.log")
 
         logger.info("🏁 Modeling Pipeline Completed Successfully.")
         return reg_pipeline, clf_pipeline
+
+    # =====================
+    # Per-city Shards
+    # =====================
+    def _save_shard(self, pipeline, name: str, kind: str) -> dict:
+        path = os.path.join(name, f"{kind}.pkl")
+        joblib.dump(pipeline, os.path.join(self.shard_dir, path))
+        return {"path": path, "bytes": os.path.getsize(os.path.join(self.shard_dir, path))}
+
+    def _train_shards(self, train_df, test_df, num_features, cat_features, reg_pipeline, clf_pipeline):
+        """
+        Refit the global winners' model configuration on each `shard_by` value with enough rows.
+        A shard model is kept only if it beats the global pipeline on that value's test rows;
+        the manifest lists the kept ones and everything else is served by the global models.
+        """
+        shard_cat_features = [c for c in cat_features if c != self.shard_by]
+        manifest = {"shard_by": self.shard_by, "min_shard_rows": self.min_shard_rows, "shards": {}}
+        os.makedirs(self.shard_dir, exist_ok=True)
+
+        for i, (value, shard_train) in enumerate(train_df.groupby(self.shard_by, sort=True)):
+            shard_test = test_df[test_df[self.shard_by] == value]
+            if len(shard_train) < self.min_shard_rows or shard_test.empty:
+                continue
+            X_tr = shard_train.drop(['ETA_target', 'is_delayed'], axis=1)
+            X_te = shard_test.drop(['ETA_target', 'is_delayed'], axis=1)
+            name = f"{i:03d}_{re.sub(r'[^A-Za-z0-9_-]', '_', str(value))}"
+            os.makedirs(os.path.join(self.shard_dir, name), exist_ok=True)
+            entry = {"train_rows": len(shard_train), "test_rows": len(shard_test)}
+
+            # ---- Regression shard ----
+            reg_shard = Pipeline([
+                ("preprocessor", PreprocessorFactory.create_preprocessor(num_features, shard_cat_features)),
+                ("model", clone(reg_pipeline.named_steps["model"]))
+            ]).fit(X_tr, shard_train['ETA_target'])
+            y_te = shard_test['ETA_target']
+            shard_rmse = np.sqrt(mean_squared_error(y_te, reg_shard.predict(X_te)))
+            global_rmse = np.sqrt(mean_squared_error(y_te, reg_pipeline.predict(X_te)))
+            entry["rmse"] = {"shard": float(shard_rmse), "global": float(global_rmse)}
+            if shard_rmse < global_rmse:
+                entry["regression"] = self._save_shard(reg_shard, name, "regression")
+
+            # ---- Classification shard (needs both classes to train) ----
+            y_tr, y_te = shard_train['is_delayed'], shard_test['is_delayed']
+            if y_tr.nunique() > 1:
+                clf_shard = Pipeline([
+                    ("preprocessor", PreprocessorFactory.create_preprocessor(num_features, shard_cat_features)),
+                    ("model", clone(clf_pipeline.named_steps["model"]))
+                ]).fit(X_tr, y_tr)
+                if y_te.nunique() > 1:
+                    shard_score = roc_auc_score(y_te, clf_shard.predict_proba(X_te)[:, 1])
+                    global_score = roc_auc_score(y_te, clf_pipeline.predict_proba(X_te)[:, 1])
+                else:  # ROC AUC is undefined with a single class; fall back to accuracy
+                    shard_score, global_score = clf_shard.score(X_te, y_te), clf_pipeline.score(X_te, y_te)
+                entry["clf_score"] = {"shard": float(shard_score), "global": float(global_score)}
+                if shard_score > global_score:
+                    entry["classification"] = self._save_shard(clf_shard, name, "classification")
+
+            if "regression" in entry or "classification" in entry:
+                manifest["shards"][str(value)] = entry
+            else:
+                shutil.rmtree(os.path.join(self.shard_dir, name), ignore_errors=True)
+            logger.info(
+                f"🧩 Shard {self.shard_by}={value}: RMSE shard={shard_rmse:.3f} vs global={global_rmse:.3f}, "
+                f"kept={sorted(k for k in ('regression', 'classification') if k in entry)}"
+            )
+
+        manifest_path = os.path.join(self.shard_dir, "manifest.json")
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+        mlflow.log_artifact(manifest_path)
+        mlflow.log_metric("shards_kept", len(manifest["shards"]))
+        logger.info(f"🧩 {len(manifest['shards'])} {self.shard_by} shards saved under {self.shard_dir}")
+
+    def _refresh_shards(self, train_df, holdout_df, reg_pipeline, clf_pipeline, n_new_estimators, max_degradation):
+        """
+        Warm-start every shard in the manifest on its value's rows of the new window, under the
+        same holdout guard as the global models. Like in a full run, a shard is only kept while it
+        beats the (possibly refreshed) global pipeline on its value's holdout rows; otherwise it is
+        dropped and the global model serves that value again. Shards without rows in both parts
+        of the window are left as they are. Returns counts per outcome, or None without shards.
+        """
+        manifest_path = os.path.join(self.shard_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        shard_by = manifest["shard_by"]
+        summary = {"refreshed": 0, "kept": 0, "dropped": 0, "skipped": 0}
+
+        for value, entry in list(manifest["shards"].items()):
+            shard_train = train_df[train_df[shard_by].astype(str) == value]
+            shard_holdout = holdout_df[holdout_df[shard_by].astype(str) == value]
+            if shard_train.empty or shard_holdout.empty:
+                summary["skipped"] += 1
+                continue
+            X_tr = shard_train.drop(['ETA_target', 'is_delayed'], axis=1)
+            X_ho = shard_holdout.drop(['ETA_target', 'is_delayed'], axis=1)
+            name = os.path.dirname((entry.get("regression") or entry["classification"])["path"])
+
+            for kind, target, global_pipeline, metric in (
+                ("regression", "ETA_target", reg_pipeline, "rmse"),
+                ("classification", "is_delayed", clf_pipeline, "clf_score"),
+            ):
+                if kind not in entry:
+                    continue
+                path = os.path.join(self.shard_dir, entry[kind]["path"])
+                current = joblib.load(path)
+                y_tr, y_ho = shard_train[target], shard_holdout[target]
+                shard, shard_score = current, self._holdout_score(kind, current, X_ho, y_ho)
+                if kind == "regression" or y_tr.nunique() > 1:
+                    preprocessor = current.named_steps["preprocessor"]
+                    candidate = Pipeline([
+                        ("preprocessor", preprocessor),
+                        ("model", self._continue_boosting(
+                            current.named_steps["model"], preprocessor.transform(X_tr), y_tr, n_new_estimators
+                        ))
+                    ])
+                    candidate_score = self._holdout_score(kind, candidate, X_ho, y_ho)
+                    if self._within_guard(kind, candidate_score, shard_score, max_degradation):
+                        shard, shard_score = candidate, candidate_score
+
+                global_score = self._holdout_score(kind, global_pipeline, X_ho, y_ho)
+                entry[metric] = {"shard": shard_score, "global": global_score}
+                beats_global = shard_score < global_score if kind == "regression" else shard_score > global_score
+                if not beats_global:
+                    del entry[kind]
+                    os.remove(path)
+                    outcome = "dropped"
+                elif shard is not current:
+                    entry[kind] = self._save_shard(shard, name, kind)
+                    outcome = "refreshed"
+                else:
+                    outcome = "kept"
+                summary[outcome] += 1
+                logger.info(f"🧩 Shard {shard_by}={value} {kind}: shard={shard_score:.4f} vs "
+                            f"global={global_score:.4f}, {outcome}")
+
+            if "regression" not in entry and "classification" not in entry:
+                del manifest["shards"][value]
+                shutil.rmtree(os.path.join(self.shard_dir, name), ignore_errors=True)
+
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+        mlflow.log_artifact(manifest_path)
+        for outcome, count in summary.items():
+            mlflow.log_metric(f"shards_{outcome}", count)
+        return summary
+
+    # =====================
+    # Latency & Metadata
+    # =====================
+    @staticmethod
+    def _log_latency(prefix: str, results: dict):
+        """Log every candidate's serving latency and size to the active MLflow run."""
+        for name, result in results.items():
+            for key, value in result['latency'].items():
+                mlflow.log_metric(f"{prefix}_{name}_{key}", value)
+
+    @staticmethod
+    def _log_cv(prefix: str, results: dict):
+        """Log every candidate's mean / std fold metrics to the active MLflow run."""
+        for name, result in results.items():
+            for key, value in result.get('cv', {}).items():
+                if key != 'folds' and np.isfinite(value):
+                    mlflow.log_metric(f"{prefix}_{name}_cv_{key}", value)
+
+    def _write_metadata(self, best_reg: str = None, reg_results: dict = None, best_clf: str = None,
+                        clf_results: dict = None, extra: dict = None):
+        """
+        Update model_metadata.json with the promoted models' metrics and serving latency.
+        Only the models passed in are updated (an incremental refresh may promote just one).
+        """
+        metadata = {}
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path) as f:
+                metadata = json.load(f)
+
+        metadata["training_date"] = pd.Timestamp.now().strftime("%Y-%m-%d")
+        latency = metadata.setdefault("serving_latency", {})
+        if best_reg is not None:
+            reg = reg_results[best_reg]
+            metadata["regression_model"] = best_reg
+            metadata["regression_metrics"] = {"MAE": reg['mae'], "RMSE": reg['rmse'], "R2": reg['r2']}
+            latency["regression"] = {name: r['latency'] for name, r in reg_results.items()}
+        if best_clf is not None:
+            clf = clf_results[best_clf]
+            metadata["classification_model"] = best_clf
+            metadata["classification_metrics"] = {"Accuracy": clf['accuracy'], "ROC_AUC": clf['roc_auc']}
+            latency["classification"] = {name: r['latency'] for name, r in clf_results.items()}
+        metadata.update(extra or {})
+        with open(self.metadata_path, "w") as f:
+            json.dump(metadata, f, indent=4)
+        logger.info(f"📝 Model metadata written to {self.metadata_path}")
+
+    # =====================
+    # Incremental Refresh
+    # =====================
+    @staticmethod
+    def _continue_boosting(model, X, y, n_new_estimators):
+        """Fit a copy of `model` that keeps its existing trees and adds `n_new_estimators` more."""
+        warm_model = clone(model)
+        warm_model.set_params(n_estimators=n_new_estimators)
+        if hasattr(model, "booster_"):  # LightGBM
+            warm_model.fit(X, y, init_model=model.booster_)
+        else:  # XGBoost
+            warm_model.fit(X, y, xgb_model=model.get_booster())
+        return warm_model
+
+    @staticmethod
+    def _holdout_score(kind: str, pipeline, X: pd.DataFrame, y: pd.Series) -> float:
+        """RMSE for regression; ROC AUC for classification (accuracy when `y` has a single class)."""
+        if kind == "regression":
+            return float(np.sqrt(mean_squared_error(y, pipeline.predict(X))))
+        if y.nunique() > 1:
+            return float(roc_auc_score(y, pipeline.predict_proba(X)[:, 1]))
+        return float(pipeline.score(X, y))
+
+    @staticmethod
+    def _within_guard(kind: str, candidate: float, current: float, max_degradation: float) -> bool:
+        """True when the candidate's holdout score is no worse than the current one by more than `max_degradation`."""
+        if kind == "regression":
+            return candidate <= current * (1 + max_degradation)
+        return candidate >= current * (1 - max_degradation)
+
+    @staticmethod
+    def _unseen_categories(preprocessor, X: pd.DataFrame) -> dict:
+        """Return {feature: [values]} for categories the fitted encoder has never seen."""
+        _, encoder, cat_features = next(t for t in preprocessor.transformers_ if t[0] == "cat")
+        unseen = {}
+        for feature, known in zip(cat_features, encoder.categories_):
+            new_values = sorted(set(X[feature].dropna().unique()) - set(known), key=str)
+            if new_values:
+                unseen[feature] = new_values
+        return unseen
+
+    @staticmethod
+    def _candidate_name(trainer, model) -> str:
+        """Trainer's name for the estimator type of `model` (e.g. "XGBoost"), or its class name."""
+        return next((name for name, m in trainer.models.items() if type(m) is type(model)), type(model).__name__)
+
+    def run_incremental(self, df_new: pd.DataFrame, n_new_estimators=50, holdout_size=0.2, max_degradation=0.0):
+        """
+        Warm-start both models on a new time window instead of retraining from scratch.
+
+        Loads the current best pipelines, keeps their fitted preprocessor, continues boosting
+        on the older part of `df_new` and evaluates old vs. new on the most recent
+        `holdout_size` fraction. A model is only promoted (overwritten on disk) when its
+        holdout metric is no worse than the current one by more than `max_degradation`
+        (relative). Returns the (regression, classification) pipelines now in production.
+        """
+        logger.info("🔁 Starting Incremental Refresh on %d new rows...", len(df_new))
+        reg_path = os.path.join(self.model_dir, "best_regression_pipeline.pkl")
+        clf_path = os.path.join(self.model_dir, "best_classification_pipeline.pkl")
+        current_reg = joblib.load(reg_path)
+        current_clf = joblib.load(clf_path)
+        preprocessor = current_reg.named_steps["preprocessor"]
+
+        # === Step 1: Prepare & Split the new window ===
+        df_model, _, _, _, _ = self.preparator.prepare_features(df_new)
+        if uses_speed_index(preprocessor):
+            # The existing index (from the original training data) never contains the new window's rows
+            df_model, _ = self.preparator.add_speed_index_features(df_model, SpatialSpeedIndex.load(self.speed_index_path))
+        train_df, holdout_df = self.preparator.time_based_split(df_model, test_size=holdout_size)
+        X_train = train_df.drop(['ETA_target', 'is_delayed'], axis=1)
+        X_holdout = holdout_df.drop(['ETA_target', 'is_delayed'], axis=1)
+        logger.info("Incremental split complete. Training size: %s, Holdout size: %s", X_train.shape, X_holdout.shape)
+
+        # One-hot width is fixed by the existing trees, so new categories cannot get their own columns
+        unseen = self._unseen_categories(preprocessor, X_train)
+        if unseen:
+            logger.warning(f"⚠️ Unseen categories in new window (encoded as all-zeros; run a full retrain to learn them): {unseen}")
+
+        X_train_proc = preprocessor.transform(X_train)
+
+        # === Step 2: Continue boosting ===
+        new_reg_pipeline = Pipeline([
+            ("preprocessor", preprocessor),
+            ("model", self._continue_boosting(
+                current_reg.named_steps["model"], X_train_proc, train_df['ETA_target'], n_new_estimators
+            ))
+        ])
+        new_clf_pipeline = Pipeline([
+            ("preprocessor", preprocessor),
+            ("model", self._continue_boosting(
+                current_clf.named_steps["model"], X_train_proc, train_df['is_delayed'], n_new_estimators
+            ))
+        ])
+
+        # === Step 3: Holdout guard ===
+        y_reg_holdout, y_clf_holdout = holdout_df['ETA_target'], holdout_df['is_delayed']
+        old_rmse = self._holdout_score("regression", current_reg, X_holdout, y_reg_holdout)
+        new_rmse = self._holdout_score("regression", new_reg_pipeline, X_holdout, y_reg_holdout)
+        promote_reg = self._within_guard("regression", new_rmse, old_rmse, max_degradation)
+
+        # ROC AUC is undefined with a single class; the score falls back to accuracy
+        old_clf_score = self._holdout_score("classification", current_clf, X_holdout, y_clf_holdout)
+        new_clf_score = self._holdout_score("classification", new_clf_pipeline, X_holdout, y_clf_holdout)
+        promote_clf = self._within_guard("classification", new_clf_score, old_clf_score, max_degradation)
+        single_class = y_clf_holdout.nunique() < 2
+
+        logger.info(f"Holdout RMSE: current={old_rmse:.4f}, candidate={new_rmse:.4f} → promote={promote_reg}")
+        logger.info(f"Holdout ROC AUC: current={old_clf_score:.4f}, candidate={new_clf_score:.4f} → promote={promote_clf}")
+
+        # === Step 4: Promote (keeping the previous pipeline for rollback) ===
+        with mlflow.start_run(run_name="Incremental_Refresh"):
+            mlflow.log_param("incremental_rows", len(df_new))
+            mlflow.log_param("n_new_estimators", n_new_estimators)
+            mlflow.log_param("unseen_categories", json.dumps(unseen, default=str))
+            mlflow.log_metric("reg_RMSE_current", old_rmse)
+            mlflow.log_metric("reg_RMSE_candidate", new_rmse)
+            mlflow.log_metric("clf_ROC_AUC_current", old_clf_score)
+            mlflow.log_metric("clf_ROC_AUC_candidate", new_clf_score)
+            mlflow.log_param("promoted_regression", promote_reg)
+            mlflow.log_param("promoted_classification", promote_clf)
+
+            if promote_reg:
+                joblib.dump(current_reg, os.path.join(self.model_dir, "previous_regression_pipeline.pkl"))
+                joblib.dump(new_reg_pipeline, reg_path)
+                mlflow.log_artifact(reg_path)
+                logger.info(f"✅ Regression pipeline promoted at {reg_path}")
+            else:
+                new_reg_pipeline = current_reg
+                logger.warning("⛔ Regression candidate degraded on holdout; keeping current model.")
+
+            if promote_clf:
+                joblib.dump(current_clf, os.path.join(self.model_dir, "previous_classification_pipeline.pkl"))
+                joblib.dump(new_clf_pipeline, clf_path)
+                mlflow.log_artifact(clf_path)
+                logger.info(f"✅ Classification pipeline promoted at {clf_path}")
+            else:
+                new_clf_pipeline = current_clf
+                logger.warning("⛔ Classification candidate degraded on holdout; keeping current model.")
+
+            # Shards are judged against the global models now in production
+            shard_summary = self._refresh_shards(train_df, holdout_df, new_reg_pipeline, new_clf_pipeline,
+                                                 n_new_estimators, max_degradation)
+            shards_changed = bool(shard_summary and (shard_summary["refreshed"] or shard_summary["dropped"]))
+
+            # Metadata describes the models now in production, with their holdout metrics
+            if promote_reg or promote_clf or shards_changed:
+                reg_name = clf_name = reg_results = clf_results = None
+                if promote_reg:
+                    y_pred = new_reg_pipeline.predict(X_holdout)
+                    reg_name = self._candidate_name(self.reg_trainer, new_reg_pipeline.named_steps["model"])
+                    reg_results = {reg_name: {
+                        'mae': float(mean_absolute_error(y_reg_holdout, y_pred)), 'rmse': float(new_rmse),
+                        'r2': float(r2_score(y_reg_holdout, y_pred)),
+                        'latency': benchmark_model(new_reg_pipeline.named_steps["model"], X_holdout, preprocessor),
+                    }}
+                if promote_clf:
+                    clf_name = self._candidate_name(self.clf_trainer, new_clf_pipeline.named_steps["model"])
+                    clf_results = {clf_name: {
+                        'accuracy': float(new_clf_pipeline.score(X_holdout, y_clf_holdout)),
+                        'roc_auc': None if single_class else float(new_clf_score),
+                        'latency': benchmark_model(new_clf_pipeline.named_steps["model"], X_holdout, preprocessor),
+                    }}
+                self._write_metadata(reg_name, reg_results, clf_name, clf_results, extra={"incremental_refresh": {
+                    "date": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M"), "rows": len(df_new),
+                    "n_new_estimators": n_new_estimators,
+                    "promoted": {"regression": bool(promote_reg), "classification": bool(promote_clf)},
+                    "shards": shard_summary,
+                }})
+                mlflow.log_artifact(self.metadata_path)
+
+        logger.info("🏁 Incremental Refresh Completed.")
+        return new_reg_pipeline, new_clf_pipeline
@@ -4,27 +4,73 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import xgboost as xgb
 import lightgbm as lgb
 
+from src.modeling.latency import benchmark_model, select_model, shrink_to_budget
+
 class RegressionTrainer:
     """Train and evaluate regression models."""
 
-    def __init__(self):
+    def __init__(self, latency_budget_ms=None, selection="accuracy", accuracy_tolerance=0.01, prune_to_budget=False):
         self.models = {
             'XGBoost': xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100, random_state=42),
             'LightGBM': lgb.LGBMRegressor(n_estimators=100, random_state=42)
         }
+        # Serving-latency aware selection (see src/modeling/latency.py)
+        self.latency_budget_ms = latency_budget_ms
+        self.selection = selection
+        self.accuracy_tolerance = accuracy_tolerance
+        self.prune_to_budget = prune_to_budget
+        self.best_model_name = None
+
+    def _evaluate(self, model, X_test, y_test, bench):
+        y_pred = model.predict(X_test)
+        mae = mean_absolute_error(y_test, y_pred)
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
+        return {'model': model, 'mae': mae, 'rmse': rmse, 'r2': r2, 'predictions': y_pred,
+                'latency': benchmark_model(model, *bench)}
+
+    def _add_cv_scores(self, results, X_train, y_train, cv):
+        """Rolling-origin CV (src/modeling/cross_validation.py) of every candidate on the training data."""
+        cv_results = cv.evaluate({name: r['model'] for name, r in results.items()}, X_train, y_train, "regression")
+        for name, cv_result in cv_results.items():
+            results[name]['cv'] = cv_result
+            results[name]['cv_rmse'] = cv_result['rmse_mean']
+            print(f"{name} - CV RMSE: {cv_result['rmse_mean']:.2f} ± {cv_result['rmse_std']:.2f} "
+                  f"over {len(cv_result['folds'])} folds")
 
-    def train_models(self, X_train, y_train, X_test, y_test):
+    def train_models(self, X_train, y_train, X_test, y_test, cv=None, preprocessor=None, X_test_raw=None,
+                     X_train_raw=None):
+        # Latency is measured on the served Pipeline when the fitted preprocessor and raw test rows are given
+        bench = (X_test_raw, preprocessor) if preprocessor is not None else (X_test,)
         results = {}
         for name, model in self.models.items():
             print(f"Training {name}...")
             model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-            mae = mean_absolute_error(y_test, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-            r2 = r2_score(y_test, y_pred)
-            results[name] = {'model': model, 'mae': mae, 'rmse': rmse, 'r2': r2, 'predictions': y_pred}
-            print(f"{name} - MAE: {mae:.2f}, RMSE: {rmse:.2f}, R²: {r2:.4f}")
-
-        best_model_name = min(results, key=lambda x: results[x]['rmse'])
+            results[name] = self._evaluate(model, X_test, y_test, bench)
+            r = results[name]
+            print(f"{name} - MAE: {r['mae']:.2f}, RMSE: {r['rmse']:.2f}, R²: {r['r2']:.4f}, "
+                  f"p95 latency: {r['latency']['single_p95_ms']:.2f}ms")
+
+        if self.prune_to_budget and self.latency_budget_ms is not None:
+            best_name = min(results, key=lambda x: results[x]['rmse'])
+            if results[best_name]['latency']['single_p95_ms'] > self.latency_budget_ms:
+                shrunk = shrink_to_budget(results[best_name]['model'], X_train, y_train, bench[0], self.latency_budget_ms,
+                                          preprocessor=preprocessor)
+                if shrunk:
+                    model, _ = shrunk
+                    pruned_name = f"{best_name}_n{model.get_params()['n_estimators']}"
+                    results[pruned_name] = self._evaluate(model, X_test, y_test, bench)
+                    print(f"✂️ {pruned_name} - RMSE: {results[pruned_name]['rmse']:.2f} (fits latency budget)")
+
+        # With folds, select on the mean CV metric instead of the single holdout
+        metric = 'rmse'
+        if cv is not None:
+            # Folds with their own preprocessor are cut from the raw training rows
+            self._add_cv_scores(results, X_train_raw if cv.preprocessor is not None else X_train, y_train, cv)
+            metric = 'cv_rmse'
+        best_model_name = select_model(results, metric, higher_is_better=False,
+                                       latency_budget_ms=self.latency_budget_ms, selection=self.selection,
+                                       accuracy_tolerance=self.accuracy_tolerance)
+        self.best_model_name = best_model_name
         print(f"✅ Best Regression Model: {best_model_name}")
         return results, results[best_model_name]['model']
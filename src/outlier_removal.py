@@ -7,8 +7,14 @@ object-oriented manner for any DataFrame column.
 """
 
 from abc import ABC, abstractmethod
+import logging
+import numpy as np
 import pandas as pd
 
+from src.quantile_sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
 
 # =====================
 # Abstract Base Class
@@ -64,6 +70,83 @@ class IQROutlierRemover(BaseOutlierRemover):
 
         return df_clean, outliers
 
+    # =====================
+    # Multi-column (one pass)
+    # =====================
+    def _bounds_from_quartiles(self, q1: float, q3: float):
+        iqr = q3 - q1
+        return q1 - self.multiplier * iqr, q3 + self.multiplier * iqr
+
+    def compute_bounds(self, data, columns: list, relative_accuracy: float = 0.001) -> dict:
+        """
+        IQR bounds {column: (lower, upper)} for every column from a single scan.
+
+        `data` is either a DataFrame (exact quartiles) or an iterable of DataFrame
+        chunks (approximate quartiles from mergeable quantile sketches).
+        """
+        if isinstance(data, pd.DataFrame):
+            quartiles = np.nanquantile(data[columns].to_numpy(dtype=float), [0.25, 0.75], axis=0)
+            return {col: self._bounds_from_quartiles(q1, q3) for col, q1, q3 in zip(columns, *quartiles)}
+
+        sketches = {col: QuantileSketch(relative_accuracy) for col in columns}
+        for chunk in data:
+            for col in columns:
+                sketches[col].update(chunk[col].to_numpy(dtype=float))
+        return {
+            col: self._bounds_from_quartiles(sketch.quantile(0.25), sketch.quantile(0.75))
+            for col, sketch in sketches.items()
+        }
+
+    @staticmethod
+    def _column_masks(df: pd.DataFrame, bounds: dict):
+        for col, (lower, upper) in bounds.items():
+            values = df[col].to_numpy(dtype=float)
+            yield col, (values < lower) | (values > upper)
+
+    @classmethod
+    def outlier_mask(cls, df: pd.DataFrame, bounds: dict) -> np.ndarray:
+        """Combined boolean mask: True where any bounded column falls outside its range."""
+        mask = np.zeros(len(df), dtype=bool)
+        for _, col_mask in cls._column_masks(df, bounds):
+            mask |= col_mask
+        return mask
+
+    def detect_outliers(self, data, columns: list, relative_accuracy: float = 0.001):
+        """
+        Flag outliers across several columns at once.
+
+        Returns (mask, stats) for a DataFrame, or (bounds, stats) for an iterable of
+        chunks, where `bounds` is then applied per chunk with `outlier_mask`. The
+        outlier rows themselves are never materialized; `stats` is a plain dict that
+        is also logged.
+        """
+        bounds = self.compute_bounds(data, columns, relative_accuracy)
+        stats = {
+            "columns": {
+                col: {"lower_bound": float(lower), "upper_bound": float(upper)}
+                for col, (lower, upper) in bounds.items()
+            },
+            "multiplier": self.multiplier,
+            "exact": isinstance(data, pd.DataFrame),
+        }
+        if not isinstance(data, pd.DataFrame):
+            logger.info("Outlier bounds: %s", stats)
+            return bounds, stats
+
+        mask = np.zeros(len(data), dtype=bool)
+        for col, col_mask in self._column_masks(data, bounds):
+            stats["columns"][col]["n_outliers"] = int(col_mask.sum())
+            mask |= col_mask
+
+        n_removed = int(mask.sum())
+        stats.update({
+            "n_rows": len(data),
+            "n_removed": n_removed,
+            "pct_removed": n_removed / len(data) * 100 if len(data) else 0.0,
+        })
+        logger.info("Outlier removal summary: %s", stats)
+        return mask, stats
+
 
 # =====================
 # Utility Function
@@ -74,3 +157,13 @@ def remove_outliers_iqr(df: pd.DataFrame, column: str, multiplier: float = 1.5):
     """
     remover = IQROutlierRemover(multiplier)
     return remover.remove_outliers(df, column)
+
+
+def remove_outliers_iqr_multi(df: pd.DataFrame, columns: list, multiplier: float = 1.5):
+    """
+    Remove rows that are IQR outliers in any of `columns`, using one set of bounds.
+    Returns (clean_df, stats).
+    """
+    remover = IQROutlierRemover(multiplier)
+    mask, stats = remover.detect_outliers(df, columns)
+    return df[~mask], stats
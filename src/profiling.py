@@ -0,0 +1,164 @@
+# src/profiling.py
+"""
+Profiling Module
+----------------
+Opt-in sampling profiler for the API and the training pipeline. A background
+thread snapshots Python call stacks at a fixed interval and aggregates them
+into folded stacks ("frame;frame;frame count"), which flamegraph.pl,
+speedscope and inferno read directly. Nothing here runs unless explicitly
+enabled, so the disabled path costs nothing.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SamplingProfiler:
+    """Samples the call stacks of all other threads every `interval` seconds."""
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.n_samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.n_samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def top_functions(self, n: int = 25):
+        """(function, self samples, inclusive samples) sorted by self time."""
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        return [(fn, own[fn], inclusive[fn]) for fn, _ in own.most_common(n)]
+
+    def write(self, path_prefix: str):
+        """Write `<prefix>.folded` (flamegraph input) and a `<prefix>.txt` summary; returns the folded path."""
+        os.makedirs(os.path.dirname(path_prefix) or ".", exist_ok=True)
+        with open(f"{path_prefix}.folded", "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(f"{path_prefix}.txt", "w") as f:
+            f.write(f"duration: {self.duration * 1000:.1f} ms, samples: {self.n_samples}, "
+                    f"interval: {self.interval * 1000:.1f} ms\n\n")
+            f.write(f"{'self':>8} {'total':>8}  function\n")
+            for fn, own, total in self.top_functions():
+                f.write(f"{own:>8} {total:>8}  {fn}\n")
+        return f"{path_prefix}.folded"
+
+
+def profile_section(name: str, output_dir: str = None, interval: float = 0.01):
+    """Context manager profiling one block into `<output_dir>/<name>.*`; a no-op when output_dir is None."""
+    if output_dir is None:
+        return nullcontext()
+    return _ProfiledSection(name, output_dir, interval)
+
+
+class _ProfiledSection:
+    def __init__(self, name, output_dir, interval):
+        self.prefix = os.path.join(output_dir, name)
+        self.profiler = SamplingProfiler(interval)
+
+    def __enter__(self):
+        self.profiler.start()
+        return self.profiler
+
+    def __exit__(self, *exc):
+        self.profiler.stop()
+        self.profiler.write(self.prefix)
+
+
+# =====================
+# ASGI Middleware
+# =====================
+class ProfilingMiddleware:
+    """
+    Profiles individual HTTP requests: those sending `X-Profile: 1`, plus a random
+    `sample_rate` fraction of all traffic. Only install it when profiling is wanted;
+    without it the request path is untouched.
+    """
+
+    def __init__(self, app, output_dir: str, sample_rate: float = 0.0, interval: float = 0.001,
+                 header: bytes = b"x-profile"):
+        self.app = app
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.header = header
+
+    def _wanted(self, scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == self.header:
+                return value.strip().lower() in (b"1", b"true", b"yes")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(self.interval).start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope["path"].strip("/").replace("/", "_") or "root"
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            # Joining the sampler and writing the files block; keep both off the event loop
+            await run_in_threadpool(self._finish, profiler,
+                                    os.path.join(self.output_dir, f"{stamp}_{route}_{uuid.uuid4().hex[:8]}"))
+
+    @staticmethod
+    def _finish(profiler: SamplingProfiler, path_prefix: str) -> str:
+        profiler.stop()
+        return profiler.write(path_prefix)
@@ -0,0 +1,153 @@
+# src/quantile_sketch.py
+"""
+Quantile Sketch Module
+----------------------
+Mergeable, array-backed quantile sketch with a relative-error guarantee
+(DDSketch-style logarithmic buckets). Sketches can be updated chunk by chunk
+and merged across workers, so quantiles never require the full column in memory.
+"""
+
+import math
+import numpy as np
+
+
+class _BucketStore:
+    """Dense counts over a contiguous range of integer bucket keys."""
+
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def _extend(self, min_key: int, max_key: int):
+        if self.counts.size == 0:
+            self.offset = min_key
+            self.counts = np.zeros(max_key - min_key + 1, dtype=np.int64)
+            return
+        new_min = min(min_key, self.offset)
+        new_max = max(max_key, self.offset + self.counts.size - 1)
+        if new_min == self.offset and new_max == self.offset + self.counts.size - 1:
+            return
+        counts = np.zeros(new_max - new_min + 1, dtype=np.int64)
+        start = self.offset - new_min
+        counts[start:start + self.counts.size] = self.counts
+        self.offset, self.counts = new_min, counts
+
+    def add_keys(self, keys: np.ndarray):
+        if keys.size == 0:
+            return
+        min_key, max_key = int(keys.min()), int(keys.max())
+        self._extend(min_key, max_key)
+        self.counts += np.bincount(keys - self.offset, minlength=self.counts.size)
+
+    def merge(self, other: "_BucketStore"):
+        if other.counts.size == 0:
+            return
+        self._extend(other.offset, other.offset + other.counts.size - 1)
+        start = other.offset - self.offset
+        self.counts[start:start + other.counts.size] += other.counts
+
+    def to_dict(self) -> dict:
+        return {"offset": self.offset, "counts": self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "_BucketStore":
+        store = cls()
+        store.offset = int(data["offset"])
+        store.counts = np.asarray(data["counts"], dtype=np.int64)
+        return store
+
+
+class QuantileSketch:
+    """
+    Relative-error quantile sketch.
+
+    Every value x is counted in bucket ceil(log_gamma(|x|)); any quantile is then
+    answered within `relative_accuracy` of the exact value. Memory depends only on
+    the dynamic range of the data, and two sketches built with the same accuracy
+    merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005, min_indexable_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.min_indexable_value = min_indexable_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = _BucketStore()
+        self.negative = _BucketStore()
+        self.zero_count = 0
+
+    @property
+    def count(self) -> int:
+        return self.positive.total + self.negative.total + self.zero_count
+
+    def _keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def update(self, values) -> "QuantileSketch":
+        """Add a chunk of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        is_pos = values > self.min_indexable_value
+        is_neg = values < -self.min_indexable_value
+        self.positive.add_keys(self._keys(values[is_pos]))
+        self.negative.add_keys(self._keys(-values[is_neg]))
+        self.zero_count += int(values.size - is_pos.sum() - is_neg.sum())
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch (same relative accuracy) into this one."""
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero_count += other.zero_count
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile; NaN for an empty sketch."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+        total = self.count
+        if total == 0:
+            return float("nan")
+
+        rank = q * (total - 1)
+        neg_counts = self.negative.counts[::-1]  # most negative first
+        if rank < self.negative.total:
+            idx = int(np.searchsorted(np.cumsum(neg_counts), rank, side="right"))
+            key = self.negative.offset + self.negative.counts.size - 1 - idx
+            return -self._value(key)
+
+        rank -= self.negative.total
+        if rank < self.zero_count:
+            return 0.0
+
+        rank -= self.zero_count
+        idx = int(np.searchsorted(np.cumsum(self.positive.counts), rank, side="right"))
+        return self._value(self.positive.offset + idx)
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_indexable_value": self.min_indexable_value,
+            "zero_count": self.zero_count,
+            "positive": self.positive.to_dict(),
+            "negative": self.negative.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["min_indexable_value"])
+        sketch.zero_count = int(data["zero_count"])
+        sketch.positive = _BucketStore.from_dict(data["positive"])
+        sketch.negative = _BucketStore.from_dict(data["negative"])
+        return sketch
@@ -0,0 +1,170 @@
+# src/serving/admission.py
+"""
+Admission Control
+-----------------
+Load shedding for model-bound requests. A bounded number of inferences run
+concurrently; the limit adapts to measured model latency (additive increase
+while latency stays near its no-load baseline, multiplicative decrease when
+it inflates). Excess requests wait in a short bounded queue, and requests
+whose client deadline cannot be met given the current queue and latency are
+rejected immediately instead of timing out after doing the work.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; `retry_after` is a hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Adaptive concurrency limit + bounded FIFO queue + deadline-aware early rejection."""
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 64, max_queue: int = 32,
+                 latency_tolerance: float = 2.0, backoff: float = 0.9, smoothing: float = 0.2):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.latency_tolerance = latency_tolerance  # latency above baseline * tolerance counts as overload
+        self.backoff = backoff
+        self.smoothing = smoothing
+
+        self.in_flight = 0
+        self.latency_ewma = None    # smoothed service time (s)
+        self.baseline = None        # no-load service time estimate (s)
+        self._waiters = deque()
+        self._since_decrease = 0
+        self.counters = {"admitted": 0, "queued": 0, "shed_queue_full": 0, "shed_deadline": 0}
+
+    # =====================
+    # Estimates
+    # =====================
+    def _service_time(self) -> float:
+        return self.latency_ewma or 0.0
+
+    def _expected_wait(self, position: int) -> float:
+        """Time until a request at `position` in the queue starts running."""
+        return (position + 1) / max(int(self.limit), 1) * self._service_time()
+
+    def retry_after(self) -> float:
+        return self._expected_wait(len(self._waiters)) + self._service_time()
+
+    # =====================
+    # Acquire / Release
+    # =====================
+    def _reject(self, reason: str, counter: str):
+        self.counters[counter] += 1
+        raise AdmissionRejected(reason, self.retry_after())
+
+    async def acquire(self, deadline: float = None):
+        """
+        Wait for an inference slot. `deadline` is an absolute `time.monotonic()`
+        value; the request is rejected if it could not finish before it.
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            # A free slot only rejects requests that could not finish even at no-load latency,
+            # and an idle controller always admits, so an inflated estimate cannot starve it of samples
+            if deadline is not None and self.in_flight and time.monotonic() + (self.baseline or 0.0) > deadline:
+                self._reject("deadline shorter than expected service time", "shed_deadline")
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject("admission queue full", "shed_queue_full")
+        if deadline is not None:
+            expected_done = time.monotonic() + self._expected_wait(len(self._waiters)) + self._service_time()
+            if expected_done > deadline:
+                self._reject("deadline cannot be met at current load", "shed_deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters["queued"] += 1
+        try:
+            timeout = None if deadline is None else max(deadline - time.monotonic() - self._service_time(), 0)
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            self._drop_waiter(waiter)
+            self._reject("deadline expired while queued", "shed_deadline")
+        except BaseException:
+            self._drop_waiter(waiter)
+            raise
+        self.counters["admitted"] += 1
+
+    def _drop_waiter(self, waiter):
+        if waiter.done() and not waiter.cancelled():
+            # Slot was handed over just as we gave up: pass it on
+            self.in_flight -= 1
+            self._wake()
+        else:
+            waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def release(self, latency_s: float):
+        """Return a slot and feed the observed service time into the limit."""
+        self.in_flight -= 1
+        self._observe(latency_s)
+        self._wake()
+
+    def _observe(self, latency_s: float):
+        if self.latency_ewma is None:
+            self.latency_ewma = self.baseline = latency_s
+        else:
+            self.latency_ewma += self.smoothing * (latency_s - self.latency_ewma)
+            # Baseline follows new minimums immediately and drifts up slowly so it can re-adapt
+            self.baseline = latency_s if latency_s < self.baseline else self.baseline * 1.0001
+
+        self._since_decrease += 1
+        if self.latency_ewma > self.baseline * self.latency_tolerance:
+            # At most one decrease per "round" of `limit` completions
+            if self._since_decrease >= int(self.limit):
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._since_decrease = 0
+        elif self.in_flight + 1 >= int(self.limit):
+            # Only grow while the limit is actually the bottleneck
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    @asynccontextmanager
+    async def slot(self, deadline: float = None):
+        """`async with controller.slot(deadline):` around a model-bound call."""
+        await self.acquire(deadline)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "latency_ewma_ms": None if self.latency_ewma is None else self.latency_ewma * 1000,
+            "baseline_ms": None if self.baseline is None else self.baseline * 1000,
+            **self.counters,
+        }
+
+    @staticmethod
+    def retry_after_header(retry_after: float) -> str:
+        return str(max(1, math.ceil(retry_after)))
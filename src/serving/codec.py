@@ -0,0 +1,36 @@
+# src/serving/codec.py
+"""
+JSON Codec
+----------
+Bytes-in/bytes-out JSON helpers for the fast /predict path. Uses orjson when
+it is installed and falls back to the standard library otherwise; both
+produce plain JSON, so cached values stay readable by either path.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def dumps_sorted(obj) -> bytes:
+    """Deterministic encoding (sorted keys) for hashing."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
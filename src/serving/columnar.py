@@ -0,0 +1,65 @@
+# src/serving/columnar.py
+"""
+Columnar Codec
+--------------
+Arrow IPC stream decoding/encoding for service-to-service bulk scoring.
+Whole columns are validated and cast at once; no per-row Python objects
+are created on the way in (string columns are dictionary-encoded).
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+class ColumnarPayloadError(ValueError):
+    """Raised when a columnar payload cannot be decoded into the expected schema."""
+
+
+def decode_arrow_stream(body: bytes, columns: dict) -> pd.DataFrame:
+    """
+    Decode an Arrow IPC stream into a DataFrame with the model's column names.
+
+    `columns` maps each expected column (as the model sees it, i.e. the alias) to
+    (accepted_names, arrow_type); a payload column may use any accepted name.
+    """
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise ColumnarPayloadError(f"Invalid Arrow IPC stream: {e}") from e
+
+    present = set(table.column_names)
+    arrays, missing = {}, []
+    for target, (accepted, arrow_type) in columns.items():
+        source = next((name for name in accepted if name in present), None)
+        if source is None:
+            missing.append(target)
+            continue
+        try:
+            column = pc.cast(table.column(source), arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ColumnarPayloadError(f"Column '{source}' cannot be cast to {arrow_type}: {e}") from e
+        if column.null_count:
+            raise ColumnarPayloadError(f"Column '{source}' contains {column.null_count} nulls")
+        if pa.types.is_string(arrow_type):
+            column = pc.dictionary_encode(column)
+        arrays[target] = column
+
+    if missing:
+        raise ColumnarPayloadError(f"Missing columns: {missing}")
+    return pa.table(arrays).to_pandas()
+
+
+def encode_arrow_stream(columns: dict) -> bytes:
+    """Encode {name: array-like} as a single-batch Arrow IPC stream."""
+    # from_pandas=True turns NaN into proper nulls (e.g. missing delay thresholds)
+    batch = pa.RecordBatch.from_pydict({
+        name: pa.array(np.asarray(values), from_pandas=True) for name, values in columns.items()
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,173 @@
+# src/serving/drift.py
+"""
+Feature Drift Monitoring
+------------------------
+Training writes a reference profile of every model feature next to the
+pickles: counts over the training quantile bins for numerical features and
+category counts for categorical ones. The API keeps live counts in the same
+bins — one bisect plus one array increment per numerical feature per request —
+and compares them against the reference with PSI and a binned KS statistic.
+"""
+
+import bisect
+import json
+
+import numpy as np
+import pandas as pd
+
+PSI_WARN = 0.1
+PSI_DRIFT = 0.25
+
+
+def _status(psi: float) -> str:
+    if psi >= PSI_DRIFT:
+        return "drift"
+    return "warn" if psi >= PSI_WARN else "ok"
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray, eps: float = 1e-4) -> float:
+    """PSI between two count vectors over the same bins (empty bins smoothed by `eps`)."""
+    p = np.maximum(expected / max(expected.sum(), 1), eps)
+    q = np.maximum(actual / max(actual.sum(), 1), eps)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Max CDF distance over ordered bins (a KS statistic at bin resolution)."""
+    p = np.cumsum(expected) / max(expected.sum(), 1)
+    q = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(p - q)))
+
+
+# =====================
+# Training-time Reference
+# =====================
+class DriftReference:
+    """Per-feature bin edges + training counts; JSON-serialisable."""
+
+    def __init__(self, numerical: dict, categorical: dict, n_rows: int):
+        self.numerical = numerical      # {feature: {"edges": [...], "counts": [...]}}
+        self.categorical = categorical  # {feature: {category: count}}
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, numerical_features: list, categorical_features: list, n_bins: int = 10):
+        numerical = {}
+        for feature in numerical_features:
+            values = df[feature].dropna().to_numpy(dtype=float)
+            # Interior quantile edges; bins are (-inf, e0], (e0, e1], ..., (e_last, inf)
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])) if values.size else np.array([])
+            counts = np.bincount(np.searchsorted(edges, values, side="left"), minlength=len(edges) + 1)
+            numerical[feature] = {"edges": edges.tolist(), "counts": counts.tolist()}
+
+        categorical = {
+            feature: {str(k): int(v) for k, v in df[feature].astype(str).value_counts().items()}
+            for feature in categorical_features
+        }
+        return cls(numerical, categorical, len(df))
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"numerical": self.numerical, "categorical": self.categorical, "n_rows": self.n_rows}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "DriftReference":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["numerical"], data["categorical"], data["n_rows"])
+
+
+# =====================
+# Live Monitor
+# =====================
+class DriftMonitor:
+    """Live counts in the reference bins, cheap enough to update on every request."""
+
+    def __init__(self, reference: DriftReference):
+        self.reference = reference
+        self._edges = {f: spec["edges"] for f, spec in reference.numerical.items()}
+        self._categories = {f: {c: i for i, c in enumerate(counts)} for f, counts in reference.categorical.items()}
+        self.reset()
+
+    def reset(self):
+        self.n_observed = 0
+        self.numerical_counts = {f: np.zeros(len(e) + 1, dtype=np.int64) for f, e in self._edges.items()}
+        # Last slot of each categorical vector counts values never seen in training
+        self.categorical_counts = {f: np.zeros(len(c) + 1, dtype=np.int64) for f, c in self._categories.items()}
+        self.unseen_values = {f: {} for f in self._categories}
+        self.missing = {f: 0 for f in list(self._edges) + list(self._categories)}
+
+    def update(self, features: dict):
+        """Count one request (keys are model column names)."""
+        self.n_observed += 1
+        for feature, edges in self._edges.items():
+            value = features.get(feature)
+            if value is None or value != value:  # None / NaN
+                self.missing[feature] += 1
+                continue
+            self.numerical_counts[feature][bisect.bisect_left(edges, value)] += 1
+        for feature, index in self._categories.items():
+            value = features.get(feature)
+            if value is None:
+                self.missing[feature] += 1
+                continue
+            value = str(value)
+            slot = index.get(value)
+            if slot is None:
+                slot = len(index)
+                unseen = self.unseen_values[feature]
+                if value in unseen or len(unseen) < 100:  # keep the unseen list bounded
+                    unseen[value] = unseen.get(value, 0) + 1
+            self.categorical_counts[feature][slot] += 1
+
+    def update_frame(self, df: pd.DataFrame):
+        """Vectorised update for a batch of rows (bulk endpoints)."""
+        self.n_observed += len(df)
+        for feature, edges in self._edges.items():
+            values = df[feature].to_numpy(dtype=float)
+            valid = ~np.isnan(values)
+            self.missing[feature] += int((~valid).sum())
+            idx = np.searchsorted(edges, values[valid], side="left")
+            self.numerical_counts[feature] += np.bincount(idx, minlength=len(edges) + 1)
+        for feature, index in self._categories.items():
+            values = df[feature].astype(str)
+            slots = values.map(index).fillna(len(index)).to_numpy(dtype=np.int64)
+            self.categorical_counts[feature] += np.bincount(slots, minlength=len(index) + 1)
+            unseen = self.unseen_values[feature]
+            for value, count in values[slots == len(index)].value_counts().items():
+                if value in unseen or len(unseen) < 100:
+                    unseen[value] = unseen.get(value, 0) + int(count)
+
+    def report(self) -> dict:
+        features = {}
+        for feature, spec in self.reference.numerical.items():
+            expected, actual = np.asarray(spec["counts"]), self.numerical_counts[feature]
+            psi = population_stability_index(expected, actual) if actual.sum() else None
+            features[feature] = {
+                "type": "numerical",
+                "psi": psi,
+                "ks": binned_ks(expected, actual) if actual.sum() else None,
+                "status": "no_data" if psi is None else _status(psi),
+                "missing": self.missing[feature],
+            }
+        for feature, counts in self.reference.categorical.items():
+            expected = np.append(np.asarray(list(counts.values()), dtype=float), 0)
+            actual = self.categorical_counts[feature]
+            psi = population_stability_index(expected, actual) if actual.sum() else None
+            features[feature] = {
+                "type": "categorical",
+                "psi": psi,
+                "unseen_share": float(actual[-1] / actual.sum()) if actual.sum() else 0.0,
+                "unseen_values": self.unseen_values[feature],
+                "status": "no_data" if psi is None else _status(psi),
+                "missing": self.missing[feature],
+            }
+
+        scores = [f["psi"] for f in features.values() if f["psi"] is not None]
+        return {
+            "observed": self.n_observed,
+            "reference_rows": self.reference.n_rows,
+            "max_psi": max(scores) if scores else None,
+            "drifted_features": sorted(f for f, r in features.items() if r["status"] == "drift"),
+            "features": features,
+        }
@@ -0,0 +1,110 @@
+# src/serving/request_logging.py
+"""
+Request Logging
+---------------
+Optional non-blocking logging for the serving hot path. Request handlers only
+build a LogRecord and put it on a bounded in-memory queue (dropping it when
+the queue is full); a background QueueListener thread formats records as JSON
+lines and does the I/O. Message interpolation is deferred to that thread, and
+per-event sampling (e.g. 1% of cache hits, every error) keeps the
+record volume proportional to what is actually useful.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, event, message + any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class EventSampler(logging.Filter):
+    """
+    Keeps a `rates[event]` fraction of records tagged with `extra={"event": ...}`.
+    Untagged records and anything at ERROR or above always pass.
+    """
+
+    def __init__(self, rates: dict = None, default_rate: float = 1.0):
+        super().__init__()
+        self.rates = rates or {}
+        self.default_rate = default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        event = getattr(record, "event", None)
+        if event is None:
+            return True
+        rate = self.rates.get(event, self.default_rate)
+        return rate >= 1.0 or random.random() < rate
+
+    @staticmethod
+    def parse_rates(spec: str) -> dict:
+        """'cache_hit=0.01,cache_miss=0.1' -> {'cache_hit': 0.01, 'cache_miss': 0.1}"""
+        rates = {}
+        for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+            event, _, rate = item.partition("=")
+            rates[event.strip()] = float(rate)
+        return rates
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks or formats on the caller's thread."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same process: hand the record over as-is so interpolation happens in the listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_async_logging(level=logging.INFO, max_queue: int = 10_000, stream=None):
+    """
+    Route the root logger through a bounded queue to a JSON-writing background thread.
+    Returns the started QueueListener (stopped automatically at exit).
+    """
+    log_queue = queue.Queue(maxsize=max_queue)
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,170 @@
+# src/serving/shadow.py
+"""
+Shadow Evaluation
+-----------------
+Scores live traffic with a candidate model without touching the response
+path. The request handler only does a non-blocking put of (features, served
+prediction) into a bounded queue — samples are dropped when it is full — and
+a background thread drains the queue in batches through the candidate
+InferencePipeline, recording ETA differences, delay-label agreement and
+candidate latency. The aggregates are what a promotion decision reads.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.quantile_sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowStats:
+    """Running agreement / difference / latency aggregates (updated by the worker thread only)."""
+
+    def __init__(self):
+        self.scored = 0
+        self.failed_batches = 0
+        self.delay_agree = 0
+        self.delay_confusion = np.zeros((2, 2), dtype=np.int64)  # [served label, candidate label]
+        self.eta_diff_sum = 0.0
+        self.eta_abs_diff = QuantileSketch(relative_accuracy=0.01)
+        self.row_latency_ms = QuantileSketch(relative_accuracy=0.01)
+        self.batches = 0
+
+    def update(self, served_eta, served_delay, shadow_eta, shadow_delay, batch_ms: float):
+        diff = np.asarray(shadow_eta, dtype=float) - np.asarray(served_eta, dtype=float)
+        served_delay = np.asarray(served_delay, dtype=int)
+        shadow_delay = np.asarray(shadow_delay, dtype=int)
+        n = len(diff)
+
+        self.scored += n
+        self.batches += 1
+        self.eta_diff_sum += float(diff.sum())
+        self.eta_abs_diff.update(np.abs(diff))
+        self.delay_agree += int((served_delay == shadow_delay).sum())
+        np.add.at(self.delay_confusion, (np.clip(served_delay, 0, 1), np.clip(shadow_delay, 0, 1)), 1)
+        self.row_latency_ms.update([batch_ms / n])
+
+    def summary(self) -> dict:
+        if self.scored == 0:
+            return {"scored": 0, "failed_batches": self.failed_batches}
+        return {
+            "scored": self.scored,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": self.scored / self.batches,
+            "delay_agreement": self.delay_agree / self.scored,
+            "delay_confusion": self.delay_confusion.tolist(),
+            "eta_mean_diff": self.eta_diff_sum / self.scored,
+            "eta_abs_diff_p50": self.eta_abs_diff.quantile(0.5),
+            "eta_abs_diff_p95": self.eta_abs_diff.quantile(0.95),
+            "eta_abs_diff_p99": self.eta_abs_diff.quantile(0.99),
+            "candidate_ms_per_row_p50": self.row_latency_ms.quantile(0.5),
+            "candidate_ms_per_row_p95": self.row_latency_ms.quantile(0.95),
+        }
+
+
+class ShadowEvaluator:
+    """Background worker scoring sampled request features with a candidate pipeline."""
+
+    def __init__(self, candidate, max_queue: int = 10_000, batch_size: int = 256, max_wait_s: float = 0.05,
+                 sample_rate: float = 1.0):
+        self.candidate = candidate
+        self.batch_size = batch_size
+        self.max_wait_s = max_wait_s
+        self.sample_rate = sample_rate
+        self.stats = ShadowStats()
+        self.enqueued = 0
+        self.dropped = 0
+        self.started_at = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._rng = np.random.default_rng()
+        self._lock = threading.Lock()  # guards stats between the worker and report()
+
+    # =====================
+    # Request path
+    # =====================
+    def submit(self, features: dict, served_eta: float, served_delay: int) -> bool:
+        """Non-blocking: enqueue one served request, or drop it if sampled out or the queue is full."""
+        if self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((features, served_eta, served_delay))
+            self.enqueued += 1
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    # =====================
+    # Worker
+    # =====================
+    def _next_batch(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=self.max_wait_s)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _score(self, batch: list):
+        features, served_eta, served_delay = zip(*batch)
+        start = time.perf_counter()
+        try:
+            preds = self.candidate.predict(pd.DataFrame(list(features)))
+        except Exception as e:
+            with self._lock:
+                self.stats.failed_batches += 1
+            logger.warning(f"⚠️ Shadow scoring failed for a batch of {len(batch)}: {e}")
+            return
+        batch_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.stats.update(served_eta, served_delay, preds["ETA_Prediction"], preds["Delay_Prediction"], batch_ms)
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._next_batch()
+            if batch:
+                self._score(batch)
+
+    def start(self):
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, drain: bool = True):
+        """Stop the worker; with `drain`, score what is already queued first."""
+        if not drain:
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def report(self) -> dict:
+        with self._lock:
+            summary = self.stats.summary()
+        return {
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "queue_depth": self._queue.qsize(),
+            "running_since": self.started_at,
+            **summary,
+        }
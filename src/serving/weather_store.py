@@ -0,0 +1,110 @@
+# src/serving/weather_store.py
+"""
+Weather Feature Store
+---------------------
+Keeps the per-city weather tables that DataIngest consumes in memory as sorted
+int64 time arrays plus column arrays, and resolves the latest reading at or
+before a timestamp with a binary-search as-of lookup (same backward / 1h
+tolerance semantics as the training merge). Weather labels are precomputed
+per reading at load time, so a lookup is a searchsorted plus a few indexings.
+"""
+
+import glob
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from mock.weather_generator import WeatherMockGenerator
+from mock.traffic_generator import TrafficMockGenerator
+from src.datetime_parsing import parse_datetimes, WEATHER_FORMAT
+
+logger = logging.getLogger(__name__)
+
+WEATHER_FEATURES = [
+    'relative_humidity_2m (%)', 'cloud_cover (%)', 'wind_speed_10m (km/h)', 'precipitation (mm)'
+]
+
+
+class _CityWeather:
+    def __init__(self, df: pd.DataFrame, mtime: float):
+        df = df.sort_values("time", kind="stable")
+        self.mtime = mtime
+        self.times = df["time"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        self.columns = {col: df[col].to_numpy(dtype=float) for col in WEATHER_FEATURES}
+        generator = WeatherMockGenerator()
+        self.labels = np.array([generator.generate_label(row) for row in df.to_dict(orient="records")], dtype=object)
+
+
+class WeatherFeatureStore:
+    """As-of weather lookups by (city, timestamp) over files named `<city>_weather.csv`."""
+
+    def __init__(self, weather_dir: str = "Pickup_and_delivery_data/weather", tolerance=pd.Timedelta("1h")):
+        self.weather_dir = weather_dir
+        self.tolerance_ns = pd.Timedelta(tolerance).value
+        self.cities = {}
+        self._traffic = TrafficMockGenerator()
+
+    def _files(self) -> dict:
+        paths = glob.glob(os.path.join(self.weather_dir, "*_weather.csv"))
+        return {os.path.basename(p)[:-len("_weather.csv")]: p for p in paths}
+
+    def refresh(self) -> int:
+        """(Re)load every city whose file is new or changed since the last load; returns the count reloaded."""
+        if not os.path.isdir(self.weather_dir):
+            raise FileNotFoundError(f"Weather data directory not found: {self.weather_dir}")
+        reloaded = 0
+        for city, path in self._files().items():
+            mtime = os.path.getmtime(path)
+            current = self.cities.get(city)
+            if current is not None and current.mtime == mtime:
+                continue
+            df = pd.read_csv(path)
+            df["time"] = parse_datetimes(df["time"], format=WEATHER_FORMAT)
+            self.cities[city] = _CityWeather(df, mtime)
+            reloaded += 1
+        if reloaded:
+            logger.info(f"🌦️ Weather store refreshed: {reloaded} cities reloaded ({len(self.cities)} total)")
+        return reloaded
+
+    def lookup(self, city: str, timestamp) -> dict:
+        """Weather features + label (and the reading's `time`) for the latest reading within tolerance, or None."""
+        table = self.cities.get(city)
+        if table is None:
+            return None
+        ts = pd.Timestamp(timestamp).tz_localize(None).value
+        idx = int(np.searchsorted(table.times, ts, side="right")) - 1
+        if idx < 0 or ts - table.times[idx] > self.tolerance_ns:
+            return None
+        features = {col: float(values[idx]) for col, values in table.columns.items()}
+        features["Weather_Label"] = table.labels[idx]
+        features["time"] = pd.Timestamp(table.times[idx])
+        return features
+
+    def build_features(self, city: str, timestamp, distance_km: float, aoi_type: int) -> dict:
+        """
+        Full model feature row (keyed like InferenceRequest aliases) for a lite request,
+        or None when no weather reading is available for that city/time.
+
+        `timestamp` is used the way training uses delivery_time: weather is the reading
+        as-of it, Traffic_Label is generated from it, and the cyclical time features come
+        from the matched reading's hour (training's accept_time is that weather `time`).
+        """
+        weather = self.lookup(city, timestamp)
+        if weather is None:
+            return None
+        ts = pd.Timestamp(timestamp).tz_localize(None)
+        reading = weather["time"]
+        return {
+            "distance_km": distance_km,
+            **{col: weather[col] for col in WEATHER_FEATURES},
+            "accept_hour_sin": float(np.sin(2 * np.pi * reading.hour / 24)),
+            "accept_hour_cos": float(np.cos(2 * np.pi * reading.hour / 24)),
+            "accept_dow_sin": float(np.sin(2 * np.pi * reading.dayofweek / 7)),
+            "accept_dow_cos": float(np.cos(2 * np.pi * reading.dayofweek / 7)),
+            "Weather_Label": weather["Weather_Label"],
+            "Traffic_Label": self._traffic.generate_label(ts),
+            "city": city,
+            "aoi_type": aoi_type,
+        }
@@ -0,0 +1,194 @@
+# src/spatial_speed_index.py
+"""
+Spatial Speed Index
+-------------------
+Historical delivery speeds keyed by (pickup grid cell, drop-off grid cell,
+hour-of-day bucket). Built from the training split in one aggregated pass and
+persisted as a compact .npz of sorted int64 cell-pair keys plus per-bucket
+distance / minutes / count arrays, so the inference service can look up the
+features for a request's coordinates with one binary search — no routing.
+
+Sparse cells are shrunk towards the per-hour-bucket average speed, and requests
+without coordinates (or in cells never seen in training) get that average.
+"""
+
+import numpy as np
+import pandas as pd
+
+SPEED_INDEX_FEATURES = ["grid_speed_kmh", "grid_eta_min", "grid_support"]
+COORDINATE_COLUMNS = ["accept_gps_lat", "accept_gps_lng", "delivery_gps_lat", "delivery_gps_lng"]
+
+
+def uses_speed_index(model) -> bool:
+    """True when a fitted pipeline (or its ColumnTransformer) was trained with SPEED_INDEX_FEATURES."""
+    preprocessor = model.named_steps["preprocessor"] if hasattr(model, "named_steps") else model
+    return any(SPEED_INDEX_FEATURES[0] in list(columns) for _, _, columns in preprocessor.transformers_)
+
+
+class SpatialSpeedIndex:
+    """Cell-pair × hour-bucket sums of distance (km), delivery minutes and order counts."""
+
+    def __init__(self, keys, distance_km, minutes, counts, cell_deg: float = 0.01,
+                 bucket_hours: int = 3, prior_weight: float = 5.0):
+        self.keys = np.asarray(keys, dtype=np.int64)              # sorted cell-pair keys, shape (n,)
+        self.distance_km = np.asarray(distance_km, dtype=np.float32)  # shape (n, n_buckets)
+        self.minutes = np.asarray(minutes, dtype=np.float32)
+        self.counts = np.asarray(counts, dtype=np.int32)
+        self.cell_deg = float(cell_deg)
+        self.bucket_hours = int(bucket_hours)
+        self.prior_weight = float(prior_weight)
+
+        self._n_cols = int(np.ceil(360 / self.cell_deg))
+        self._n_cells = int(np.ceil(180 / self.cell_deg)) * self._n_cols
+        if self._n_cells ** 2 >= 2 ** 63:
+            raise ValueError(f"cell_deg={cell_deg} is too fine for int64 cell-pair keys")
+
+        # Per-bucket prior: average distance and minutes per order across all cells
+        bucket_counts = np.maximum(self.counts.sum(axis=0, dtype=np.float64), 1)
+        self.prior_distance = self.distance_km.sum(axis=0, dtype=np.float64) / bucket_counts
+        self.prior_minutes = self.minutes.sum(axis=0, dtype=np.float64) / bucket_counts
+
+    @property
+    def n_buckets(self) -> int:
+        return 24 // self.bucket_hours
+
+    def __len__(self):
+        return self.keys.size
+
+    # =====================
+    # Keys
+    # =====================
+    def _cell(self, lat, lng) -> np.ndarray:
+        lat = np.asarray(lat, dtype=float)
+        lng = np.asarray(lng, dtype=float)
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        row = np.floor((np.where(valid, lat, 0) + 90) / self.cell_deg).astype(np.int64)
+        col = np.floor((np.where(valid, lng, 0) + 180) / self.cell_deg).astype(np.int64)
+        return np.where(valid, row * self._n_cols + col, -1)
+
+    def pair_keys(self, pickup_lat, pickup_lng, drop_lat, drop_lng) -> np.ndarray:
+        """int64 key per (pickup cell, drop-off cell); -1 where a coordinate is missing."""
+        pickup = self._cell(pickup_lat, pickup_lng)
+        drop = self._cell(drop_lat, drop_lng)
+        return np.where((pickup >= 0) & (drop >= 0), pickup * self._n_cells + drop, -1)
+
+    def hour_bucket(self, hour) -> np.ndarray:
+        return (np.asarray(hour, dtype=np.int64) % 24) // self.bucket_hours
+
+    # =====================
+    # Build
+    # =====================
+    @classmethod
+    def build(cls, pickup_lat, pickup_lng, drop_lat, drop_lng, hour, distance_km, minutes,
+              cell_deg: float = 0.01, bucket_hours: int = 3, prior_weight: float = 5.0) -> "SpatialSpeedIndex":
+        """Aggregate historical deliveries (one bincount per statistic over the unique cell pairs)."""
+        if 24 % bucket_hours:
+            raise ValueError("bucket_hours must divide 24")
+        index = cls(np.empty(0), np.empty((0, 24 // bucket_hours)), np.empty((0, 24 // bucket_hours)),
+                    np.empty((0, 24 // bucket_hours)), cell_deg, bucket_hours, prior_weight)
+
+        keys = index.pair_keys(pickup_lat, pickup_lng, drop_lat, drop_lng)
+        buckets = index.hour_bucket(hour)
+        distance_km = np.asarray(distance_km, dtype=float)
+        minutes = np.asarray(minutes, dtype=float)
+        valid = (keys >= 0) & np.isfinite(distance_km) & np.isfinite(minutes) & (minutes > 0)
+
+        unique_keys, inverse = np.unique(keys[valid], return_inverse=True)
+        n_buckets = index.n_buckets
+        flat = inverse * n_buckets + buckets[valid]
+        size = unique_keys.size * n_buckets
+        shape = (unique_keys.size, n_buckets)
+        return cls(
+            unique_keys,
+            np.bincount(flat, weights=distance_km[valid], minlength=size).reshape(shape),
+            np.bincount(flat, weights=minutes[valid], minlength=size).reshape(shape),
+            np.bincount(flat, minlength=size).reshape(shape),
+            cell_deg, bucket_hours, prior_weight,
+        )
+
+    # =====================
+    # Lookup
+    # =====================
+    def lookup(self, pickup_lat, pickup_lng, drop_lat, drop_lng, hour, distance_km,
+               exclude_distance=None, exclude_minutes=None) -> dict:
+        """
+        Feature arrays for each request: shrunk historical speed (km/h), the ETA that speed
+        implies for `distance_km`, and log1p of the number of orders behind it.
+        `exclude_*` remove each row's own order from its cell (leave-one-out for training rows).
+        """
+        keys = self.pair_keys(pickup_lat, pickup_lng, drop_lat, drop_lng)
+        buckets = self.hour_bucket(hour)
+
+        rows = np.searchsorted(self.keys, keys)
+        rows = np.minimum(rows, max(self.keys.size - 1, 0))
+        found = (keys >= 0) & (self.keys.size > 0)
+        if self.keys.size:
+            found &= self.keys[rows] == keys
+
+        cell_distance = np.zeros(keys.shape)
+        cell_minutes = np.zeros(keys.shape)
+        cell_count = np.zeros(keys.shape)
+        if found.any():
+            r, b = rows[found], buckets[found]
+            cell_distance[found] = self.distance_km[r, b]
+            cell_minutes[found] = self.minutes[r, b]
+            cell_count[found] = self.counts[r, b]
+        if exclude_minutes is not None:
+            exclude_distance = np.asarray(exclude_distance, dtype=float)
+            exclude_minutes = np.asarray(exclude_minutes, dtype=float)
+            # Only rows that build() counted (same validity rule) are taken back out
+            own = (found & (cell_count > 0) & np.isfinite(exclude_distance)
+                   & np.isfinite(exclude_minutes) & (exclude_minutes > 0))
+            cell_distance[own] -= exclude_distance[own]
+            cell_minutes[own] -= exclude_minutes[own]
+            cell_count[own] -= 1
+            np.maximum(cell_distance, 0, out=cell_distance)
+            np.maximum(cell_minutes, 0, out=cell_minutes)
+
+        m = self.prior_weight
+        speed = 60 * (cell_distance + m * self.prior_distance[buckets]) / np.maximum(
+            cell_minutes + m * self.prior_minutes[buckets], 1e-6)
+        return {
+            "grid_speed_kmh": speed,
+            "grid_eta_min": 60 * np.asarray(distance_km, dtype=float) / np.maximum(speed, 1e-6),
+            "grid_support": np.log1p(cell_count),
+        }
+
+    def add_features(self, df: pd.DataFrame, leave_one_out: bool = False) -> pd.DataFrame:
+        """
+        Add SPEED_INDEX_FEATURES to `df`. The hour comes from `accept_time` when present,
+        otherwise from the cyclical hour encoding the API receives; missing coordinates
+        fall back to the hour-bucket average.
+        """
+        nan = pd.Series(np.nan, index=df.index)
+        coords = [df.get(col, nan).to_numpy(dtype=float) for col in COORDINATE_COLUMNS]
+        if "accept_time" in df.columns:
+            hour = df["accept_time"].dt.hour.to_numpy()
+        else:
+            angle = np.arctan2(df["accept_hour_sin"].to_numpy(dtype=float), df["accept_hour_cos"].to_numpy(dtype=float))
+            hour = np.rint(angle * 24 / (2 * np.pi)).astype(np.int64) % 24
+
+        exclude = {}
+        if leave_one_out:
+            exclude = {"exclude_distance": df["distance_km"].to_numpy(dtype=float),
+                       "exclude_minutes": df["ETA_target"].to_numpy(dtype=float)}
+        features = self.lookup(*coords, hour, df["distance_km"].to_numpy(dtype=float), **exclude)
+        for name, values in features.items():
+            df[name] = values
+        return df
+
+    # =====================
+    # Persistence
+    # =====================
+    def save(self, path: str):
+        np.savez_compressed(
+            path, keys=self.keys, distance_km=self.distance_km, minutes=self.minutes, counts=self.counts,
+            params=np.array([self.cell_deg, self.bucket_hours, self.prior_weight]),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SpatialSpeedIndex":
+        with np.load(path) as data:
+            cell_deg, bucket_hours, prior_weight = data["params"]
+            return cls(data["keys"], data["distance_km"], data["minutes"], data["counts"],
+                       cell_deg, int(bucket_hours), prior_weight)
@@ -0,0 +1,103 @@
+# src/weather_join.py
+"""
+Weather Join Module
+-------------------
+Single-pass, multi-city as-of join of deliveries onto hourly weather.
+Equivalent to running `pd.merge_asof(direction="backward", tolerance=1h)` once
+per city and concatenating, but every city is handled in one call over int64
+epoch arrays: both sides are sorted once by (city, time) — or not at all when
+already sorted — and each city is then matched with a single searchsorted.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class MultiCityWeatherJoiner:
+    """Backward as-of join of delivery rows onto weather readings, grouped by city."""
+
+    def __init__(self, left_on: str = "delivery_time", right_on: str = "time",
+                 tolerance=pd.Timedelta("1h"), suffixes=("_x", "_y")):
+        self.left_on = left_on
+        self.right_on = right_on
+        self.tolerance_ns = pd.Timedelta(tolerance).value
+        self.suffixes = suffixes
+
+    @staticmethod
+    def _stack(frames: dict):
+        """Concatenate per-city frames and return (frame, city codes, city names)."""
+        names = list(frames)
+        lengths = [len(frames[name]) for name in names]
+        codes = np.repeat(np.arange(len(names)), lengths)
+        return pd.concat(frames.values(), ignore_index=True), codes, names
+
+    @staticmethod
+    def _epoch_ns(values: pd.Series) -> np.ndarray:
+        return values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    @staticmethod
+    def _sort_order(codes: np.ndarray, keys: np.ndarray, assume_sorted: bool):
+        """Stable (city, time) order, or None when the rows are already in that order."""
+        if assume_sorted:
+            return None
+        same_city = codes[1:] == codes[:-1]
+        if np.all(codes[1:] >= codes[:-1]) and np.all(~same_city | (keys[1:] >= keys[:-1])):
+            return None
+        return np.lexsort((keys, codes))
+
+    def join(self, deliveries: dict, weather: dict, assume_sorted: bool = False):
+        """
+        Join {city: delivery_df} onto {city: weather_df}.
+
+        Returns (joined_df, city_names) with rows grouped by city in the order of
+        `deliveries` and sorted by delivery time within each city, matching the
+        per-city merge_asof + concat output. Deliveries with exactly equal times
+        keep their input order. Rows without a reading within tolerance get NA
+        weather columns.
+        """
+        left, left_codes, cities = self._stack(deliveries)
+        right, right_codes, _ = self._stack({city: weather[city] for city in cities})
+
+        left_ns = self._epoch_ns(left[self.left_on])
+        left_nat = left[self.left_on].isna().to_numpy()
+        # NaT sorts last within its city (like sort_values) and never matches
+        left_keys = np.where(left_nat, np.iinfo(np.int64).max, left_ns)
+        right_ns = self._epoch_ns(right[self.right_on])
+
+        left_order = self._sort_order(left_codes, left_keys, assume_sorted)
+        if left_order is not None:
+            left, left_codes = left.take(left_order).reset_index(drop=True), left_codes[left_order]
+            left_keys, left_nat = left_keys[left_order], left_nat[left_order]
+        right_order = self._sort_order(right_codes, right_ns, assume_sorted)
+        if right_order is not None:
+            right = right.take(right_order).reset_index(drop=True)
+            right_codes, right_ns = right_codes[right_order], right_ns[right_order]
+
+        # === One searchsorted per city over contiguous slices ===
+        match = np.full(len(left), -1, dtype=np.int64)
+        left_bounds = np.searchsorted(left_codes, np.arange(len(cities) + 1))
+        right_bounds = np.searchsorted(right_codes, np.arange(len(cities) + 1))
+        for code in range(len(cities)):
+            ls, le = left_bounds[code], left_bounds[code + 1]
+            rs, re = right_bounds[code], right_bounds[code + 1]
+            if ls == le or rs == re:
+                continue
+            city_right = right_ns[rs:re]
+            city_left = left_keys[ls:le]
+            idx = np.searchsorted(city_right, city_left, side="right") - 1
+            valid = (idx >= 0) & ~left_nat[ls:le]
+            valid[valid] = city_left[valid] - city_right[idx[valid]] <= self.tolerance_ns
+            match[ls:le] = np.where(valid, rs + idx, -1)
+
+        # === Assemble columns like merge_asof (overlapping names get suffixes) ===
+        # right has a fresh RangeIndex, so label -1 is missing and reindex fills NA with
+        # the same dtype upcasts merge_asof applies to unmatched rows
+        matched = right.reindex(match)
+        overlap = (set(left.columns) & set(right.columns)) - {self.left_on, self.right_on}
+        joined = {}
+        for col in left.columns:
+            joined[f"{col}{self.suffixes[0]}" if col in overlap else col] = left[col].array
+        for col in right.columns:
+            joined[f"{col}{self.suffixes[1]}" if col in overlap else col] = matched[col].array
+
+        return pd.DataFrame(joined), np.asarray(cities, dtype=object)[left_codes]
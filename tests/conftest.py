@@ -1,4 +1,5 @@
 # tests/conftest.py
+import asyncio
 import os
 import sys
 import logging
@@ -21,3 +22,26 @@ def model_paths():
         "reg_path": "models/best_regression_pipeline.pkl",
         "clf_path": "models/best_classification_pipeline.pkl"
     }
+
+
+@pytest.fixture
+def local_redis_host(monkeypatch):
+    """Point main.py's Redis at localhost (fails fast when absent) without leaking the setting."""
+    monkeypatch.setenv("REDIS_HOST", os.getenv("REDIS_HOST", "127.0.0.1"))
+
+
+@pytest.fixture
+def api(local_redis_host):
+    """
+    Run `await scenario(client, fake_redis)` against main.app inside its lifespan, with the
+    Redis client swapped for an in-memory FakeRedis; returns the scenario's result.
+    """
+    from tests.utils.asgi_app import serving_app
+
+    def run(scenario):
+        async def session():
+            async with serving_app() as (client, fake_redis):
+                return await scenario(client, fake_redis)
+        return asyncio.run(session())
+
+    return run
@@ -0,0 +1,234 @@
+# tests/load_harness.py
+"""
+Load Testing Harness
+--------------------
+Drives the FastAPI app from main.py in-process (raw ASGI calls, no network)
+against an in-memory fake Redis. Replays either a synthetic traffic mix
+(cache-hit ratio, concurrency, Zipf-skewed hot payloads) or a captured
+request log, and reports throughput plus p50/p95/p99 latency split into
+cache hits and misses.
+
+Usage:
+    python -m tests.load_harness --requests 2000 --concurrency 16 --hit-ratio 0.8
+    python -m tests.load_harness --replay captured_requests.jsonl --json-out report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+import numpy as np
+
+from tests.utils.asgi_app import ASGIClient, serving_app
+from tests.utils.fake_redis import FakeRedis
+from tests.utils.payloads import make_payload
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# Traffic Generation
+# =====================
+class TrafficMix:
+    """Synthetic traffic: a Zipf-skewed hot set (cache hits) mixed with unique payloads (misses)."""
+
+    def __init__(self, n_requests=1000, cache_hit_ratio=0.8, hot_set_size=50, skew=1.1, seed=42):
+        self.n_requests = n_requests
+        self.cache_hit_ratio = cache_hit_ratio
+        self.hot_set_size = hot_set_size
+        self.skew = skew
+        self.seed = seed
+
+    def build(self):
+        """Return (warmup_payloads, payloads). Warmup populates the cache with the hot set."""
+        rng = np.random.default_rng(self.seed)
+        hot_set = [make_payload(rng, order_id=i) for i in range(self.hot_set_size)]
+
+        # Zipf weights over the hot set; skew=0 gives uniform popularity
+        ranks = np.arange(1, self.hot_set_size + 1, dtype=float)
+        weights = ranks ** -self.skew
+        weights /= weights.sum()
+
+        is_hit = rng.random(self.n_requests) < self.cache_hit_ratio
+        hot_choices = rng.choice(self.hot_set_size, size=self.n_requests, p=weights)
+
+        payloads = []
+        next_order_id = self.hot_set_size
+        for hit, hot_idx in zip(is_hit, hot_choices):
+            if hit:
+                payloads.append(hot_set[hot_idx])
+            else:
+                payloads.append(make_payload(rng, order_id=next_order_id))
+                next_order_id += 1
+        return hot_set, payloads
+
+
+def load_request_log(path: str) -> list:
+    """Read a captured request log (JSONL). Each line is a payload or {"body": payload, ...}."""
+    payloads = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            payloads.append(record["body"] if "body" in record else record)
+    return payloads
+
+
+# =====================
+# Harness
+# =====================
+class LoadHarness:
+    """Runs the API in-process with a fake Redis and measures request latency."""
+
+    def __init__(self, path="/predict", concurrency=8, timeout_ms: float = None, rate: float = None):
+        self.path = path
+        self.concurrency = concurrency
+        # Open-loop mode: issue requests at a fixed rate regardless of responses (overload testing)
+        self.rate = rate
+        # Sent as X-Request-Timeout-Ms so the API can shed requests it cannot finish in time
+        self.headers = {"x-request-timeout-ms": str(timeout_ms)} if timeout_ms else None
+        self.fake_redis = FakeRedis()
+
+    async def _run_requests(self, client: ASGIClient, payloads: list) -> list:
+        queue = asyncio.Queue()
+        for payload in payloads:
+            queue.put_nowait(payload)
+        samples = []
+
+        async def worker():
+            while True:
+                try:
+                    payload = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                status, headers, _ = await client.post_json(self.path, payload, self.headers)
+                latency_ms = (time.perf_counter() - start) * 1000
+                samples.append((latency_ms, status, headers.get("x-cache", "NONE")))
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return samples
+
+    async def _run_open_loop(self, client: ASGIClient, payloads: list) -> list:
+        samples = []
+
+        async def one(payload):
+            start = time.perf_counter()
+            status, headers, _ = await client.post_json(self.path, payload, self.headers)
+            latency_ms = (time.perf_counter() - start) * 1000
+            samples.append((latency_ms, status, headers.get("x-cache", "NONE")))
+
+        tasks = []
+        start = time.perf_counter()
+        for i, payload in enumerate(payloads):
+            delay = start + i / self.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(payload)))
+        await asyncio.gather(*tasks)
+        return samples
+
+    async def _run(self, payloads: list, warmup: list) -> dict:
+        async with serving_app(self.fake_redis) as (client, _):
+            if warmup:
+                await self._run_requests(client, warmup)
+                logger.info("🔥 Warmed cache with %d payloads", len(warmup))
+
+            start = time.perf_counter()
+            if self.rate:
+                samples = await self._run_open_loop(client, payloads)
+            else:
+                samples = await self._run_requests(client, payloads)
+            wall_s = time.perf_counter() - start
+        return self.summarize(samples, wall_s)
+
+    def run(self, payloads: list, warmup: list = None) -> dict:
+        return asyncio.run(self._run(payloads, warmup or []))
+
+    def run_mix(self, mix: TrafficMix) -> dict:
+        warmup, payloads = mix.build()
+        return self.run(payloads, warmup)
+
+    @staticmethod
+    def _latency_stats(latencies: list) -> dict:
+        if not latencies:
+            return {"count": 0}
+        arr = np.asarray(latencies)
+        return {
+            "count": int(arr.size),
+            "mean_ms": float(arr.mean()),
+            "p50_ms": float(np.percentile(arr, 50)),
+            "p95_ms": float(np.percentile(arr, 95)),
+            "p99_ms": float(np.percentile(arr, 99)),
+            "max_ms": float(arr.max()),
+        }
+
+    def summarize(self, samples: list, wall_s: float) -> dict:
+        ok = [s for s in samples if s[1] == 200]
+        return {
+            "requests": len(samples),
+            "errors": len(samples) - len(ok),
+            "status_counts": {str(k): v for k, v in Counter(s[1] for s in samples).items()},
+            "concurrency": self.concurrency,
+            "wall_time_s": wall_s,
+            "throughput_rps": len(samples) / wall_s if wall_s > 0 else 0.0,
+            "goodput_rps": len(ok) / wall_s if wall_s > 0 else 0.0,
+            "shed": sum(1 for s in samples if s[1] == 503),
+            "overall": self._latency_stats([s[0] for s in ok]),
+            "cache_hit": self._latency_stats([s[0] for s in ok if s[2] == "HIT"]),
+            "cache_miss": self._latency_stats([s[0] for s in ok if s[2] != "HIT"]),
+        }
+
+
+def print_report(report: dict):
+    print("\n===== Load Test Report =====")
+    print(f"Requests: {report['requests']}  Errors: {report['errors']}  Concurrency: {report['concurrency']}")
+    print(f"Throughput: {report['throughput_rps']:.1f} req/s over {report['wall_time_s']:.2f}s "
+          f"(goodput {report['goodput_rps']:.1f} req/s, shed {report['shed']})")
+    for name in ("overall", "cache_hit", "cache_miss"):
+        stats = report[name]
+        if stats["count"] == 0:
+            print(f"{name:>10}: no requests")
+            continue
+        print(
+            f"{name:>10}: n={stats['count']:<6} p50={stats['p50_ms']:.2f}ms "
+            f"p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    # Fail fast to the fake cache instead of resolving the Docker service name
+    os.environ.setdefault("REDIS_HOST", "127.0.0.1")
+    parser = argparse.ArgumentParser(description="In-process load test for the inference API.")
+    parser.add_argument("--path", default="/predict")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--hit-ratio", type=float, default=0.8)
+    parser.add_argument("--hot-set", type=int, default=50)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent over the hot set")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replay", help="JSONL request log to replay instead of a synthetic mix")
+    parser.add_argument("--json-out", help="Write the report as JSON to this path")
+    parser.add_argument("--timeout-ms", type=float, help="Client deadline sent with every request")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate (req/s) instead of closed-loop workers")
+    args = parser.parse_args()
+
+    harness = LoadHarness(path=args.path, concurrency=args.concurrency, timeout_ms=args.timeout_ms,
+                          rate=args.rate)
+    if args.replay:
+        report = harness.run(load_request_log(args.replay))
+    else:
+        report = harness.run_mix(TrafficMix(args.requests, args.hit_ratio, args.hot_set, args.skew, args.seed))
+
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved report to {args.json_out}")
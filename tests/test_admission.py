@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import pytest
+from src.serving.admission import AdmissionController, AdmissionRejected
+
+
+def test_queue_bound_and_deadline_shedding():
+    async def scenario():
+        controller = AdmissionController(initial_limit=1, max_limit=1, max_queue=1)
+        controller.latency_ewma = controller.baseline = 0.05  # warmed-up estimate: 50 ms per inference
+
+        await controller.acquire()                              # runs
+        queued = asyncio.create_task(controller.acquire())      # waits in the queue
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire()
+        assert full.value.reason == "admission queue full" and full.value.retry_after > 0
+
+        controller.release(0.05)
+        await queued
+        assert controller.in_flight == 1
+
+        # 10 ms left but one 50 ms inference ahead: rejected without queueing
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(deadline=time.monotonic() + 0.01)
+        assert controller.stats()["queue_depth"] == 0
+        assert controller.counters["shed_deadline"] == 1 and controller.counters["shed_queue_full"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_limit_adapts_to_latency():
+    controller = AdmissionController(initial_limit=4, max_limit=16)
+    controller.latency_ewma = controller.baseline = 0.01
+
+    # Saturated at the limit with healthy latency: additive increase
+    for _ in range(40):
+        controller.in_flight = int(controller.limit)
+        controller.release(0.01)
+    grown = controller.limit
+    assert grown > 4
+
+    # Latency inflates well past the baseline: multiplicative decrease
+    for _ in range(200):
+        controller.in_flight = int(controller.limit)
+        controller.release(0.2)
+    assert controller.limit < grown / 2
+    assert controller.limit >= controller.min_limit
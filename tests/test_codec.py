@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+from src.serving import codec
+from tests.utils.payloads import make_payload
+
+
+def test_codec_round_trip_matches_stdlib_json():
+    import main
+
+    # Shaped exactly like a /predict response (InferenceResponse), including a missing threshold
+    payload = main.InferenceResponse(order_id=17, city="Jilin ✓", Predicted_ETA=42.125, Predicted_Delay=1,
+                                     Delay_Threshold=None).model_dump()
+
+    encoded = codec.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == payload == json.loads(encoded)
+
+    # Key order does not change the hashing encoding
+    reordered = dict(reversed(list(payload.items())))
+    assert codec.dumps_sorted(reordered) == codec.dumps_sorted(payload)
+
+
+def test_fast_codec_cache_hit_returns_stored_bytes(api, monkeypatch):
+    """With FAST_CODEC the cached body is served verbatim with X-Cache: HIT."""
+    import main
+
+    monkeypatch.setattr(main, "FAST_CODEC", True)
+    payload = make_payload(np.random.default_rng(4), order_id=21)
+
+    async def scenario(client, fake_redis):
+        miss = await client.post_json("/predict", payload)
+        hit = await client.post_json("/predict", payload)
+
+        # Whatever bytes the cache holds go out untouched (no decode / re-validate / re-encode)
+        (key,) = fake_redis._store
+        stored = b'{"order_id":21,"city":"sentinel","Predicted_ETA":1.5,"Predicted_Delay":0,"Delay_Threshold":null}'
+        await fake_redis.setex(key, 300, stored)
+        sentinel = await client.post_json("/predict", payload)
+        return miss, hit, sentinel, stored
+
+    miss, hit, sentinel, stored = api(scenario)
+    assert miss[0] == 200 and miss[1]["x-cache"] == "MISS"
+    assert set(json.loads(miss[2])) == set(main.InferenceResponse.model_fields)
+    assert hit[0] == 200 and hit[1]["x-cache"] == "HIT"
+    assert hit[2] == miss[2]
+    assert sentinel[1]["x-cache"] == "HIT" and sentinel[2] == stored
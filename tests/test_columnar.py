@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from src.serving.columnar import ColumnarPayloadError, decode_arrow_stream, encode_arrow_stream
+from tests.utils.payloads import make_payload
+
+
+def _stream(frame: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _payloads(n: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # Non-monotonic order ids so a reordered response cannot pass by accident
+    return pd.DataFrame([make_payload(rng, order_id=int(i)) for i in rng.permutation(n) * 7 + 3])
+
+
+def test_arrow_round_trip_accepts_aliases():
+    """Columns decode under their model names whether the payload uses the alias or the field name."""
+    columns = {
+        "order_id": (("order_id",), pa.int64()),
+        "relative_humidity_2m (%)": (("relative_humidity_2m", "relative_humidity_2m (%)"), pa.float64()),
+        "city": (("city",), pa.string()),
+    }
+    frame = pd.DataFrame({"order_id": [3, 1, 2], "relative_humidity_2m": [55.0, 60.5, 71.0], "city": ["sh", "hz", "sh"]})
+
+    decoded = decode_arrow_stream(_stream(frame), columns)
+    assert list(decoded.columns) == ["order_id", "relative_humidity_2m (%)", "city"]
+    assert decoded["order_id"].tolist() == [3, 1, 2]
+    assert decoded["relative_humidity_2m (%)"].tolist() == [55.0, 60.5, 71.0]
+    assert decoded["city"].astype(str).tolist() == ["sh", "hz", "sh"]
+
+    aliased = frame.rename(columns={"relative_humidity_2m": "relative_humidity_2m (%)"})
+    assert decode_arrow_stream(_stream(aliased), columns)["relative_humidity_2m (%)"].tolist() == [55.0, 60.5, 71.0]
+
+    encoded = encode_arrow_stream({"order_id": decoded["order_id"].to_numpy(), "eta": np.array([1.5, np.nan, 3.0])})
+    table = pa.ipc.open_stream(encoded).read_all()
+    assert table.column("order_id").to_pylist() == [3, 1, 2]
+    assert table.column("eta").to_pylist() == [1.5, None, 3.0]
+
+
+def test_arrow_rejects_missing_and_mistyped_columns():
+    columns = {"order_id": (("order_id",), pa.int64()), "distance_km": (("distance_km",), pa.float64())}
+    with pytest.raises(ColumnarPayloadError, match="Missing columns"):
+        decode_arrow_stream(_stream(pd.DataFrame({"order_id": [1]})), columns)
+    with pytest.raises(ColumnarPayloadError, match="cannot be cast"):
+        decode_arrow_stream(_stream(pd.DataFrame({"order_id": [1], "distance_km": ["far"]})), columns)
+    with pytest.raises(ColumnarPayloadError, match="Invalid Arrow IPC stream"):
+        decode_arrow_stream(b"not arrow", columns)
+
+
+def test_predict_arrow_endpoint(api, model_paths):
+    """Rows come back in request order and match /predict scoring; bad payloads are 422s."""
+    from src.modeling.inference_pipeline import InferencePipeline
+
+    payloads = _payloads(25)
+    expected = InferencePipeline(**model_paths).predict(payloads)
+
+    async def scenario(client, _):
+        ok = await client.request("POST", "/predict/arrow", _stream(payloads))
+        missing = await client.request("POST", "/predict/arrow", _stream(payloads.drop(columns=["city"])))
+        mistyped = await client.request("POST", "/predict/arrow", _stream(payloads.assign(distance_km="far")))
+        return ok, missing, mistyped
+
+    (status, headers, body), missing, mistyped = api(scenario)
+    assert status == 200 and headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(body).read_all()
+    assert table.column("order_id").to_pylist() == payloads["order_id"].tolist()
+    np.testing.assert_allclose(table.column("Predicted_ETA").to_numpy(), expected["ETA_Prediction"], rtol=1e-6)
+    assert table.column("Predicted_Delay").to_pylist() == expected["Delay_Prediction"].tolist()
+
+    assert missing[0] == 422 and b"Missing columns" in missing[2]
+    assert mistyped[0] == 422 and b"distance_km" in mistyped[2]
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from src.modeling.cross_validation import RollingOriginCV
+from src.modeling.data_preparation import DataPreparator
+from src.modeling.modeling_pipeline import ModelingPipeline
+from src.modeling.preprocessing import PreprocessorFactory
+
+
+def test_rolling_origin_folds_respect_time_order():
+    rng = np.random.default_rng(0)
+    times = pd.Timestamp("2023-06-01") + pd.to_timedelta(rng.permutation(1000), unit="min")
+    df = pd.DataFrame({"accept_time": times})  # deliberately unsorted
+    preparator = DataPreparator()
+
+    expanding = preparator.rolling_origin_splits(df, n_folds=4, test_size=0.1, gap=5)
+    assert len(expanding) == 4
+    for k, (train_idx, test_idx) in enumerate(expanding):
+        assert len(test_idx) == 100 and len(train_idx) == 600 + 100 * k - 5
+        assert df["accept_time"].iloc[train_idx].max() < df["accept_time"].iloc[test_idx].min()
+    all_test = np.concatenate([test for _, test in expanding])
+    assert len(np.unique(all_test)) == 400  # consecutive, non-overlapping test blocks
+
+    rolling = preparator.rolling_origin_splits(df, n_folds=4, test_size=100, mode="rolling", train_size=300)
+    assert [len(train) for train, _ in rolling] == [300] * 4
+    assert rolling[-1][1].tolist() == expanding[-1][1].tolist()
+
+
+def test_parallel_fold_scores_match_serial(tmp_path):
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(600, 4))
+    y_reg = X @ np.array([1.0, -2.0, 0.5, 0.0]) + rng.normal(scale=0.1, size=600)
+    y_clf = (y_reg > 0).astype(int)
+    df = pd.DataFrame({"accept_time": pd.date_range("2023-06-01", periods=600, freq="min")})
+    folds = DataPreparator().rolling_origin_splits(df, n_folds=3, test_size=0.1)
+
+    # Already memory-mapped input (as from the dataset cache) is shared by path, not copied
+    np.save(tmp_path / "X.npy", X)
+    X_mapped = np.load(tmp_path / "X.npy", mmap_mode="r")
+    candidates = {"linear": LinearRegression(), "tree": DecisionTreeRegressor(max_depth=3, random_state=0)}
+    serial = RollingOriginCV(folds, workers=1).evaluate(candidates, X, y_reg, "regression")
+    parallel = RollingOriginCV(folds, workers=2, tmp_dir=str(tmp_path)).evaluate(candidates, X_mapped, y_reg, "regression")
+
+    for name in candidates:
+        assert parallel[name]["rmse_mean"] == serial[name]["rmse_mean"]
+        assert len(parallel[name]["folds"]) == 3
+    assert serial["linear"]["rmse_mean"] < serial["tree"]["rmse_mean"]
+
+    clf = RollingOriginCV(folds, workers=2).evaluate({"logit": LogisticRegression()}, X, y_clf, "classification")
+    assert clf["logit"]["roc_auc_mean"] > 0.95 and clf["logit"]["accuracy_std"] >= 0
+
+
+def test_preprocessor_is_fitted_per_fold(tmp_path):
+    """Scaling and one-hot categories come from each fold's training rows only, serial or parallel."""
+    rng = np.random.default_rng(2)
+    n = 600
+    X = pd.DataFrame({
+        "trend": np.arange(n) + rng.normal(size=n),           # later rows are larger
+        "zone": np.where(np.arange(n) < 500, rng.choice(["a", "b"], n), "late"),  # "late" only in the last rows
+    })
+    y = X["trend"].to_numpy() * 0.1 + rng.normal(size=n)
+    folds = DataPreparator().rolling_origin_splits(
+        pd.DataFrame({"accept_time": pd.date_range("2023-06-01", periods=n, freq="min")}), n_folds=3, test_size=0.1
+    )
+    template = PreprocessorFactory.create_preprocessor(["trend"], ["zone"])
+    cv = RollingOriginCV(folds, workers=1, preprocessor=template)
+
+    for (train_idx, test_idx), (X_tr, X_te) in zip(folds, cv._fold_matrices(X)):
+        assert abs(X_tr[:, 0].mean()) < 1e-9 and X_tr[:, 0].std() == pytest.approx(1.0)
+        assert X_te[:, 0].min() > X_tr[:, 0].max()  # test rows are scaled with the training statistics
+        assert X_tr.shape[1] == 1 + X["zone"].iloc[train_idx].nunique()
+    assert not hasattr(template, "transformers_")  # only clones are fitted
+
+    candidates = {"linear": LinearRegression()}
+    serial = cv.evaluate(candidates, X, y, "regression")
+    parallel = RollingOriginCV(folds, workers=2, tmp_dir=str(tmp_path), preprocessor=template).evaluate(
+        candidates, X, y, "regression"
+    )
+    assert parallel["linear"]["rmse_mean"] == serial["linear"]["rmse_mean"]
+
+
+def test_cv_rejects_speed_index(tmp_path):
+    """Speed-index features come from the whole training split, so they would leak into every fold."""
+    with pytest.raises(ValueError, match="speed_index_cell_deg"):
+        ModelingPipeline(model_dir=str(tmp_path), cv_folds=3, speed_index_cell_deg=0.01)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from src.modeling.dataset_cache import PreprocessedDatasetCache
+from src.modeling.preprocessing import PreprocessorFactory
+
+
+def _split(seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "distance_km": rng.lognormal(1, 0.5, 300),
+        "precipitation (mm)": rng.gamma(0.5, 1.0, 300),
+        "city": rng.choice(["jilin", "yantai", "chongqing"], 300),
+        "aoi_type": rng.integers(0, 5, 300),
+    })
+    return df.iloc[:240], df.iloc[240:]
+
+
+def test_cache_reuses_matrices_and_preprocessor(tmp_path):
+    cache = PreprocessedDatasetCache(str(tmp_path))
+    num, cat = ["distance_km", "precipitation (mm)"], ["city", "aoi_type"]
+    X_train, X_test = _split(0)
+
+    expected = PreprocessorFactory.create_preprocessor(num, cat)
+    expected_train = expected.fit_transform(X_train)
+
+    _, train_1, test_1, key_1 = cache.fit_transform(PreprocessorFactory.create_preprocessor(num, cat), X_train, X_test)
+    fitted, train_2, test_2, key_2 = cache.fit_transform(PreprocessorFactory.create_preprocessor(num, cat), X_train, X_test)
+
+    assert key_1 == key_2
+    assert isinstance(train_2, np.memmap)
+    np.testing.assert_array_equal(train_2, expected_train)
+    np.testing.assert_array_equal(test_2, expected.transform(X_test))
+    np.testing.assert_array_equal(fitted.transform(X_test), test_1)
+
+    # Different data or preprocessing definition → different entry
+    other_train, other_test = _split(1)
+    assert cache.key(PreprocessorFactory.create_preprocessor(num, cat), other_train, other_test) != key_1
+    assert cache.key(PreprocessorFactory.create_preprocessor(num, ["city"]), X_train, X_test) != key_1
+    changed_dtype = X_train.astype({"aoi_type": "int32"})
+    assert cache.key(PreprocessorFactory.create_preprocessor(num, cat), changed_dtype, X_test) != key_1
+
+    # Raw columns the preprocessor never reads (ids, timestamps, targets) do not change the key
+    extra_train = X_train.assign(order_id=np.arange(len(X_train)), courier_note="x")
+    extra_test = X_test.assign(order_id=np.arange(len(X_test)), courier_note="y")
+    assert cache.key(PreprocessorFactory.create_preprocessor(num, cat), extra_train, extra_test) == key_1
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from src.datetime_parsing import (
+    parse_datetimes, parse_date_and_time, parse_datetime_columns,
+    LADE_FULL_FORMAT, LADE_YEAR_PREFIX, AMAZON_DATETIME_FORMAT, PIPELINE_FORMAT,
+)
+
+
+def test_memoized_parsing_matches_per_row_to_datetime():
+    rng = np.random.default_rng(5)
+    minutes = pd.Timestamp("2023-06-01") + pd.to_timedelta(rng.integers(0, 500, 5000), unit="min")
+    raw = pd.Series(minutes.strftime("%m-%d %H:%M:%S"), index=np.arange(5000) * 3)
+    raw.iloc[::97] = np.nan
+    raw.iloc[5] = "garbage"
+
+    legacy = pd.to_datetime("2023-" + raw.astype(str), format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    parsed = parse_datetimes(raw, format=LADE_FULL_FORMAT, errors="coerce", prefix=LADE_YEAR_PREFIX)
+    pd.testing.assert_series_equal(parsed, legacy)
+
+    # Mostly-distinct columns take the direct path with the same result
+    unique_raw = pd.Series(pd.date_range("2023-01-01", periods=30_000, freq="min").strftime("%m-%d %H:%M:%S"))
+    pd.testing.assert_series_equal(
+        parse_datetimes(unique_raw, format=LADE_FULL_FORMAT, errors="coerce", prefix=LADE_YEAR_PREFIX),
+        pd.to_datetime("2023-" + unique_raw, format="%Y-%m-%d %H:%M:%S", errors="coerce"),
+    )
+
+    # Already-parsed columns are passed through untouched
+    assert parse_datetimes(parsed, format=LADE_FULL_FORMAT) is parsed
+
+
+def test_date_and_time_pairs_match_concatenated_parse():
+    dates = pd.Series(["2022-03-19", "2022-03-25", "2022-03-19", "2022-04-01", "2022-03-19"])
+    times = pd.Series(["11:30:00", np.nan, "11:30:00", "NaN ", "19:45:00"])
+
+    legacy = pd.to_datetime(dates.astype(str) + " " + times.fillna("00:00:00"),
+                            format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    parsed = parse_date_and_time(dates, times, format=AMAZON_DATETIME_FORMAT)
+    pd.testing.assert_series_equal(parsed, legacy)
+
+
+def test_parse_datetime_columns_skips_parsed_and_missing_columns():
+    df = pd.DataFrame({
+        "accept_time": ["2023-05-01 10:00:00", "2023-05-01 10:05:00"],
+        "delivery_time": pd.to_datetime(["2023-05-01 11:00:00", "2023-05-01 11:30:00"]),
+    })
+    original = df["delivery_time"]
+    parse_datetime_columns(df, {c: PIPELINE_FORMAT for c in ["accept_time", "delivery_time", "pickup_time"]})
+
+    assert df["accept_time"].dtype == "datetime64[ns]"
+    assert df["delivery_time"].equals(original)
+    assert "pickup_time" not in df
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from src.delay_thresholds import DelayThresholdBuilder, DelayThresholdTable
+from src.quantile_sketch import QuantileSketch
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    """Chunked + merged sketches agree with exact quantiles within the accuracy bound."""
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(3, 1, 20000)
+
+    left = QuantileSketch(0.01).update(values[:7000])
+    right = QuantileSketch(0.01).update(values[7000:])
+    merged = left.merge(right)
+
+    assert merged.count == values.size
+    for q in (0.1, 0.5, 0.75, 0.99):
+        exact = np.quantile(values, q)
+        assert abs(merged.quantile(q) - exact) / exact < 0.02
+
+
+def test_builder_matches_pd_cut_bins(tmp_path):
+    """Bin edges follow pd.cut and chunked thresholds track the exact groupby quantile."""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"distance_km": rng.uniform(0.1, 12, 5000)})
+    df["ETA_target"] = df["distance_km"] * 6 + rng.exponential(10, len(df))
+
+    edges = DelayThresholdBuilder.equal_width_edges(df["distance_km"].min(), df["distance_km"].max(), 20)
+    builders = [DelayThresholdBuilder(edges).update(chunk["distance_km"], chunk["ETA_target"])
+                for chunk in (df.iloc[rows] for rows in np.array_split(np.arange(len(df)), 4))]
+    table = builders[0]
+    for other in builders[1:]:
+        table.merge(other)
+    table = table.build()
+
+    expected_bins = pd.cut(df["distance_km"], bins=20, labels=False)
+    assert (table.bin_index(df["distance_km"]) == expected_bins).all()
+
+    exact = df.groupby(expected_bins)["ETA_target"].quantile(0.75)
+    assert np.allclose(table.thresholds[exact.index], exact.values, rtol=0.02)
+
+    path = tmp_path / "delay_thresholds.json"
+    table.save(path)
+    loaded = DelayThresholdTable.load(path)
+    assert np.allclose(loaded.lookup([0.5, 50.0], clip=True), table.lookup([0.5, 50.0], clip=True))
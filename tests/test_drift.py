@@ -0,0 +1,59 @@
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+from src.serving import drift
+from src.serving.drift import DriftMonitor, DriftReference
+
+
+def _traffic(rng, n, distance_scale=1.0, cities=("jilin", "yantai")):
+    return pd.DataFrame({
+        "distance_km": rng.lognormal(1, 0.5, n) * distance_scale,
+        "precipitation (mm)": rng.gamma(0.5, 1.0, n),
+        "city": rng.choice(list(cities), n),
+        "aoi_type": rng.integers(0, 5, n),
+    })
+
+
+def test_drift_scores_flag_shifted_and_unseen_traffic(tmp_path, monkeypatch):
+    rng = np.random.default_rng(2)
+    num, cat = ["distance_km", "precipitation (mm)"], ["city", "aoi_type"]
+    DriftReference.build(_traffic(rng, 5000), num, cat).save(tmp_path / "drift_reference.json")
+    reference = DriftReference.load(tmp_path / "drift_reference.json")
+
+    # Same distribution, fed one request at a time: nothing drifts. The per-request cost is
+    # one bisect per numerical feature and no scoring (counted, not timed)
+    bisects = []
+
+    def counting_bisect(edges, value):
+        bisects.append(value)
+        return bisect_left(edges, value)
+
+    monkeypatch.setattr(drift.bisect, "bisect_left", counting_bisect)
+    monkeypatch.setattr(drift, "population_stability_index", None)
+    monkeypatch.setattr(drift, "binned_ks", None)
+    stable = DriftMonitor(reference)
+    for row in _traffic(rng, 2000).to_dict(orient="records"):
+        stable.update(row)
+    assert len(bisects) == 2000 * len(num)
+    monkeypatch.undo()
+
+    report = stable.report()
+    assert report["observed"] == 2000 and report["drifted_features"] == []
+
+    # Longer distances and a new city: flagged, and the batch path agrees with the per-row path
+    shifted = _traffic(rng, 2000, distance_scale=3.0, cities=("jilin", "shanghai"))
+    batch, per_row = DriftMonitor(reference), DriftMonitor(reference)
+    batch.update_frame(shifted)
+    for row in shifted.to_dict(orient="records"):
+        per_row.update(row)
+
+    report = batch.report()
+    assert {"distance_km", "city"} <= set(report["drifted_features"])
+    assert report["features"]["precipitation (mm)"]["status"] == "ok"
+    assert report["features"]["city"]["unseen_values"]["shanghai"] > 0
+    assert report["features"]["distance_km"]["ks"] > 0.3
+    for feature in num:
+        np.testing.assert_array_equal(batch.numerical_counts[feature], per_row.numerical_counts[feature])
+    for feature in cat:
+        np.testing.assert_array_equal(batch.categorical_counts[feature], per_row.categorical_counts[feature])
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.modeling.eta_surface import ETASurfaceIndex, SURFACE_VERSION, hot_slots, model_fingerprint
+from src.modeling.inference_pipeline import InferencePipeline
+from tests.utils.payloads import make_payload
+
+WEATHER = ["relative_humidity_2m (%)", "cloud_cover (%)", "wind_speed_10m (km/h)", "precipitation (mm)"]
+
+
+def test_surface_lookup_tracks_model(model_paths, tmp_path, monkeypatch):
+    """Built from one log, the index serves a later log with new weather readings, mostly within tolerance."""
+    pipeline = InferencePipeline(**model_paths)
+    # The build thresholds predict_proba itself; a classifier predict() call is a second, wasted pass
+    label_calls = []
+    monkeypatch.setattr(pipeline.clf_pipeline, "predict", lambda X: label_calls.append(len(X)))
+    rng = np.random.default_rng(5)
+    requests = pd.DataFrame([make_payload(rng, order_id=i) for i in range(3)])
+
+    grid = np.geomspace(0.1, 20, 200)
+    index = ETASurfaceIndex.build(pipeline, hot_slots(requests, top=3), grid,
+                                  model_fingerprint(*model_paths.values()))
+    assert label_calls == []
+    monkeypatch.undo()
+    index.save(tmp_path / "eta_surface.npz")
+    index = ETASurfaceIndex.load(tmp_path / "eta_surface.npz")
+    assert len(index) == 3
+
+    # Same slots, captured at another time: every weather reading and distance is redrawn
+    later = requests.copy()
+    for payload in (make_payload(rng, order_id=0) for _ in range(20)):
+        later = pd.concat([later, requests.assign(**{f: payload[f] for f in WEATHER})], ignore_index=True)
+
+    tolerance = 0.5
+    errors = []
+    for payload in later.to_dict(orient="records"):
+        features = {**payload, "distance_km": rng.uniform(0.2, 15)}
+        hit = index.lookup(features, tolerance)
+        if hit is None:
+            continue
+        exact = pipeline.predict(pd.DataFrame([features]))
+        errors.append(abs(hit[0] - exact["ETA_Prediction"][0]))
+    assert len(errors) > len(later) // 2
+    # The error check samples the weather cell, so allow the odd tree split between checked points
+    assert np.mean(np.array(errors) <= tolerance) >= 0.9
+
+    unknown = {**requests.iloc[0].to_dict(), "city": "nowhere"}
+    assert index.lookup(unknown, tolerance) is None
+    outside = {**requests.iloc[0].to_dict(), "wind_speed_10m (km/h)": 500.0}
+    assert index.lookup(outside, tolerance) is None
+
+
+def test_outdated_surface_is_rejected(tmp_path):
+    path = tmp_path / "eta_surface.npz"
+    np.savez_compressed(path, meta=np.array(f'{{"version": {SURFACE_VERSION - 1}, "fingerprint": "x"}}'))
+    with pytest.raises(ValueError, match="outdated"):
+        ETASurfaceIndex.load(path)
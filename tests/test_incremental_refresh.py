@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.pipeline import Pipeline
+
+from src.modeling.data_preparation import DataPreparator
+from src.modeling.modeling_pipeline import ModelingPipeline
+from src.modeling.preprocessing import PreprocessorFactory
+
+
+def _window(rng, n, start, cities=("jl", "sh")):
+    distance = rng.lognormal(0.7, 0.5, n)
+    df = pd.DataFrame({
+        "accept_time": pd.Timestamp(start) + pd.to_timedelta(rng.uniform(0, 2 * 86400, n), unit="s"),
+        "distance_km": distance,
+        "relative_humidity_2m (%)": rng.uniform(20, 100, n),
+        "cloud_cover (%)": rng.uniform(0, 100, n),
+        "wind_speed_10m (km/h)": rng.uniform(0, 30, n),
+        "precipitation (mm)": rng.exponential(0.5, n),
+        "Weather_Label": rng.choice(["Sunny", "Cloudy"], n),
+        "Traffic_Label": rng.choice(["Low", "High"], n),
+        "city": rng.choice(list(cities), n),
+        "aoi_type": rng.integers(0, 4, n),
+    })
+    df["ETA_target"] = distance * 8 + 20 + rng.normal(0, 3, n)
+    df["is_delayed"] = (df["ETA_target"] > 40).astype(int)
+    return df
+
+
+def _fit_current(model_dir, df):
+    df_model, num, cat, y_reg, y_clf = DataPreparator().prepare_features(df)
+    X = df_model.drop(["ETA_target", "is_delayed"], axis=1)
+    reg = Pipeline([("preprocessor", PreprocessorFactory.create_preprocessor(num, cat)),
+                    ("model", xgb.XGBRegressor(n_estimators=20, random_state=0))]).fit(X, y_reg)
+    clf = Pipeline([("preprocessor", PreprocessorFactory.create_preprocessor(num, cat)),
+                    ("model", lgb.LGBMClassifier(n_estimators=20, random_state=0, verbose=-1))]).fit(X, y_clf)
+    joblib.dump(reg, os.path.join(model_dir, "best_regression_pipeline.pkl"))
+    joblib.dump(clf, os.path.join(model_dir, "best_classification_pipeline.pkl"))
+
+
+def _n_trees(model_dir):
+    reg = joblib.load(os.path.join(model_dir, "best_regression_pipeline.pkl")).named_steps["model"]
+    clf = joblib.load(os.path.join(model_dir, "best_classification_pipeline.pkl")).named_steps["model"]
+    return reg.get_booster().num_boosted_rounds(), clf.booster_.num_trees()
+
+
+@pytest.fixture(scope="module")
+def mlflow_workdir(tmp_path_factory):
+    """One working dir per module: MLflow writes ./mlruns and caches that file store for the process."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(tmp_path_factory.mktemp("mlflow"))
+        yield
+
+
+@pytest.mark.usefixtures("mlflow_workdir")
+def test_incremental_refresh_warm_starts_and_guards_promotion(tmp_path, caplog):
+    rng = np.random.default_rng(3)
+    model_dir = str(tmp_path / "models")
+    pipeline = ModelingPipeline(model_dir=model_dir, metadata_path=str(tmp_path / "model_metadata.json"))
+    _fit_current(model_dir, _window(rng, 800, "2023-06-01"))
+    new_window = _window(rng, 400, "2023-06-03", cities=("jl", "sh", "zz"))
+
+    # A refresh that has to be impossibly better is rejected: production files are untouched
+    with caplog.at_level(logging.WARNING):
+        pipeline.run_incremental(new_window, n_new_estimators=10, max_degradation=-1.0)
+    assert _n_trees(model_dir) == (20, 20)
+    assert not os.path.exists(os.path.join(model_dir, "previous_regression_pipeline.pkl"))
+    assert any("Unseen categories" in r.getMessage() and "zz" in r.getMessage() for r in caplog.records)
+    assert not os.path.exists(tmp_path / "model_metadata.json")
+
+    # A tolerant refresh is promoted: boosting continued from the existing trees, old model kept for rollback
+    pipeline.run_incremental(new_window, n_new_estimators=10, max_degradation=10.0)
+    assert _n_trees(model_dir) == (30, 30)
+    assert os.path.exists(os.path.join(model_dir, "previous_regression_pipeline.pkl"))
+    assert ModelingPipeline._unseen_categories(
+        joblib.load(os.path.join(model_dir, "best_regression_pipeline.pkl")).named_steps["preprocessor"], new_window
+    ) == {"city": ["zz"]}
+
+    # Metadata now describes the promoted models
+    with open(tmp_path / "model_metadata.json") as f:
+        metadata = json.load(f)
+    assert metadata["regression_model"] == "XGBoost" and metadata["classification_model"] == "LightGBM"
+    assert metadata["regression_metrics"]["RMSE"] > 0 and "XGBoost" in metadata["serving_latency"]["regression"]
+    assert metadata["incremental_refresh"]["promoted"] == {"regression": True, "classification": True}
+
+
+@pytest.mark.usefixtures("mlflow_workdir")
+def test_incremental_refresh_updates_or_drops_shards(tmp_path):
+    """Shards are warm-started under the guard, dropped once they lose to the global model, and fingerprinted."""
+    from src.modeling.eta_surface import model_fingerprint
+    from src.modeling.inference_pipeline import InferencePipeline
+
+    rng = np.random.default_rng(3)
+    model_dir = str(tmp_path / "models")
+    pipeline = ModelingPipeline(model_dir=model_dir, metadata_path=str(tmp_path / "model_metadata.json"))
+    history = _window(rng, 800, "2023-06-01")
+    df_model, num, cat, _, _ = DataPreparator().prepare_features(history)
+    X = df_model.drop(["ETA_target", "is_delayed"], axis=1)
+
+    # Weak global models, a strong "jl" shard and an "sh" regression shard that is off by 1000 minutes
+    stump = dict(n_estimators=2, max_depth=1, learning_rate=0.05, random_state=0)
+    joblib.dump(Pipeline([("preprocessor", PreprocessorFactory.create_preprocessor(num, cat)),
+                          ("model", xgb.XGBRegressor(**stump))]).fit(X, df_model["ETA_target"]),
+                os.path.join(model_dir, "best_regression_pipeline.pkl"))
+    joblib.dump(Pipeline([("preprocessor", PreprocessorFactory.create_preprocessor(num, cat)),
+                          ("model", lgb.LGBMClassifier(**stump, verbose=-1))]).fit(X, df_model["is_delayed"]),
+                os.path.join(model_dir, "best_classification_pipeline.pkl"))
+
+    def shard(model, city, target, offset=0):
+        rows = (df_model["city"] == city).to_numpy()
+        return Pipeline([("preprocessor", PreprocessorFactory.create_preprocessor(num, [c for c in cat if c != "city"])),
+                         ("model", model)]).fit(X[rows], df_model[target][rows] + offset)
+
+    os.makedirs(os.path.join(pipeline.shard_dir, "000_jl"))
+    os.makedirs(os.path.join(pipeline.shard_dir, "001_sh"))
+    manifest = {"shard_by": "city", "min_shard_rows": 100, "shards": {
+        "jl": {
+            "regression": pipeline._save_shard(shard(xgb.XGBRegressor(n_estimators=20, random_state=0),
+                                                     "jl", "ETA_target"), "000_jl", "regression"),
+            "classification": pipeline._save_shard(shard(lgb.LGBMClassifier(n_estimators=20, random_state=0, verbose=-1),
+                                                         "jl", "is_delayed"), "000_jl", "classification"),
+        },
+        "sh": {"regression": pipeline._save_shard(shard(xgb.XGBRegressor(n_estimators=20, random_state=0),
+                                                        "sh", "ETA_target", offset=1000), "001_sh", "regression")},
+    }}
+    manifest_path = os.path.join(pipeline.shard_dir, "manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    def serving_fingerprint():
+        served = InferencePipeline(reg_path=os.path.join(model_dir, "best_regression_pipeline.pkl"),
+                                   clf_path=os.path.join(model_dir, "best_classification_pipeline.pkl"),
+                                   shard_manifest_path=manifest_path)
+        return served.model_files(), model_fingerprint(*served.model_files())
+
+    files_before, fingerprint_before = serving_fingerprint()
+    assert os.path.join(pipeline.shard_dir, "000_jl", "regression.pkl") in files_before
+
+    pipeline.run_incremental(_window(rng, 400, "2023-06-03"), n_new_estimators=10, max_degradation=10.0)
+
+    with open(manifest_path) as f:
+        refreshed = json.load(f)["shards"]
+    # The strong shard kept both models with 10 more rounds each; the broken one lost to the global model
+    assert set(refreshed) == {"jl"}
+    assert not os.path.exists(os.path.join(pipeline.shard_dir, "001_sh"))
+    jl_reg = joblib.load(os.path.join(pipeline.shard_dir, refreshed["jl"]["regression"]["path"])).named_steps["model"]
+    jl_clf = joblib.load(os.path.join(pipeline.shard_dir, refreshed["jl"]["classification"]["path"])).named_steps["model"]
+    assert (jl_reg.get_booster().num_boosted_rounds(), jl_clf.booster_.num_trees()) == (30, 30)
+    assert refreshed["jl"]["rmse"]["shard"] < refreshed["jl"]["rmse"]["global"]
+    for kind in ("regression", "classification"):
+        entry = refreshed["jl"][kind]
+        assert entry["bytes"] == os.path.getsize(os.path.join(pipeline.shard_dir, entry["path"]))
+
+    # Derived artifacts (e.g. the ETA surface) see a new model version
+    files_after, fingerprint_after = serving_fingerprint()
+    assert fingerprint_after != fingerprint_before
+    assert len(files_after) == len(files_before) - 1
+
+    with open(tmp_path / "model_metadata.json") as f:
+        assert json.load(f)["incremental_refresh"]["shards"] == {"refreshed": 2, "kept": 0, "dropped": 1, "skipped": 0}
@@ -0,0 +1,17 @@
+import logging
+from tests.load_harness import LoadHarness, TrafficMix
+
+logger = logging.getLogger(__name__)
+
+def test_load_harness_splits_hits_and_misses(local_redis_host):
+    """Run a small synthetic mix in-process and check the report breakdown."""
+    harness = LoadHarness(concurrency=4)
+    report = harness.run_mix(TrafficMix(n_requests=60, cache_hit_ratio=0.5, hot_set_size=5, seed=7))
+    logger.info(f"Load report: {report}")
+
+    assert report["requests"] == 60
+    assert report["errors"] == 0
+    assert report["cache_hit"]["count"] > 0
+    assert report["cache_miss"]["count"] > 0
+    assert report["cache_hit"]["count"] + report["cache_miss"]["count"] == 60
+    assert report["throughput_rps"] > 0
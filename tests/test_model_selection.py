@@ -0,0 +1,39 @@
+import joblib
+import numpy as np
+import pandas as pd
+from src.modeling.latency import benchmark_model, pareto_front, select_model
+from tests.utils.payloads import make_payload
+
+
+def _candidates():
+    return {
+        "accurate_slow": {"rmse": 1.00, "latency": {"single_p95_ms": 4.0}},
+        "close_fast": {"rmse": 1.005, "latency": {"single_p95_ms": 1.0}},
+        "poor_slow": {"rmse": 1.50, "latency": {"single_p95_ms": 5.0}},
+    }
+
+
+def test_latency_aware_selection():
+    """Budget filtering and Pareto selection trade negligible accuracy for latency."""
+    results = _candidates()
+    assert select_model(results, "rmse", higher_is_better=False) == "accurate_slow"
+    assert select_model(results, "rmse", higher_is_better=False, latency_budget_ms=2.0) == "close_fast"
+    assert select_model(results, "rmse", higher_is_better=False, selection="pareto") == "close_fast"
+    assert select_model(results, "rmse", higher_is_better=False, selection="pareto", accuracy_tolerance=0.001) == "accurate_slow"
+    assert sorted(pareto_front(results, "rmse", higher_is_better=False)) == ["accurate_slow", "close_fast"]
+    # Nothing fits the budget: fall back to plain accuracy
+    assert select_model(results, "rmse", higher_is_better=False, latency_budget_ms=0.1) == "accurate_slow"
+
+
+def test_benchmark_times_served_pipeline(model_paths):
+    """With the preprocessor, raw request rows go through the whole Pipeline and its size is counted."""
+    served = joblib.load(model_paths["reg_path"])
+    rng = np.random.default_rng(3)
+    raw = pd.DataFrame([make_payload(rng, order_id=i) for i in range(50)]).drop(columns=["order_id"])
+    preprocessor, model = served.named_steps["preprocessor"], served.named_steps["model"]
+
+    full = benchmark_model(model, raw, preprocessor, n_single=20, batch_size=50, repeats=1)
+    bare = benchmark_model(model, preprocessor.transform(raw), n_single=20, batch_size=50, repeats=1)
+    assert full["batch_rows"] == bare["batch_rows"] == 50
+    assert full["size_kb"] > bare["size_kb"]
+    assert full["single_p50_ms"] > 0
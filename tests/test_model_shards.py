@@ -0,0 +1,125 @@
+import json
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.dummy import DummyClassifier, DummyRegressor
+from sklearn.pipeline import Pipeline
+
+from src.modeling import model_shards
+from src.modeling.inference_pipeline import InferencePipeline
+from src.modeling.model_shards import ShardedModelStore
+from src.modeling.preprocessing import PreprocessorFactory
+from tests.utils.payloads import make_payload
+
+
+def _constant_shard(estimator):
+    X = pd.DataFrame({"distance_km": [1.0, 2.0]})
+    return Pipeline([
+        ("preprocessor", PreprocessorFactory.create_preprocessor(["distance_km"], [])),
+        ("model", estimator),
+    ]).fit(X, [0, 1])
+
+
+def _write_shards(shard_dir, etas: dict):
+    manifest = {"shard_by": "city", "shards": {}}
+    for city, eta in etas.items():
+        (shard_dir / city).mkdir(parents=True)
+        joblib.dump(_constant_shard(DummyRegressor(strategy="constant", constant=eta)), shard_dir / city / "regression.pkl")
+        joblib.dump(_constant_shard(DummyClassifier(strategy="constant", constant=1)), shard_dir / city / "classification.pkl")
+        manifest["shards"][city] = {
+            kind: {"path": f"{city}/{kind}.pkl", "bytes": (shard_dir / city / f"{kind}.pkl").stat().st_size}
+            for kind in ("regression", "classification")
+        }
+    (shard_dir / "manifest.json").write_text(json.dumps(manifest))
+    return shard_dir / "manifest.json"
+
+
+def test_batches_are_routed_per_city_with_global_fallback(model_paths, tmp_path):
+    manifest = _write_shards(tmp_path / "shards", {"jl": 111.0, "sh": 222.0})
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame([make_payload(rng, order_id=i) for i in range(60)])
+
+    global_preds = InferencePipeline(**model_paths, shard_manifest_path=None).predict(df)
+    sharded = InferencePipeline(**model_paths, shard_manifest_path=str(manifest))
+    preds = sharded.predict(df)
+
+    expected_eta = np.where(df["city"] == "jl", 111.0, np.where(df["city"] == "sh", 222.0, global_preds["ETA_Prediction"]))
+    np.testing.assert_allclose(preds["ETA_Prediction"], expected_eta, rtol=1e-6)
+    in_shard = df["city"].isin(["jl", "sh"]).to_numpy()
+    assert (preds["Delay_Prediction"][in_shard] == 1).all()
+    np.testing.assert_array_equal(preds["Delay_Prediction"][~in_shard], global_preds["Delay_Prediction"][~in_shard])
+
+    # Single-city request path agrees with the batch
+    row = df.index[df["city"] == "sh"][0]
+    assert sharded.predict(df.loc[[row]])["ETA_Prediction"][0] == 222.0
+    stats = sharded.shard_stats()
+    assert stats["loads"] == 4 and stats["hits"] >= 2 and stats["evictions"] == 0
+
+
+def test_routed_output_keeps_the_widest_dtype(model_paths, tmp_path, monkeypatch):
+    """A first group with a narrow dtype must not truncate the other groups' predictions."""
+    manifest = _write_shards(tmp_path / "shards", {"jl": 111.0})
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame([make_payload(rng, order_id=i) for i in range(30)])
+    df = pd.concat([df[df["city"] == "jl"], df[df["city"] != "jl"]], ignore_index=True)  # jl is routed first
+
+    sharded = InferencePipeline(**model_paths, shard_manifest_path=str(manifest))
+    shard = sharded.shards.get("jl", "regression")
+    monkeypatch.setattr(shard, "predict", lambda X: np.full(len(X), 111, dtype=np.int64))
+    global_eta = InferencePipeline(**model_paths, shard_manifest_path=None).predict(df)["ETA_Prediction"]
+
+    eta = sharded.predict(df)["ETA_Prediction"]
+    assert eta.dtype.kind == "f"
+    in_shard = (df["city"] == "jl").to_numpy()
+    assert in_shard[0] and (eta[in_shard] == 111).all()
+    np.testing.assert_array_equal(eta[~in_shard], global_eta[~in_shard])
+
+
+def test_shard_lru_stays_within_byte_budget(model_paths, tmp_path):
+    manifest = _write_shards(tmp_path / "shards", {"jl": 1.0, "sh": 2.0, "yt": 3.0})
+    one_shard = json.loads(manifest.read_text())["shards"]["jl"]["regression"]["bytes"]
+    pipeline = InferencePipeline(**model_paths, shard_manifest_path=str(manifest), max_shard_bytes=2 * one_shard)
+
+    for city in ("jl", "sh", "yt", "jl"):
+        pipeline.shards.get(city, "regression")
+    stats = pipeline.shard_stats()
+    assert stats["loaded"] == ["yt/regression", "jl/regression"]
+    assert stats["loaded_bytes"] <= stats["max_bytes"]
+    assert stats["loads"] == 4 and stats["evictions"] == 2
+
+
+def test_shard_loads_run_outside_the_lock(monkeypatch, tmp_path):
+    """A slow load blocks neither cached shards nor other loads, and concurrent misses load once."""
+    manifest = _write_shards(tmp_path / "shards", {"jl": 1.0, "sh": 2.0})
+    store = ShardedModelStore(str(manifest))
+    store.get("sh", "regression")
+
+    loading, release = threading.Event(), threading.Event()
+    timed_out = []
+    real_load = model_shards.joblib.load
+
+    def slow_load(path):
+        if "jl" in str(path):
+            loading.set()
+            timed_out.append(not release.wait(5))
+        return real_load(path)
+
+    monkeypatch.setattr(model_shards.joblib, "load", slow_load)
+    results = []
+    loaders = [threading.Thread(target=lambda: results.append(store.get("jl", "regression"))) for _ in range(3)]
+    for t in loaders:
+        t.start()
+    assert loading.wait(5)
+
+    # While "jl" is still unpickling, the cached shard and another shard's load go through.
+    # Were the lock held across the load, these would only return once the load gave up waiting.
+    assert store.get("sh", "regression") is not None
+    assert store.get("sh", "classification") is not None
+    release.set()
+    for t in loaders:
+        t.join()
+    assert timed_out == [False]
+    assert len(results) == 3 and all(r is results[0] for r in results)
+    assert store.stats()["loads"] == 3  # sh/regression, sh/classification, and jl/regression once
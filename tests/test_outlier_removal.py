@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from src.outlier_removal import IQROutlierRemover
+
+
+def test_multi_column_mask_matches_per_column_union():
+    """One-pass bounds give the same combined mask as per-column IQR on the full frame."""
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "ETA_target": rng.lognormal(3, 0.5, 4000),
+        "distance_km": rng.lognormal(1, 0.7, 4000),
+        "avg_speed_kmh": rng.normal(0.3, 0.1, 4000),
+    })
+    columns = list(df.columns)
+    remover = IQROutlierRemover(multiplier=1.5)
+
+    mask, stats = remover.detect_outliers(df, columns)
+
+    expected = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        q1, q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+        iqr = q3 - q1
+        expected |= ((df[col] < q1 - 1.5 * iqr) | (df[col] > q3 + 1.5 * iqr)).to_numpy()
+
+    assert (mask == expected).all()
+    assert stats["n_removed"] == expected.sum()
+
+    # Chunked input: approximate bounds from sketches, applied per chunk
+    chunks = [df.iloc[i:i + 800] for i in range(0, len(df), 800)]
+    bounds, _ = remover.detect_outliers(chunks, columns)
+    for col in columns:
+        _, exact_upper = remover.compute_bounds(df, [col])[col]
+        assert np.isclose(bounds[col][1], exact_upper, rtol=0.01)
+    chunk_mask = np.concatenate([remover.outlier_mask(c, bounds) for c in chunks])
+    assert (chunk_mask != expected).mean() < 0.01
@@ -0,0 +1,30 @@
+import asyncio
+
+from fastapi import FastAPI
+from src.profiling import ProfilingMiddleware
+from tests.utils.asgi_app import ASGIClient
+
+
+def test_profile_header_writes_folded_stacks(tmp_path):
+    """Only requests sending X-Profile: 1 leave a .folded file (and its summary) behind."""
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow():
+        return {"total": sum(i * i for i in range(200_000))}
+
+    client = ASGIClient(ProfilingMiddleware(app, output_dir=str(tmp_path), interval=0.001))
+
+    async def scenario():
+        plain = await client.request("GET", "/slow")
+        profiled = await client.request("GET", "/slow", headers={"X-Profile": "1"})
+        return plain, profiled
+
+    plain, profiled = asyncio.run(scenario())
+    assert plain[0] == profiled[0] == 200
+
+    folded = list(tmp_path.glob("*_slow_*.folded"))
+    assert len(folded) == 1
+    assert folded[0].with_suffix(".txt").exists()
+    lines = folded[0].read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,41 @@
+import io
+import json
+import logging
+import queue
+
+from src.serving.request_logging import DroppingQueueHandler, EventSampler, JsonFormatter
+
+
+def test_sampler_keeps_errors_and_samples_tagged_events():
+    sampler = EventSampler(EventSampler.parse_rates("cache_hit=0.0, cache_miss=1"))
+    make = lambda level, event: logging.makeLogRecord({"levelno": level, "event": event})
+
+    assert not sampler.filter(make(logging.INFO, "cache_hit"))
+    assert sampler.filter(make(logging.INFO, "cache_miss"))
+    assert sampler.filter(make(logging.ERROR, "cache_hit"))
+    assert sampler.filter(logging.makeLogRecord({"levelno": logging.INFO}))  # untagged
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+    logger = logging.getLogger("tests.request_logging")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(3):
+            logger.warning("hit for %s", "inference:abc", extra={"event": "cache_hit", "order_id": i})
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.dropped == 1
+    record = log_queue.get_nowait()
+    assert record.args == ("inference:abc",)  # not interpolated on the caller's thread
+
+    stream = io.StringIO()
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(JsonFormatter())
+    writer.handle(record)
+    line = json.loads(stream.getvalue())
+    assert line["message"] == "hit for inference:abc"
+    assert line["event"] == "cache_hit" and line["order_id"] == 0 and line["level"] == "WARNING"
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from src.modeling.inference_pipeline import InferencePipeline
+from src.serving.shadow import ShadowEvaluator
+from tests.utils.payloads import make_payload
+
+
+def test_shadow_scores_in_background_and_drops_when_full(model_paths):
+    """Identical candidate agrees fully; a full queue drops instead of blocking."""
+    pipeline = InferencePipeline(**model_paths)
+    rng = np.random.default_rng(9)
+    payloads = [make_payload(rng, order_id=i) for i in range(40)]
+    served = pipeline.predict(pd.DataFrame(payloads))
+
+    shadow = ShadowEvaluator(pipeline, max_queue=100, batch_size=16).start()
+    for features, eta, delay in zip(payloads, served["ETA_Prediction"], served["Delay_Prediction"]):
+        assert shadow.submit(features, float(eta), int(delay))
+    shadow.stop(drain=True)
+
+    report = shadow.report()
+    assert report["scored"] == 40 and report["dropped"] == 0
+    assert report["delay_agreement"] == 1.0
+    assert report["eta_abs_diff_p99"] < 1e-6
+    assert report["mean_batch_size"] > 1
+
+    # Worker not running: the bounded queue fills and further samples are dropped
+    stalled = ShadowEvaluator(pipeline, max_queue=5)
+    accepted = [stalled.submit(payloads[0], 10.0, 0) for _ in range(8)]
+    assert sum(accepted) == 5 and stalled.report()["dropped"] == 3
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from src.modeling.data_preparation import DataPreparator
+from src.spatial_speed_index import SPEED_INDEX_FEATURES, SpatialSpeedIndex
+
+
+def _orders(rng, n):
+    # Two routes inside one city: a slow one (10 km/h) and a fast one (40 km/h)
+    fast = rng.random(n) < 0.5
+    distance = rng.uniform(1, 5, n)
+    return pd.DataFrame({
+        "accept_time": pd.Timestamp("2023-06-01 08:00") + pd.to_timedelta(rng.integers(0, 3, n), unit="h"),
+        "accept_gps_lat": np.where(fast, 30.105, 30.205), "accept_gps_lng": 120.105,
+        "delivery_gps_lat": np.where(fast, 30.115, 30.215), "delivery_gps_lng": 120.115,
+        "distance_km": distance,
+        "ETA_target": distance * 60 / np.where(fast, 40.0, 10.0),
+    })
+
+
+def test_speed_index_separates_routes_and_serves_from_request_features(tmp_path):
+    rng = np.random.default_rng(0)
+    train = _orders(rng, 400)
+    preparator = DataPreparator()
+    index = preparator.build_speed_index(train, cell_deg=0.01)
+    assert len(index) == 2
+
+    # Leave-one-out on the training rows still recovers each route's speed (up to prior shrinkage)
+    featured, names = preparator.add_speed_index_features(train, index, leave_one_out=True)
+    assert names == SPEED_INDEX_FEATURES
+    fast = featured["accept_gps_lat"] < 30.2
+    assert abs(featured.loc[fast, "grid_speed_kmh"].median() - 40) < 5
+    assert abs(featured.loc[~fast, "grid_speed_kmh"].median() - 10) < 1
+
+    # A single order's cell falls back to the hour-bucket average once its own target is removed
+    lonely = _orders(rng, 1).assign(accept_gps_lat=31.0, delivery_gps_lat=31.0)
+    lonely_index = preparator.build_speed_index(pd.concat([train, lonely]), cell_deg=0.01)
+    loo = lonely_index.add_features(lonely.copy(), leave_one_out=True)["grid_speed_kmh"].iloc[0]
+    no_coords = lonely_index.add_features(lonely.drop(columns=["accept_gps_lat"]))["grid_speed_kmh"].iloc[0]
+    assert np.isclose(loo, no_coords)
+
+    # Served path: persisted index, hour recovered from the cyclical encoding the API receives
+    index.save(tmp_path / "spatial_speed_index.npz")
+    served = SpatialSpeedIndex.load(tmp_path / "spatial_speed_index.npz")
+    hour = train["accept_time"].dt.hour
+    request = train.drop(columns=["accept_time", "ETA_target"]).assign(
+        accept_hour_sin=np.sin(2 * np.pi * hour / 24), accept_hour_cos=np.cos(2 * np.pi * hour / 24))
+    expected = index.add_features(train.copy())
+    np.testing.assert_allclose(served.add_features(request)[SPEED_INDEX_FEATURES], expected[SPEED_INDEX_FEATURES])
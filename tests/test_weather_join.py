@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from src.weather_join import MultiCityWeatherJoiner
+
+
+def _city_frames(rng, n_orders, start):
+    # Weather has gaps (dropped hours) so some deliveries fall outside the 1h tolerance
+    hours = pd.date_range(start, periods=24 * 10, freq="h")
+    hours = hours[rng.random(len(hours)) > 0.2]
+    weather = pd.DataFrame({
+        "time": hours,
+        "precipitation (mm)": rng.gamma(0.5, 1.0, len(hours)),
+        "is_day ()": rng.integers(0, 2, len(hours)),
+    })
+    # Unique second offsets: no exact delivery-time ties within a city
+    seconds = rng.choice(24 * 12 * 3600, n_orders, replace=False)
+    deliveries = pd.DataFrame({
+        "order_id": np.arange(n_orders),
+        "delivery_time": pd.Timestamp(start) - pd.Timedelta("1d") + pd.to_timedelta(seconds, unit="s"),
+        "distance_km": rng.lognormal(1, 0.5, n_orders),
+    })
+    # Shuffle both sides so the engine has to sort
+    return deliveries.sample(frac=1, random_state=0), weather.sample(frac=1, random_state=1)
+
+
+def test_single_pass_join_matches_per_city_merge_asof():
+    rng = np.random.default_rng(11)
+    deliveries, weather = {}, {}
+    for i, city in enumerate(["jilin", "yantai", "chongqing"]):
+        deliveries[city], weather[city] = _city_frames(rng, 500 + 100 * i, f"2023-0{i + 1}-01")
+
+    legacy = pd.concat([
+        pd.merge_asof(
+            deliveries[city].sort_values("delivery_time"), weather[city].sort_values("time"),
+            left_on="delivery_time", right_on="time", direction="backward", tolerance=pd.Timedelta("1h"),
+        )
+        for city in deliveries
+    ], ignore_index=True)
+
+    joined, cities = MultiCityWeatherJoiner(tolerance=pd.Timedelta("1h")).join(deliveries, weather)
+
+    assert joined["time"].isna().any()  # tolerance actually exercised
+    pd.testing.assert_frame_equal(joined, legacy)
+    assert list(cities) == [c for c in deliveries for _ in range(len(deliveries[c]))]
+
+    # Already-sorted input skips the sort and gives the same result
+    presorted = {c: d.sort_values("delivery_time") for c, d in deliveries.items()}
+    weather_sorted = {c: w.sort_values("time") for c, w in weather.items()}
+    again, _ = MultiCityWeatherJoiner().join(presorted, weather_sorted)
+    pd.testing.assert_frame_equal(again, legacy)
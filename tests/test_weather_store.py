@@ -0,0 +1,107 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.serving.weather_store import WEATHER_FEATURES, WeatherFeatureStore
+
+
+def _write_city(weather_dir, city, humidity, mtime=None):
+    """Hourly readings for 2023-06-01 06:00 → 11:00; `mtime` pins the file time so reloads are detectable."""
+    path = os.path.join(weather_dir, f"{city}_weather.csv")
+    pd.DataFrame({
+        "time": pd.date_range("2023-06-01 06:00", periods=6, freq="h").strftime("%Y-%m-%dT%H:%M"),
+        "relative_humidity_2m (%)": humidity,
+        "cloud_cover (%)": 20.0,
+        "wind_speed_10m (km/h)": 8.0,
+        "precipitation (mm)": 0.0,
+    }).to_csv(path, index=False)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_weather_store_lookup_and_reload(tmp_path):
+    _write_city(tmp_path, "sh", 55.0, mtime=1_000_000)
+    store = WeatherFeatureStore(str(tmp_path), tolerance=pd.Timedelta("1h"))
+    assert store.refresh() == 1 and store.refresh() == 0
+
+    # As-of: latest reading at or before the timestamp, within tolerance
+    features = store.build_features("sh", "2023-06-01 08:30", distance_km=2.5, aoi_type=3)
+    assert features["relative_humidity_2m (%)"] == 55.0
+    assert set(WEATHER_FEATURES) <= set(features)
+    assert features["Weather_Label"] == "Windy" and features["Traffic_Label"] == "High"
+    assert features["city"] == "sh" and features["aoi_type"] == 3
+
+    assert store.lookup("nowhere", "2023-06-01 08:30") is None
+    assert store.lookup("sh", "2023-06-01 05:59") is None          # before the first reading
+    assert store.lookup("sh", "2023-06-01 12:30") is None          # 1.5h after the last one
+    assert store.build_features("sh", "2023-06-01 12:30", 2.5, 3) is None
+
+    # A changed file is picked up on the next refresh; new cities appear
+    _write_city(tmp_path, "sh", 90.0, mtime=2_000_000)
+    _write_city(tmp_path, "hz", 40.0)
+    assert store.refresh() == 2
+    assert store.lookup("sh", "2023-06-01 08:30")["relative_humidity_2m (%)"] == 90.0
+    assert store.lookup("hz", "2023-06-01 08:30") is not None
+
+
+def test_lite_features_follow_training_reference_time(tmp_path):
+    """Weather, Traffic_Label and hour features match the training join for the same delivery_time."""
+    from mock.traffic_generator import TrafficMockGenerator
+    from src.weather_join import MultiCityWeatherJoiner
+
+    path = _write_city(tmp_path, "sh", 55.0)
+    weather = pd.read_csv(path)
+    # An off-the-hour reading, so the reading's hour (16) differs from the delivery hour (17)
+    weather.loc[len(weather)] = ["2023-06-01T16:40", 70.0, 20.0, 8.0, 0.0]
+    weather.to_csv(path, index=False)
+    weather["time"] = pd.to_datetime(weather["time"])
+
+    delivery_time = pd.Timestamp("2023-06-01 17:05")
+    joined, _ = MultiCityWeatherJoiner().join({"sh": pd.DataFrame({"delivery_time": [delivery_time]})},
+                                              {"sh": weather})
+    joined = TrafficMockGenerator().generate(joined)
+    accept_hour = joined["time"].dt.hour.iloc[0]  # training's accept_time is the matched reading time
+
+    store = WeatherFeatureStore(str(tmp_path))
+    store.refresh()
+    features = store.build_features("sh", delivery_time, distance_km=2.5, aoi_type=3)
+    assert features["relative_humidity_2m (%)"] == joined["relative_humidity_2m (%)"].iloc[0] == 70.0
+    assert features["Traffic_Label"] == joined["Traffic_Label"].iloc[0] == "Jam"
+    assert features["accept_hour_sin"] == pytest.approx(np.sin(2 * np.pi * accept_hour / 24))
+    assert accept_hour == 16
+
+
+def test_weather_store_missing_dir(tmp_path):
+    store = WeatherFeatureStore(str(tmp_path / "missing"))
+    with pytest.raises(FileNotFoundError):
+        store.refresh()
+
+
+def _post_lite(api, monkeypatch, weather_dir, payloads):
+    monkeypatch.setenv("WEATHER_DATA_DIR", str(weather_dir))
+
+    async def scenario(client, _):
+        return [await client.post_json("/predict/lite", payload) for payload in payloads]
+
+    return api(scenario)
+
+
+def test_predict_lite_endpoint(api, monkeypatch, tmp_path):
+    """Known city in tolerance is scored; unknown city or stale reading is a 422; no weather data is a 503."""
+    _write_city(tmp_path, "sh", 55.0)
+    lite = {"order_id": 7, "city": "sh", "timestamp": "2023-06-01T08:30:00", "distance_km": 2.5, "aoi_type": 3}
+    ok, unknown, stale = _post_lite(api, monkeypatch, tmp_path, [
+        lite, {**lite, "city": "nowhere"}, {**lite, "timestamp": "2023-06-01T12:30:00"},
+    ])
+
+    assert ok[0] == 200
+    body = json.loads(ok[2])
+    assert body["order_id"] == 7 and body["city"] == "sh" and body["Predicted_ETA"] > 0
+    assert unknown[0] == 422 and b"nowhere" in unknown[2]
+    assert stale[0] == 422
+
+    (missing,) = _post_lite(api, monkeypatch, tmp_path / "missing", [lite])
+    assert missing[0] == 503
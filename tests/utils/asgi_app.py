@@ -0,0 +1,69 @@
+# tests/utils/asgi_app.py
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from tests.utils.fake_redis import FakeRedis
+
+
+class ASGIClient:
+    """Minimal HTTP/1.1 client that calls an ASGI app directly."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: dict = None):
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode(), str(value).encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        request_sent = False
+        response = {"status": None, "headers": {}, "body": bytearray()}
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Nothing else to send: park until the app finishes
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+            elif message["type"] == "http.response.body":
+                response["body"].extend(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return response["status"], response["headers"], bytes(response["body"])
+
+    async def post_json(self, path: str, payload: dict, headers: dict = None):
+        return await self.request("POST", path, json.dumps(payload).encode(), headers)
+
+
+@asynccontextmanager
+async def serving_app(fake_redis: FakeRedis = None):
+    """main.app inside its real lifespan (models etc.), with the Redis client swapped for a FakeRedis."""
+    import main
+
+    fake_redis = fake_redis or FakeRedis()
+    async with main.lifespan(main.app):
+        if main.redis_client is not None:
+            await main.redis_client.close()  # a reachable real Redis would otherwise be left open
+        main.redis_client = fake_redis
+        yield ASGIClient(main.app), fake_redis
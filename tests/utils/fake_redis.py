@@ -0,0 +1,51 @@
+# tests/utils/fake_redis.py
+import time
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio.Redis used by main.py."""
+
+    def __init__(self):
+        self._store = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def ping(self):
+        return True
+
+    async def get(self, key):
+        entry = self._store.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._store[key]
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    async def set(self, key, value):
+        self._store[key] = (self._encode(value), None)
+        return True
+
+    async def setex(self, key, ttl, value):
+        self._store[key] = (self._encode(value), time.monotonic() + ttl)
+        return True
+
+    async def flushdb(self):
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+        return True
+
+    async def close(self):
+        pass
+
+    @staticmethod
+    def _encode(value):
+        # redis-py always hands back bytes
+        return value.encode() if isinstance(value, str) else value
@@ -0,0 +1,28 @@
+# tests/utils/payloads.py
+import numpy as np
+
+CITIES = ["cq", "hz", "jl", "sh", "yt"]
+WEATHER_LABELS = ["Cloudy", "Fog", "Sandstorms", "Stormy", "Sunny", "Windy"]
+TRAFFIC_LABELS = ["High", "Jam", "Low", "Medium"]
+
+
+def make_payload(rng: np.random.Generator, order_id: int) -> dict:
+    """Build one random /predict payload."""
+    hour = int(rng.integers(0, 24))
+    dow = int(rng.integers(0, 7))
+    return {
+        "order_id": order_id,
+        "distance_km": round(float(rng.lognormal(mean=0.7, sigma=0.6)), 3),
+        "relative_humidity_2m (%)": round(float(rng.uniform(20, 100)), 1),
+        "cloud_cover (%)": round(float(rng.uniform(0, 100)), 1),
+        "wind_speed_10m (km/h)": round(float(rng.uniform(0, 30)), 1),
+        "precipitation (mm)": round(float(rng.exponential(0.5)), 2),
+        "accept_hour_sin": float(np.sin(2 * np.pi * hour / 24)),
+        "accept_hour_cos": float(np.cos(2 * np.pi * hour / 24)),
+        "accept_dow_sin": float(np.sin(2 * np.pi * dow / 7)),
+        "accept_dow_cos": float(np.cos(2 * np.pi * dow / 7)),
+        "Weather_Label": str(rng.choice(WEATHER_LABELS)),
+        "Traffic_Label": str(rng.choice(TRAFFIC_LABELS)),
+        "city": str(rng.choice(CITIES)),
+        "aoi_type": int(rng.integers(0, 16)),
+    }
@@ -1,41 +1,120 @@
 from src.modeling.modeling_pipeline import ModelingPipeline
 from src.data_extraction import DataExtraction
-from src.feature_engineering import run_feature_engineering
-from src.outlier_removal import remove_outliers_iqr
+from src.datetime_parsing import parse_datetimes, PIPELINE_FORMAT
+from src.delay_thresholds import DelayThresholdTable
+from src.feature_engineering import DeliveryFeatureEngineer
+from src.outlier_removal import remove_outliers_iqr_multi
+from src.modeling.eta_surface import build_surface_index
+from src.profiling import profile_section
+import argparse
 import os
 import pandas as pd
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the ETA and delay models.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Warm-start the current production models on the most recent window only")
+    parser.add_argument("--window-days", type=float, default=1.0,
+                        help="Size of the new-data window used by --incremental")
+    parser.add_argument("--new-estimators", type=int, default=50,
+                        help="Boosting rounds added on top of the existing trees in --incremental mode")
+    parser.add_argument("--latency-budget-ms", type=float, default=None,
+                        help="Serving budget (single-row p95) used to exclude slower candidate models")
+    parser.add_argument("--selection", choices=["accuracy", "pareto"], default="accuracy",
+                        help="Pick the most accurate candidate, or the fastest near-best one on the accuracy/latency Pareto front")
+    parser.add_argument("--prune-to-budget", action="store_true",
+                        help="Refit the best candidate with fewer trees until it meets --latency-budget-ms")
+    parser.add_argument("--profile", nargs="?", const="profiles/training", default=None, metavar="DIR",
+                        help="Sample call stacks per stage and write flamegraph-ready .folded files to DIR")
+    parser.add_argument("--dataset-cache", nargs="?", const="cache/datasets", default=None, metavar="DIR",
+                        help="Reuse memory-mapped preprocessed train/test matrices from DIR when the data is unchanged")
+    parser.add_argument("--speed-index", nargs="?", type=float, const=0.01, default=None, metavar="CELL_DEG",
+                        help="Add historical cell-pair × hour-bucket speed features (grid cell size in degrees)")
+    parser.add_argument("--shard-by", nargs="?", const="city", default=None, metavar="COLUMN",
+                        help="Also train per-COLUMN shard models (default: city); the global models remain the fallback")
+    parser.add_argument("--min-shard-rows", type=int, default=1000,
+                        help="Training rows a --shard-by value needs to get its own shard")
+    parser.add_argument("--cv-folds", type=int, default=None,
+                        help="Select models on rolling-origin CV with this many folds instead of a single holdout")
+    parser.add_argument("--cv-mode", choices=["expanding", "rolling"], default="expanding",
+                        help="Expanding (all past rows) or rolling (fixed-size) training windows for --cv-folds")
+    parser.add_argument("--cv-workers", type=int, default=None,
+                        help="Processes evaluating folds in parallel (default: one per fold, up to the CPU count)")
+    parser.add_argument("--surface-requests",
+                        help="Captured request log; rebuilds the precomputed ETA surface for the new models")
+    args = parser.parse_args()
+    if args.cv_folds and args.speed_index:
+        parser.error("--cv-folds cannot be combined with --speed-index (the index would leak future rows into the folds)")
+
     # === Data Extraction ===
-    if not os.path.exists("extracted_data/combined_enriched.csv"):
-        main_data_folder = "Pickup_and_delivery_data"
-
-        city_file_pairs = [
-            [f"{main_data_folder}/delivery/delivery_yt.csv", f"{main_data_folder}/weather/yt_weather.csv"],
-            [f"{main_data_folder}/delivery/delivery_cq.csv", f"{main_data_folder}/weather/cq_weather.csv"],
-            [f"{main_data_folder}/delivery/delivery_hz.csv", f"{main_data_folder}/weather/hz_weather.csv"],
-            [f"{main_data_folder}/delivery/delivery_jl.csv", f"{main_data_folder}/weather/jl_weather.csv"],
-            [f"{main_data_folder}/delivery/delivery_sh.csv", f"{main_data_folder}/weather/sh_weather.csv"],
-        ]
-
-        extractor = DataExtraction(city_file_pairs, main_data_folder, output_folder="extracted_data")
-        final_df = extractor.run()
-    else:
-        final_df = pd.read_csv("extracted_data/combined_enriched.csv")
+    with profile_section("1_data_extraction", args.profile):
+        if not os.path.exists("extracted_data/combined_enriched.csv"):
+            main_data_folder = "Pickup_and_delivery_data"
+
+            city_file_pairs = [
+                [f"{main_data_folder}/delivery/delivery_yt.csv", f"{main_data_folder}/weather/yt_weather.csv"],
+                [f"{main_data_folder}/delivery/delivery_cq.csv", f"{main_data_folder}/weather/cq_weather.csv"],
+                [f"{main_data_folder}/delivery/delivery_hz.csv", f"{main_data_folder}/weather/hz_weather.csv"],
+                [f"{main_data_folder}/delivery/delivery_jl.csv", f"{main_data_folder}/weather/jl_weather.csv"],
+                [f"{main_data_folder}/delivery/delivery_sh.csv", f"{main_data_folder}/weather/sh_weather.csv"],
+            ]
+
+            extractor = DataExtraction(city_file_pairs, main_data_folder, output_folder="extracted_data")
+            final_df = extractor.run()
+        else:
+            final_df = pd.read_csv("extracted_data/combined_enriched.csv")
 
     print("✅ Data loaded. Shape:", final_df.shape)
 
+    threshold_path = os.path.join("models", "delay_thresholds.json")
+    if args.incremental:
+        # Only the new window is engineered and cleaned, and it is labelled with the thresholds
+        # the served classifier and the API already use instead of freshly fitted ones
+        if not os.path.exists(threshold_path):
+            parser.error(f"--incremental needs {threshold_path} from a full training run")
+        accept_time = parse_datetimes(final_df["accept_time"], format=PIPELINE_FORMAT)
+        window_start = accept_time.max() - pd.Timedelta(days=args.window_days)
+        final_df = final_df[accept_time >= window_start]
+        print(f"🔁 Incremental refresh window: {len(final_df)} rows since {window_start}")
+        engineer = DeliveryFeatureEngineer(delay_thresholds=DelayThresholdTable.load(threshold_path))
+    else:
+        engineer = DeliveryFeatureEngineer()
+
     # === Feature Engineering ===
-    df_eng = run_feature_engineering(final_df)
+    with profile_section("2_feature_engineering", args.profile):
+        df_eng = engineer.transform(final_df)
     print("✅ Feature engineering complete. Shape:", df_eng.shape)
 
     # === Outlier Removal ===
-    df_clean, outliers = remove_outliers_iqr(df_eng, column="ETA_target", multiplier=1.5)
-    print("✅ Outlier removal complete. Clean shape:", df_clean.shape)
+    with profile_section("3_outlier_removal", args.profile):
+        # One pass over ETA, distance and speed: a row goes if it is an outlier in any of them
+        df_clean, outlier_stats = remove_outliers_iqr_multi(
+            df_eng, columns=["ETA_target", "distance_km", "avg_speed_kmh"], multiplier=1.5
+        )
+    print(f"✅ Outlier removal complete. Removed {outlier_stats['n_removed']} rows "
+          f"({outlier_stats['pct_removed']:.2f}%). Clean shape:", df_clean.shape)
 
     # === Modeling Pipeline ===
-    pipeline = ModelingPipeline()
-    best_reg_model, best_clf_model = pipeline.run(df_clean)
+    pipeline = ModelingPipeline(latency_budget_ms=args.latency_budget_ms, selection=args.selection,
+                                prune_to_budget=args.prune_to_budget, dataset_cache_dir=args.dataset_cache,
+                                speed_index_cell_deg=args.speed_index, shard_by=args.shard_by,
+                                min_shard_rows=args.min_shard_rows, cv_folds=args.cv_folds,
+                                cv_mode=args.cv_mode, cv_workers=args.cv_workers)
+    with profile_section("4_modeling", args.profile):
+        if args.incremental:
+            best_reg_model, best_clf_model = pipeline.run_incremental(df_clean, n_new_estimators=args.new_estimators)
+        else:
+            best_reg_model, best_clf_model = pipeline.run(df_clean)
+            # Served next to each prediction by the inference API
+            engineer.delay_thresholds.save(threshold_path)
+            print(f"💾 Saved delay thresholds to {threshold_path}")
 
+    # === ETA Surface Index (rebuilt for every model version) ===
+    if args.surface_requests:
+        with profile_section("5_eta_surface", args.profile):
+            build_surface_index(args.surface_requests)
+        print("📐 Rebuilt ETA surface index at models/eta_surface.npz")
 
+    if args.profile:
+        print(f"🔬 Stage profiles written to {args.profile}/ (*.folded for flamegraphs, *.txt summaries)")